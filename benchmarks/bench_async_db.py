@@ -0,0 +1,97 @@
+"""Concurrent chat sessions on one event loop: blocking calls vs the async facade.
+
+Each simulated conversation searches inventory by ZIP, reads vehicle
+details and books a test drive. "blocking" awaits nothing and calls the
+sync helpers straight from the coroutine (what the tools do today under
+ainvoke); "async" uses the aget_/abook_ helpers on the DB executor.
+loop_lag_ms is the worst delay seen by a 1ms ticker on the same loop.
+
+    python -m benchmarks.bench_async_db [--scale medium] [--sessions 32] [--turns 10]
+"""
+import argparse
+import asyncio
+import time
+
+import database_setup
+from database_setup import (
+    query_db,
+    get_inventory_by_zipcode,
+    book_test_drive,
+    aquery_db,
+    aget_inventory_by_zipcode,
+    abook_test_drive,
+)
+from benchmarks.common import print_table
+from benchmarks.synthetic_data import synthetic_database
+
+DETAILS_QUERY = (
+    "SELECT v.id, v.model, v.trim, v.rate, d.dealership_name FROM Vehicle v "
+    "JOIN Inventory i ON i.vehicle_id = v.id JOIN Dealership d ON i.dealership_id = d.dealership_id "
+    "WHERE v.id = ? AND i.available_status = 'available' LIMIT 1"
+)
+
+
+async def blocking_session(n, turns, zipcodes):
+    for t in range(turns):
+        rows = get_inventory_by_zipcode(zipcodes[(n + t) % len(zipcodes)])
+        if not rows:
+            continue
+        row = rows[(n * 7 + t) % len(rows)]
+        query_db(DETAILS_QUERY, (row[0],))
+        book_test_drive({"name": "Bench", "email": f"b{n}-{t}@example.com"},
+                        inventory_id=row[11], date="2030-01-01", time="10:00")
+        await asyncio.sleep(0)
+
+
+async def async_session(n, turns, zipcodes):
+    for t in range(turns):
+        rows = await aget_inventory_by_zipcode(zipcodes[(n + t) % len(zipcodes)])
+        if not rows:
+            continue
+        row = rows[(n * 7 + t) % len(rows)]
+        await aquery_db(DETAILS_QUERY, (row[0],))
+        await abook_test_drive({"name": "Bench", "email": f"a{n}-{t}@example.com"},
+                               inventory_id=row[11], date="2030-01-01", time="10:00")
+
+
+async def run(session, sessions, turns, zipcodes):
+    lag = [0.0]
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag[0] = max(lag[0], time.perf_counter() - start - 0.001)
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(session(n, turns, zipcodes) for n in range(sessions)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick
+    return elapsed, lag[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", default="medium")
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = []
+    with synthetic_database(args.scale):
+        zipcodes = [r[0] for r in query_db("SELECT DISTINCT zipcode FROM Dealership ORDER BY zipcode")]
+        for name, session in (("blocking", blocking_session), ("async", async_session)):
+            elapsed, lag = asyncio.run(run(session, args.sessions, args.turns, zipcodes))
+            turns = args.sessions * args.turns
+            rows.append({"mode": name, "sessions": args.sessions, "turns": turns,
+                         "seconds": round(elapsed, 2), "turns_per_s": round(turns / elapsed, 1),
+                         "loop_lag_ms": round(lag * 1000, 1)})
+        database_setup.shutdown_db_executor()
+    print_table("concurrent sessions on one event loop", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Concurrent booking stress test: legacy multi-statement path vs. book_test_drive.
+
+Many threads race to book the same small set of inventory rows. Reports
+bookings per second and the number of inventory rows that were handed to
+more than one customer (must be zero for the transactional path).
+
+    python -m benchmarks.bench_booking [--threads 16] [--attempts 50]
+"""
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+
+import database_setup
+from database_setup import query_db, insert_data, update_data, book_test_drive
+from benchmarks.common import temp_database, print_table
+
+
+def legacy_booking(customer, inventory_id):
+    """The pre-transaction save_booking_tool sequence (autocommit per statement)"""
+    dealer_id, vehicle_id = query_db("SELECT dealership_id, vehicle_id FROM Inventory WHERE id = ?", (inventory_id,))[0]
+    existing = query_db("SELECT customer_id FROM Customer WHERE email = ?", (customer["email"],))
+    if existing:
+        customer_id = existing[0][0]
+        update_data("UPDATE Customer SET customer_name=? WHERE customer_id=?", (customer["name"], customer_id))
+    else:
+        customer_id = insert_data(
+            "INSERT INTO Customer (customer_name, email) VALUES (?, ?)", (customer["name"], customer["email"])
+        )
+    if not customer_id:
+        return {"error": "customer_save_failed"}
+    testdrive_id = insert_data(
+        "INSERT INTO TestDrive (customer_id, dealership_id, vehicle_id, date, time) VALUES (?, ?, ?, '2030-01-01', '10:00')",
+        (customer_id, dealer_id, vehicle_id),
+    )
+    if not testdrive_id:
+        return {"error": "booking_save_failed"}
+    update_data("UPDATE Inventory SET available_status = 'reserved' WHERE id = ?", (inventory_id,))
+    return {"ok": True, "testdrive_id": testdrive_id}
+
+
+def transactional_booking(customer, inventory_id):
+    return book_test_drive(customer, inventory_id=inventory_id, date="2030-01-01", time="10:00")
+
+
+def run(book, threads, attempts, inventory_ids):
+    update_data("UPDATE Inventory SET available_status = 'available'", ())
+    booked = Counter()
+    failures = Counter()
+    lock = threading.Lock()
+
+    def worker(n):
+        rng = random.Random(n)
+        for i in range(attempts):
+            customer = {"name": f"Stress {n}-{i}", "email": f"stress{n}-{i}@example.com"}
+            inventory_id = rng.choice(inventory_ids)
+            try:
+                result = book(customer, inventory_id)
+            except Exception as e:
+                result = {"error": type(e).__name__}
+            with lock:
+                if result.get("ok"):
+                    booked[inventory_id] += 1
+                else:
+                    failures[result.get("error")] += 1
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    total = threads * attempts
+    return {
+        "attempts": total,
+        "booked": sum(booked.values()),
+        "double_reserved": sum(1 for c in booked.values() if c > 1),
+        "rejected": dict(failures),
+        "attempts_per_s": round(total / elapsed),
+        "bookings_per_s": round(sum(booked.values()) / elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--attempts", type=int, default=50)
+    parser.add_argument("--extra-inventory", type=int, default=2000,
+                        help="extra inventory rows so most attempts can succeed")
+    args = parser.parse_args()
+
+    with temp_database():
+        with database_setup.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO Inventory (vehicle_id, dealership_id, vin) VALUES (?, ?, ?)",
+                [(n % 18 + 1, n % 5 + 1, f"BENCH{n:012d}") for n in range(args.extra_inventory)],
+            )
+        inventory_ids = [row[0] for row in query_db("SELECT id FROM Inventory")]
+        rows = [
+            {"path": "legacy autocommit", **run(legacy_booking, args.threads, args.attempts, inventory_ids)},
+            {"path": "book_test_drive", **run(transactional_booking, args.threads, args.attempts, inventory_ids)},
+        ]
+        print_table("booking stress", rows)
+        if rows[1]["double_reserved"]:
+            raise SystemExit("FAIL: transactional path double-reserved inventory")
+
+
+if __name__ == "__main__":
+    main()
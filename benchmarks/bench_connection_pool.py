@@ -0,0 +1,72 @@
+"""Per-query latency: connect-per-call vs. the pooled query_db.
+
+Simulates N concurrent Streamlit sessions (one thread each) running the
+admin Analytics queries in a loop.
+
+    python -m benchmarks.bench_connection_pool [--sessions 8] [--iterations 200]
+"""
+import argparse
+import sqlite3
+import threading
+
+import database_setup
+from benchmarks.common import temp_database, timed, summarize, print_table
+
+ANALYTICS_QUERIES = [
+    ("SELECT COUNT(*) FROM Inventory WHERE available_status = 'available'", None),
+    ("SELECT COUNT(*) FROM TestDrive", None),
+    ("SELECT COUNT(*) FROM TestDrive WHERE status = 'scheduled'", None),
+    ("SELECT COUNT(*) FROM TestDrive WHERE status = 'completed'", None),
+    ("SELECT customer_id FROM Customer WHERE email = ?", ("nobody@example.com",)),
+]
+
+
+def unpooled_query(query, params=None):
+    """The pre-pool query_db: open, run one statement, close"""
+    conn = sqlite3.connect(database_setup.DB_FILE)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params or ())
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def run(query_fn, sessions, iterations):
+    samples = []
+    lock = threading.Lock()
+
+    def session():
+        local = []
+        for _ in range(iterations):
+            for query, params in ANALYTICS_QUERIES:
+                _, elapsed = timed(query_fn, query, params)
+                local.append(elapsed)
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    with temp_database():
+        rows = []
+        for sessions in sorted({1, args.sessions}):
+            rows.append({"path": "connect-per-call", "sessions": sessions, **run(unpooled_query, sessions, args.iterations)})
+            rows.append({"path": "pooled", "sessions": sessions, **run(database_setup.query_db, sessions, args.iterations)})
+        print_table("query_db latency", rows)
+        print(database_setup.get_pool().stats())
+
+
+if __name__ == "__main__":
+    main()
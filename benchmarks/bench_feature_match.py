@@ -0,0 +1,65 @@
+"""feature_match_tool: per-call sets + full sort vs the shared top-k matcher.
+
+Candidates are inventory dicts shaped like inventory_tool's output, many
+rows sharing each vehicle's feature list. Checks both return the same top
+rows, then times the top-8 selection the agent tools make.
+
+    python -m benchmarks.bench_feature_match [--rows 1000 10000 100000] [--repeat 20]
+"""
+import argparse
+import random
+
+from feature_matcher import FeatureMatcher
+from benchmarks.common import timed, summarize, print_table
+
+FEATURES = ["Hybrid", "AWD", "Panoramic Roof", "Heated Seats", "12.3in Infotainment", "Navigation",
+            "Sunroof", "Apple CarPlay", "Android Auto", "Blind Spot Monitor", "Adaptive Cruise",
+            "Lane Keep Assist", "JBL Audio", "Wireless Charging", "Ventilated Seats", "Head-Up Display",
+            "Third Row", "Tow Package", "Remote Start", "Leather"]
+TARGET = ["Hybrid", "AWD", "Panoramic Roof", "Heated Seats", "12.3in Infotainment"]
+
+
+def set_sort_match(target_features, candidates):
+    """The per-call implementation feature_match_tool replaced"""
+    target_set = set([f.lower() for f in target_features])
+    scored = []
+    for c in candidates:
+        cand_set = set([f.lower() for f in c.get("features", [])])
+        scored.append((len(target_set.intersection(cand_set)), c))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [c for score, c in scored]
+
+
+def candidates(n, vehicles=200, seed=7):
+    rng = random.Random(seed)
+    lists = [rng.sample(FEATURES, rng.randint(3, 10)) for _ in range(vehicles)]
+    return [{"inventory_id": i, "vin": f"VIN{i:08d}", "model": "RAV4", "trim": "XLE",
+             "features": list(lists[rng.randrange(vehicles)])} for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--k", type=int, default=8)
+    args = parser.parse_args()
+
+    rows = []
+    for n in args.rows:
+        items = candidates(n)
+        matcher = FeatureMatcher()
+        _, cold_s = timed(matcher.top_k, TARGET, items, args.k)
+        assert matcher.top_k(TARGET, items, args.k) == set_sort_match(TARGET, items)[:args.k]
+        weights = {"Hybrid": 3, "AWD": 2}
+        for name, fn in (("set_sort", lambda: set_sort_match(TARGET, items)[:args.k]),
+                         ("top_k", lambda: matcher.top_k(TARGET, items, args.k)),
+                         ("top_k_weighted", lambda: matcher.top_k(TARGET, items, args.k, weights))):
+            summary = summarize([timed(fn)[1] for _ in range(args.repeat)])
+            rows.append({"rows": n, "path": name, "p50_ms": round(summary["p50_us"] / 1000, 3),
+                         "p95_ms": round(summary["p95_us"] / 1000, 3)})
+        rows.append({"rows": n, "path": "top_k_first_call", "p50_ms": round(cold_s * 1000, 3), "p95_ms": ""})
+    print_table(f"top-{args.k} feature match", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Bulk dealer-feed load throughput.
+
+Writes a synthetic CSV feed of N VINs spread over the sample dealers and
+vehicles, then loads it with dealer_feed.load_feed_file. A second load of
+the same file measures the all-updates (re-delivered feed) case.
+
+    python -m benchmarks.bench_feed_load [--rows 1000000]
+"""
+import argparse
+import csv
+import os
+
+import database_setup
+from database_setup import SAMPLE_DEALERSHIPS, SAMPLE_VEHICLES
+from dealer_feed import load_feed_file
+from benchmarks.common import temp_database, print_table
+
+
+def write_feed(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["vin", "dealership_name", "model", "trim", "color", "price", "status"])
+        for n in range(rows):
+            dealer = SAMPLE_DEALERSHIPS[n % len(SAMPLE_DEALERSHIPS)]
+            _, model, trim, color, rate, _ = SAMPLE_VEHICLES[n % len(SAMPLE_VEHICLES)]
+            writer.writerow([f"FEED{n:013d}", dealer[0], model, trim, color, rate, "available"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with temp_database() as db_path:
+        feed = os.path.join(os.path.dirname(db_path), "feed.csv")
+        write_feed(feed, args.rows)
+        rows = [
+            {"run": "initial load", **load_feed_file(feed, chunk_size=args.chunk_size)},
+            {"run": "reload (updates)", **load_feed_file(feed, chunk_size=args.chunk_size)},
+        ]
+        print_table(f"dealer feed load, {args.rows:,} rows", rows)
+        print("Query plans:", database_setup.check_query_plans() or "OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Incremental feed reconciliation vs. a full reload.
+
+Loads a synthetic feed, reserves a few cars, then re-delivers it with a
+small fraction of VINs added, removed and changed. Compares
+dealer_feed.reconcile_feed_file (minimal diff) with load_feed_file (full
+upsert) and checks reserved rows survive.
+
+    python -m benchmarks.bench_feed_reconcile [--rows 200000] [--churn 0.01]
+"""
+import argparse
+import csv
+import os
+import random
+
+from database_setup import SAMPLE_DEALERSHIPS, SAMPLE_VEHICLES, query_db, update_data
+from dealer_feed import load_feed_file, reconcile_feed_file
+from benchmarks.common import temp_database, print_table
+
+HEADER = ["vin", "dealership_name", "model", "trim", "color", "price", "status"]
+
+
+def feed_row(n, vehicle_offset=0, status="available"):
+    dealer = SAMPLE_DEALERSHIPS[n % len(SAMPLE_DEALERSHIPS)]
+    _, model, trim, color, rate, _ = SAMPLE_VEHICLES[(n + vehicle_offset) % len(SAMPLE_VEHICLES)]
+    return [f"FEED{n:013d}", dealer[0], model, trim, color, rate, status]
+
+
+def write_feeds(base_path, next_path, rows, churn, seed=7):
+    rng = random.Random(seed)
+    changed = set(rng.sample(range(rows), int(rows * churn)))
+    removed = set(rng.sample(range(rows), int(rows * churn))) - changed
+    with open(base_path, "w", newline="") as base, open(next_path, "w", newline="") as nxt:
+        bw, nw = csv.writer(base), csv.writer(nxt)
+        bw.writerow(HEADER)
+        nw.writerow(HEADER)
+        for n in range(rows):
+            bw.writerow(feed_row(n))
+            if n in removed:
+                continue
+            nw.writerow(feed_row(n, status="sold") if n in changed else feed_row(n))
+        for n in range(rows, rows + int(rows * churn)):
+            nw.writerow(feed_row(n))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--churn", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with temp_database() as db_path:
+        tmp = os.path.dirname(db_path)
+        base, nxt = os.path.join(tmp, "day1.csv"), os.path.join(tmp, "day2.csv")
+        write_feeds(base, nxt, args.rows, args.churn)
+        load_feed_file(base)
+        update_data("UPDATE Inventory SET available_status = 'reserved' WHERE vin IN (SELECT vin FROM Inventory WHERE vin LIKE 'FEED%' ORDER BY id LIMIT 500)", ())
+        reserved_before = query_db("SELECT COUNT(*) FROM Inventory WHERE available_status = 'reserved'")[0][0]
+
+        rows = [{"run": "reconcile", **reconcile_feed_file(nxt)}]
+        reserved_after = query_db("SELECT COUNT(*) FROM Inventory WHERE available_status = 'reserved'")[0][0]
+        rows.append({"run": "full reload", **load_feed_file(nxt)})
+        rows.append({"run": "reconcile (no-op)", **reconcile_feed_file(nxt)})
+        print_table(f"feed re-delivery, {args.rows:,} rows, {args.churn:.1%} churn", rows)
+        print(f"Reserved rows before/after reconcile: {reserved_before}/{reserved_after}")
+        if reserved_after != reserved_before:
+            raise SystemExit("FAIL: reconcile changed reserved rows")
+
+
+if __name__ == "__main__":
+    main()
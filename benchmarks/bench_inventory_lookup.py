@@ -0,0 +1,148 @@
+"""Inventory lookups: the per-app implementations vs inventory_query.
+
+The legacy paths are copied from before the shared engine: the two
+standalone Streamlit apps (dealer ids first, then ``IN (...)`` with
+``LIKE '%model%'`` on their own connection) and tools/inventory.py (same
+two steps on a pooled connection, plus a radius variant).
+get_inventory_by_zipcode, which returns available rows only as tuples, is
+timed alongside for reference. The engine is timed cold (cache cleared
+before every call) and warm. Each legacy path must return the same
+inventory ids as the engine.
+
+    python -m benchmarks.bench_inventory_lookup [--scale medium] [--repeat 50]
+"""
+import argparse
+import json
+import sqlite3
+
+import database_setup
+from database_setup import query_db, pooled_connection, zip_centroid, dealers_within, get_inventory_by_zipcode
+import inventory_query
+from benchmarks.common import timed, summarize, print_table
+from benchmarks.synthetic_data import synthetic_database
+
+
+def _features(raw):
+    try:
+        return json.loads(raw) if raw else []
+    except Exception:
+        return []
+
+
+def legacy_streamlit(conn, zipcode, model=None, dealer_limit=20):
+    """inventory_tool from the standalone apps (20 dealers in one, 50 in the other)"""
+    cur = conn.cursor()
+    cur.execute(f"SELECT dealership_id FROM Dealership WHERE zipcode = ? LIMIT {dealer_limit}", (zipcode,))
+    dealer_ids = [d[0] for d in cur.fetchall()]
+    if not dealer_ids:
+        return []
+    seq = ",".join(["?"] * len(dealer_ids))
+    q = (f"SELECT Inventory.id, Inventory.vin, Inventory.available_status, Vehicle.id, Vehicle.make, Vehicle.model, "
+         f"Vehicle.trim, Vehicle.features, Vehicle.rate, Dealership.dealership_id, Dealership.dealership_name, "
+         f"Dealership.address, Dealership.email, Dealership.phone FROM Inventory "
+         f"JOIN Vehicle ON Inventory.vehicle_id = Vehicle.id "
+         f"JOIN Dealership ON Inventory.dealership_id = Dealership.dealership_id "
+         f"WHERE Inventory.dealership_id IN ({seq})")
+    params = dealer_ids
+    if model:
+        q += " AND Vehicle.model LIKE ?"
+        params = dealer_ids + [f"%{model}%"]
+    cur.execute(q, params)
+    return [{"inventory_id": r[0], "vin": r[1], "available_status": r[2], "vehicle_id": r[3], "make": r[4],
+             "model": r[5], "trim": r[6], "features": _features(r[7]), "rate": r[8], "dealership_id": r[9],
+             "dealership_name": r[10], "address": r[11], "dealership_email": r[12], "phone": r[13]}
+            for r in cur.fetchall()]
+
+
+def legacy_tools_inventory(zipcode, model=None, radius_miles=None):
+    """tools/inventory.inventory_lookup before the shared engine"""
+    with pooled_connection() as conn:
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row
+        distances = {}
+        center = zip_centroid(zipcode, conn) if radius_miles else None
+        if center:
+            distances = dict(dealers_within(center[0], center[1], float(radius_miles), conn))
+            dealer_ids = list(distances)
+        else:
+            cur.execute("SELECT dealership_id FROM Dealership WHERE zipcode=?", (zipcode,))
+            dealer_ids = [d[0] for d in cur.fetchall()]
+        if not dealer_ids:
+            return []
+        seq = ','.join(['?'] * len(dealer_ids))
+        query = f"""SELECT Inventory.id as inventory_id, Inventory.vin, Inventory.available_status,
+                    Vehicle.model, Vehicle.trim, Vehicle.features, Dealership.dealership_id,
+                    Dealership.dealership_name, Dealership.address
+                    FROM Inventory
+                    JOIN Vehicle ON Inventory.vehicle_id = Vehicle.id
+                    JOIN Dealership ON Inventory.dealership_id = Dealership.dealership_id
+                    WHERE Inventory.dealership_id IN ({seq})"""
+        params = dealer_ids
+        if model:
+            query += " AND Vehicle.model LIKE ?"
+            params = dealer_ids + [f"%{model}%"]
+        cur.execute(query, params)
+        rows = cur.fetchall()
+    out = []
+    for r in rows:
+        out.append({'inventory_id': r['inventory_id'], 'vin': r['vin'], 'available_status': r['available_status'],
+                    'model': r['model'], 'trim': r['trim'], 'features': _features(r['features']),
+                    'dealership_name': r['dealership_name'], 'address': r['address'],
+                    'dealership_id': r['dealership_id']})
+        if distances:
+            out[-1]['distance_miles'] = round(distances[r['dealership_id']], 1)
+    if distances:
+        out.sort(key=lambda item: item['distance_miles'])
+    return out
+
+
+def engine_cold(zipcode, model=None, radius_miles=None):
+    inventory_query.get_engine().clear()
+    return inventory_query.lookup_inventory(zipcode, model, radius_miles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", default="medium")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = []
+    with synthetic_database(args.scale):
+        app_conn = sqlite3.connect(database_setup.DB_FILE, check_same_thread=False)
+        zipcodes = [r[0] for r in query_db("SELECT zipcode FROM Dealership ORDER BY dealership_id LIMIT 20")]
+        paths = {
+            "streamlit_app": lambda z, m, r: legacy_streamlit(app_conn, z, m),
+            "exactserper_app": lambda z, m, r: legacy_streamlit(app_conn, z, m, dealer_limit=50),
+            "tools_inventory": legacy_tools_inventory,
+            "get_inventory_by_zipcode": lambda z, m, r: get_inventory_by_zipcode(z, m, radius_miles=r),
+            "engine_cold": engine_cold,
+            "engine_cached": inventory_query.lookup_inventory,
+        }
+        cases = {"zipcode": (None, None), "zipcode_model": ("RAV4", None), "radius_25mi": (None, 25)}
+        for case, (model, radius) in cases.items():
+            for i, z in enumerate(zipcodes):
+                expected = sorted(item["inventory_id"] for item in inventory_query.lookup_inventory(z, model, radius))
+                if radius:
+                    got = legacy_tools_inventory(z, model, radius)
+                else:
+                    got = legacy_streamlit(app_conn, z, model)
+                assert sorted(item["inventory_id"] for item in got) == expected, (case, z)
+            for name, fn in paths.items():
+                if radius and name.endswith("_app"):
+                    continue  # the standalone apps never had a radius search
+                samples, found = [], 0
+                for i in range(args.repeat):
+                    result, elapsed = timed(fn, zipcodes[i % len(zipcodes)], model, radius)
+                    samples.append(elapsed)
+                    found += len(result)
+                summary = summarize(samples)
+                rows.append({"case": case, "path": name, "avg_rows": round(found / args.repeat, 1),
+                             "p50_ms": round(summary["p50_us"] / 1000, 3), "p95_ms": round(summary["p95_us"] / 1000, 3)})
+        app_conn.close()
+        inventory_query.drop_engines()
+    print_table("inventory lookup paths", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Inventory search and admin query latency across dataset scales.
+
+Builds a synthetic database per scale (see benchmarks.synthetic_data) and
+times the customer and admin hot paths against it. Full-result queries
+are compared with keyset pages (first and deep) and fetchmany streaming;
+peak_kb is the tracemalloc peak of a single call.
+
+    python -m benchmarks.bench_inventory_scale [--scales small medium] [--repeat 20]
+"""
+import argparse
+import tracemalloc
+
+from database_setup import (
+    query_db,
+    get_inventory_by_zipcode,
+    get_inventory_page,
+    iter_inventory,
+    build_test_drives_query,
+    stream_query,
+    split_page,
+    TEST_DRIVES_QUERY,
+)
+from benchmarks.common import timed, summarize, print_table
+from benchmarks.synthetic_data import synthetic_database
+
+
+def cases():
+    zipcodes = [row[0] for row in query_db("SELECT zipcode FROM Dealership ORDER BY dealership_id LIMIT 25")]
+    # Cursors from the middle of each ordering, for deep-page timings
+    mid_inv = query_db("SELECT v.model, v.trim, i.id FROM Inventory i JOIN Vehicle v ON v.id = i.vehicle_id "
+                       "WHERE i.available_status = 'available' ORDER BY v.model, v.trim, i.id "
+                       "LIMIT 1 OFFSET (SELECT COUNT(*) / 2 FROM Inventory WHERE available_status = 'available')")
+    mid_td = query_db("SELECT date, time, id FROM TestDrive ORDER BY date DESC, time DESC, id DESC "
+                      "LIMIT 1 OFFSET (SELECT COUNT(*) / 2 FROM TestDrive)")
+    inv_cursor = list(mid_inv[0]) if mid_inv else None
+    td_cursor = list(mid_td[0]) if mid_td else None
+
+    def test_drives_page(after):
+        query, params = build_test_drives_query(after=after, limit=51)
+        return split_page(query_db(query, params), 50, lambda r: [r[1], r[2], r[0]])[0]
+
+    return {
+        "inventory_by_zip": lambda i: get_inventory_by_zipcode(zipcodes[i % len(zipcodes)]),
+        "inventory_by_zip_model": lambda i: get_inventory_by_zipcode(zipcodes[i % len(zipcodes)], "RAV4"),
+        "inventory_all_available": lambda i: get_inventory_by_zipcode(None),
+        "inventory_page_first": lambda i: get_inventory_page(limit=50)[0],
+        "inventory_page_deep": lambda i: get_inventory_page(after=inv_cursor, limit=50)[0],
+        "inventory_stream_all": lambda i: sum(1 for _ in iter_inventory()),
+        "admin_test_drives": lambda i: query_db(TEST_DRIVES_QUERY),
+        "admin_test_drives_page_first": lambda i: test_drives_page(None),
+        "admin_test_drives_page_deep": lambda i: test_drives_page(td_cursor),
+        "admin_test_drives_stream": lambda i: sum(1 for _ in stream_query(TEST_DRIVES_QUERY)),
+        "admin_counts": lambda i: query_db("SELECT COUNT(*) FROM TestDrive WHERE status = 'scheduled'"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", nargs="+", default=["small", "medium"])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = []
+    for scale in args.scales:
+        with synthetic_database(scale):
+            for name, fn in cases().items():
+                samples, result = [], None
+                for i in range(args.repeat):
+                    result, elapsed = timed(fn, i)
+                    samples.append(elapsed)
+                summary = summarize(samples)
+                tracemalloc.start()
+                fn(0)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                rows.append({"scale": scale, "case": name,
+                             "rows_out": result if isinstance(result, int) else len(result),
+                             "p50_ms": round(summary["p50_us"] / 1000, 2), "p95_ms": round(summary["p95_us"] / 1000, 2),
+                             "peak_kb": round(peak / 1024)})
+    print_table("inventory/admin latency by scale", rows)
+
+
+if __name__ == "__main__":
+    main()
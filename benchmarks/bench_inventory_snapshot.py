@@ -0,0 +1,68 @@
+"""vehicle_search_tool filters: SQL keyset pages vs the in-memory snapshot.
+
+Checks both paths return identical pages, then times each filter mix and
+the cost of keeping the snapshot current (incremental patch after a few
+reservations vs a full rebuild).
+
+    python -m benchmarks.bench_inventory_snapshot [--scale medium] [--inventory 1000000] [--repeat 50]
+"""
+import argparse
+import time
+
+from database_setup import query_db, get_inventory_page, transaction
+import inventory_index
+from benchmarks.common import timed, summarize, print_table
+from benchmarks.synthetic_data import synthetic_database
+
+
+def cases(zipcodes):
+    return {
+        "all_available": {},
+        "model": {"model": "RAV4"},
+        "model_trim_color": {"model": "Camry", "trim": "SE", "color": "Super White"},
+        "feature_text": {"features": ["awd"]},
+        "feature_numeric_all": {"features": ["towing >= 5000", "sunroof"], "features_match": "all"},
+        "zipcode": {"zipcode": zipcodes[0]},
+        "radius_25mi": {"zipcode": zipcodes[1], "radius_miles": 25},
+        "rare_model_feature": {"model": "GR86", "features": ["navigation"]},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", default="medium")
+    parser.add_argument("--inventory", type=int, default=None, help="override the scale's inventory rows")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    sizes = {"inventory": args.inventory} if args.inventory else {}
+
+    rows = []
+    with synthetic_database(args.scale, **sizes):
+        zipcodes = [r[0] for r in query_db("SELECT zipcode FROM Dealership ORDER BY dealership_id LIMIT 5")]
+        _, build_s = timed(inventory_index.get_snapshot)
+        snapshot = inventory_index.get_snapshot()
+        for name, kw in cases(zipcodes).items():
+            sql_rows, _ = get_inventory_page(**kw)
+            snap_rows, _ = inventory_index.search_inventory_page(**kw)
+            assert [r[:13] for r in sql_rows] == [r[:13] for r in snap_rows], name
+            for path, fn in (("sql", get_inventory_page), ("snapshot", inventory_index.search_inventory_page)):
+                samples = [timed(fn, **kw)[1] for _ in range(args.repeat)]
+                summary = summarize(samples)
+                rows.append({"case": name, "path": path, "rows_out": len(sql_rows),
+                             "p50_ms": round(summary["p50_us"] / 1000, 3), "p95_ms": round(summary["p95_us"] / 1000, 3)})
+
+        ids = [r[0] for r in query_db("SELECT id FROM Inventory WHERE available_status = 'available' LIMIT 20")]
+        with transaction() as conn:
+            conn.executemany("UPDATE Inventory SET available_status = 'reserved' WHERE id = ?", [(i,) for i in ids])
+        start = time.perf_counter()
+        inventory_index.search_inventory_page(model="RAV4")
+        incremental_s = time.perf_counter() - start
+        print_table("snapshot maintenance", [{
+            "rows": snapshot.stats()["rows"], "full_build_ms": round(build_s * 1000, 1),
+            "incremental_20_changes_ms": round(incremental_s * 1000, 2), **snapshot.counters}])
+        inventory_index.drop_snapshots()
+    print_table(f"inventory search: sql vs snapshot ({args.scale})", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Model filters: LOWER(model) = LOWER(?) and LIKE '%model%' vs model_key.
+
+Times the vehicle-side filter alone (no ZIP), where the old predicates scan
+Vehicle and model_key is an index lookup, and reports how many spellings
+typed in chat found inventory before and after canonical_model().
+
+    python -m benchmarks.bench_model_lookup [--scale medium] [--repeat 50]
+"""
+import argparse
+
+import database_setup
+from database_setup import canonical_model, explain_query_plan, pooled_connection
+from model_matcher import model_key
+from benchmarks.common import timed, summarize, print_table
+from benchmarks.synthetic_data import synthetic_database
+
+VARIANTS = ["RAV4", "Rav 4", "rav4hybrid", "Camery", "Toyota Camry", "corola", "Tacomaa", "Highlandr", "4 runner",
+            "RAV4 XLE", "prius prime", "Seqouia"]
+QUERIES = {
+    "lower_equals": ("SELECT COUNT(*) FROM Vehicle v JOIN Inventory i ON i.vehicle_id = v.id "
+                     "WHERE LOWER(v.model) = LOWER(?)", lambda text: text),
+    "like_contains": ("SELECT COUNT(*) FROM Vehicle v JOIN Inventory i ON i.vehicle_id = v.id "
+                      "WHERE v.model LIKE ?", lambda text: f"%{text}%"),
+    "model_key": ("SELECT COUNT(*) FROM Vehicle v JOIN Inventory i ON i.vehicle_id = v.id "
+                  "WHERE v.model_key = ?", lambda text: model_key(canonical_model(text))),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", default="medium")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = []
+    with synthetic_database(args.scale):
+        with pooled_connection() as conn:
+            for name, (query, param) in QUERIES.items():
+                found, samples = 0, []
+                for text in VARIANTS:
+                    count = conn.execute(query, (param(text),)).fetchone()[0]
+                    found += count > 0
+                    for _ in range(args.repeat):
+                        samples.append(timed(lambda: conn.execute(query, (param(text),)).fetchone())[1])
+                summary = summarize(samples)
+                plan = " / ".join(explain_query_plan(conn, query, (param("RAV4"),)))
+                rows.append({"filter": name, "spellings_found": f"{found}/{len(VARIANTS)}",
+                             "p50_ms": round(summary["p50_us"] / 1000, 3), "p95_ms": round(summary["p95_us"] / 1000, 3),
+                             "plan": plan})
+        resolve = summarize([timed(canonical_model, text)[1] for text in VARIANTS * args.repeat])
+        mapped = ", ".join(f"{text} -> {canonical_model(text)}" for text in VARIANTS)
+        database_setup.close_all_pools()
+    print_table("model filters", rows)
+    print(f"\ncanonical_model p50 {resolve['p50_us']} us: {mapped}")
+
+
+if __name__ == "__main__":
+    main()
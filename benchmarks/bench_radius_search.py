@@ -0,0 +1,55 @@
+"""Radius search: R*Tree bounding box vs a haversine scan over every dealer.
+
+    python -m benchmarks.bench_radius_search [--dealers 5000] [--radius 25] [--repeat 200]
+"""
+import argparse
+
+from database_setup import query_db, pooled_connection, zip_centroid, dealers_within, get_inventory_by_zipcode
+from benchmarks.common import timed, summarize, print_table
+from benchmarks.synthetic_data import synthetic_database
+
+SCAN_QUERY = (
+    "SELECT dealership_id, haversine_miles(?, ?, latitude, longitude) AS distance_miles FROM Dealership "
+    "WHERE distance_miles <= ? ORDER BY distance_miles"
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dealers", type=int, default=5000)
+    parser.add_argument("--inventory", type=int, default=100_000)
+    parser.add_argument("--radius", type=float, default=25.0)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = []
+    with synthetic_database("small", dealers=args.dealers, inventory=args.inventory):
+        zipcodes = [r[0] for r in query_db("SELECT zipcode FROM ZipCentroid ORDER BY zipcode")]
+        centers = [zip_centroid(z) for z in zipcodes[:: max(1, len(zipcodes) // 50)]]
+        with pooled_connection() as conn:
+            cases = {
+                "dealers_rtree": lambda c: dealers_within(c[0], c[1], args.radius, conn),
+                "dealers_full_scan": lambda c: conn.execute(SCAN_QUERY, (c[0], c[1], args.radius)).fetchall(),
+            }
+            for name, fn in cases.items():
+                samples, found = [], 0
+                for i in range(args.repeat):
+                    result, elapsed = timed(fn, centers[i % len(centers)])
+                    samples.append(elapsed)
+                    found += len(result)
+                summary = summarize(samples)
+                rows.append({"case": name, "dealers": args.dealers, "avg_found": round(found / args.repeat, 1),
+                             "p50_us": summary["p50_us"], "p95_us": summary["p95_us"]})
+        samples, found = [], 0
+        for i in range(min(args.repeat, 50)):
+            result, elapsed = timed(get_inventory_by_zipcode, zipcodes[(i * 37) % len(zipcodes)], radius_miles=args.radius)
+            samples.append(elapsed)
+            found += len(result)
+        summary = summarize(samples)
+        rows.append({"case": "inventory_within_radius", "dealers": args.dealers, "avg_found": round(found / len(samples), 1),
+                     "p50_us": summary["p50_us"], "p95_us": summary["p95_us"]})
+    print_table(f"radius search ({args.radius} mi)", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Booking latency while heavy admin reports run.
+
+Reporter threads loop over the full test-drive listing and the analytics
+counts while booking threads call book_test_drive. Compares reports served
+through the shared read/write pool (query_db) with the read-only
+reporting path (live mode=ro, and a backup-API snapshot file).
+
+    python -m benchmarks.bench_reporting_isolation [--scale medium] [--seconds 5]
+"""
+import argparse
+import os
+import threading
+import time
+
+import database_setup
+from database_setup import query_db, query_reporting_db, book_test_drive, TEST_DRIVES_QUERY
+from benchmarks.common import timed, summarize, print_table
+from benchmarks.synthetic_data import synthetic_database
+
+REPORTS = [
+    TEST_DRIVES_QUERY,
+    "SELECT COUNT(*) FROM Inventory WHERE available_status = 'available'",
+    "SELECT COUNT(*) FROM TestDrive WHERE status = 'completed'",
+]
+
+
+def run(report_fn, seconds, reporters, bookers, inventory_ids):
+    stop = threading.Event()
+    latencies, reports = [], [0]
+    lock = threading.Lock()
+
+    def reporter():
+        while not stop.is_set():
+            for q in REPORTS:
+                report_fn(q)
+            with lock:
+                reports[0] += 1
+
+    def booker(n):
+        local = []
+        i = 0
+        while not stop.is_set():
+            inv = inventory_ids[(n * 100_003 + i) % len(inventory_ids)]
+            _, elapsed = timed(book_test_drive, {"name": "Bench", "email": f"iso{n}-{i}@example.com"},
+                               inventory_id=inv, date="2030-01-01", time="10:00")
+            local.append(elapsed)
+            i += 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=reporter) for _ in range(reporters)]
+    threads += [threading.Thread(target=booker, args=(n,)) for n in range(bookers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    summary = summarize(latencies)
+    return {"bookings": summary["n"], "reports": reports[0], "p50_ms": round(summary["p50_us"] / 1000, 2),
+            "p95_ms": round(summary["p95_us"] / 1000, 2), "p99_ms": round(summary["p99_us"] / 1000, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", default="medium")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--reporters", type=int, default=8)
+    parser.add_argument("--bookers", type=int, default=4)
+    args = parser.parse_args()
+
+    with synthetic_database(args.scale) as path:
+        inventory_ids = [r[0] for r in query_db("SELECT id FROM Inventory WHERE available_status = 'available'")]
+        rows = [{"reports_via": "none", **run(lambda q: None, args.seconds, 0, args.bookers, inventory_ids)}]
+        rows.append({"reports_via": "query_db (shared pool)",
+                     **run(query_db, args.seconds, args.reporters, args.bookers, inventory_ids)})
+        rows.append({"reports_via": "read-only live",
+                     **run(lambda q: query_reporting_db(q, snapshot=False), args.seconds, args.reporters, args.bookers, inventory_ids)})
+        database_setup.REPORTING_DB_FILE = os.path.join(os.path.dirname(path), "reporting.db")
+        try:
+            rows.append({"reports_via": "snapshot file",
+                         **run(query_reporting_db, args.seconds, args.reporters, args.bookers, inventory_ids)})
+        finally:
+            database_setup.REPORTING_DB_FILE = None
+        print_table(f"book_test_drive latency under reporting load ({args.scale})", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Repeat spec lookups through search_cache vs the network.
+
+The fetch is a stand-in that sleeps ``--latency-ms`` (a Serper round trip
+is typically a few hundred ms) and returns a Serper-sized JSON document,
+so no API quota is spent. The cache runs against a temporary file:
+"miss" pays the fetch plus the store, "memory_hit" is the LRU tier,
+"disk_hit" is a fresh process (new SearchCache on the same file), and
+"stale_hit" serves an expired entry while it is refreshed in the background.
+
+    python -m benchmarks.bench_search_cache [--latency-ms 300] [--repeat 200]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from search_cache import SearchCache, cache_key
+from benchmarks.common import timed, summarize, print_table
+
+QUERIES = ["RAV4 specs", "Camry hybrid mpg", "Tacoma towing capacity", "Highlander third row",
+           "Sienna AWD", "Corolla safety features", "Tundra hybrid review", "Prius 2025 price"]
+
+
+def fake_response(query):
+    return {"searchParameters": {"q": query},
+            "organic": [{"title": f"{query} result {n}", "link": f"https://example.com/{n}",
+                         "snippet": f"Features: Hybrid, AWD, heated seats, {query} " * 3} for n in range(10)]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    def fetch(query):
+        time.sleep(args.latency_ms / 1000)
+        return fake_response(query)
+
+    samples = {"miss": [], "memory_hit": [], "disk_hit": [], "stale_hit": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "search_cache.db")
+        cache = SearchCache(path)
+        for q in QUERIES:
+            samples["miss"].append(timed(cache.get_or_fetch, cache_key("serper", q), lambda: fetch(q))[1])
+        for i in range(args.repeat):
+            q = QUERIES[i % len(QUERIES)]
+            samples["memory_hit"].append(timed(cache.get_or_fetch, cache_key("serper", q), lambda: fetch(q))[1])
+        cache.close()
+        for i in range(args.repeat):
+            restarted = SearchCache(path)  # empty memory tier, warm file
+            q = QUERIES[i % len(QUERIES)]
+            samples["disk_hit"].append(timed(restarted.get_or_fetch, cache_key("serper", q), lambda: fetch(q))[1])
+            restarted.close()
+        stale = SearchCache(path, ttl=0)
+        for q in QUERIES:
+            stale.put(cache_key("serper", q), fake_response(q))
+        for i in range(args.repeat):
+            q = QUERIES[i % len(QUERIES)]
+            samples["stale_hit"].append(timed(stale.get_or_fetch, cache_key("serper", q), lambda: fetch(q))[1])
+        time.sleep(args.latency_ms / 1000 * 2)  # let background refreshes finish
+        stats = stale.stats()
+        stale.close()
+
+    rows = [{"path": name, **summarize(values)} for name, values in samples.items()]
+    print_table(f"search cache ({args.latency_ms:.0f} ms fetch)", rows)
+    print(f"\nstale cache counters: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Multi-model questions: sequential Serper calls vs serper_batch_search.
+
+Uses the local stand-in server from bench_serper_client (plain HTTP) with
+``--delay-ms`` of simulated search time per request, and a memory-only
+search cache with fresh queries every round so every call hits the
+server. A last pass fails a share of requests to show partial-failure
+reporting.
+
+    python -m benchmarks.bench_serper_batch [--delay-ms 250] [--rounds 5]
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.common import timed, summarize, print_table
+
+MODELS = ["RAV4", "Camry", "Highlander", "Tacoma", "Sienna", "Corolla", "Tundra", "Prius"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delay-ms", type=float, default=250)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--error-rate", type=float, default=0.3)
+    args = parser.parse_args()
+
+    # The client and cache read their settings at import
+    os.environ.update({"SERPER_API_KEY": "bench", "SEARCH_CACHE_DB": "", "SERPER_RETRIES": "0"})
+    from benchmarks.bench_serper_client import StandInHandler, start_server
+    from tools import serper_client
+    from tools.serper_client import serper_search_and_parse, serper_batch_search, SERPER_BATCH_CONCURRENCY
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server, url, _ = start_server(tmp, plain=True)
+        serper_client.SERPER_URL = url
+
+        StandInHandler.delay_ms = args.delay_ms
+        rows = []
+        for size in (3, 8):
+            sequential, batched = [], []
+            for r in range(args.rounds):
+                queries = [f"{m} specs {size}/{r} seq" for m in MODELS[:size]]
+                sequential.append(timed(lambda: [serper_search_and_parse(q) for q in queries])[1])
+                queries = [f"{m} specs {size}/{r} batch" for m in MODELS[:size]]
+                results, elapsed = timed(serper_batch_search, queries)
+                assert all(item["ok"] for item in results)
+                batched.append(elapsed)
+            for name, samples in (("sequential", sequential), ("batch", batched)):
+                summary = summarize(samples)
+                rows.append({"queries": size, "path": name, "p50_ms": round(summary["p50_us"] / 1000, 1),
+                             "max_ms": round(max(samples) * 1000, 1)})
+
+        StandInHandler.error_rate = args.error_rate
+        results = serper_batch_search([f"{m} specs failing" for m in MODELS])
+        server.shutdown()
+    print_table(f"Serper fan-out ({args.delay_ms:.0f} ms per search, concurrency {SERPER_BATCH_CONCURRENCY})", rows)
+    print(f"\n{int(args.error_rate * 100)}% 503s, no retries: "
+          + ", ".join(f"{item['q'].split()[0]}={'ok' if item['ok'] else 'failed'}" for item in results))
+
+
+if __name__ == "__main__":
+    main()
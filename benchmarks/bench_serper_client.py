@@ -0,0 +1,118 @@
+"""Serper client: a fresh requests.post per query vs the pooled SerperClient.
+
+Runs a local HTTPS stand-in for google.serper.dev (self-signed certificate
+made with the openssl CLI; plain HTTP with --plain or without openssl), so
+no API quota is spent and the gap is the TCP + TLS handshake that
+keep-alive saves. A second pass makes the server fail a share of requests
+with 503 to exercise the jittered retries.
+
+    python -m benchmarks.bench_serper_client [--repeat 200] [--error-rate 0.2]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from tools.serper_client import SerperClient
+from benchmarks.common import timed, summarize, print_table
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+    error_rate = 0.0
+    delay_ms = 0.0  # simulated search time per request
+
+    def do_POST(self):
+        time.sleep(self.delay_ms / 1000)
+        query = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}").get("q", "")
+        if random.random() < self.error_rate:
+            body, status = b'{"message": "busy"}', 503
+        else:
+            body = json.dumps({"searchParameters": {"q": query}, "organic": [
+                {"title": f"{query} {n}", "snippet": f"Features: Hybrid, AWD, {query}"} for n in range(10)]}).encode()
+            status = 200
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def self_signed_cert(tmp):
+    cert, key = os.path.join(tmp, "cert.pem"), os.path.join(tmp, "key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", key, "-out", cert,
+                    "-days", "1", "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1"],
+                   check=True, capture_output=True)
+    return cert, key
+
+
+def start_server(tmp, plain):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    scheme, verify = "http", True
+    if not plain:
+        cert, key = self_signed_cert(tmp)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme, verify = "https", cert
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{scheme}://127.0.0.1:{server.server_address[1]}/search", verify
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--plain", action="store_true", help="plain HTTP instead of HTTPS")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server, url, verify = start_server(tmp, args.plain or not shutil.which("openssl"))
+        headers = {"X-API-KEY": "bench", "Content-Type": "application/json"}
+
+        def fresh_post(q):
+            """serper_raw_search before the pooled client"""
+            resp = requests.post(url, headers=headers, json={"q": q}, timeout=10, verify=verify)
+            resp.raise_for_status()
+            return resp.json()
+
+        client = SerperClient(url=url, api_key="bench", verify=verify)
+        rows = []
+        for name, fn in (("fresh_requests_post", fresh_post), ("pooled_client", client.raw_search)):
+            samples = [timed(fn, f"RAV4 specs {i % 8}")[1] for i in range(args.repeat)]
+            rows.append({"path": name, "failed": 0, **summarize(samples)})
+
+        StandInHandler.error_rate = args.error_rate
+        retrying = SerperClient(url=url, api_key="bench", verify=verify, retries=3)
+        samples, failed = [], 0
+        for i in range(args.repeat):
+            try:
+                samples.append(timed(retrying.raw_search, f"RAV4 specs {i % 8}")[1])
+            except requests.RequestException:
+                failed += 1
+        rows.append({"path": f"pooled_client_{int(args.error_rate * 100)}pct_503", "failed": failed,
+                     **summarize(samples)})
+        stats = retrying.stats()
+        client.close()
+        retrying.close()
+        server.shutdown()
+    print_table(f"Serper stand-in over {url.split(':')[0].upper()}", rows)
+    print(f"\nretrying client: attempts {stats['attempts']}, retries {stats['retries']}, errors {stats['errors']}")
+    print("latency histogram:", {k: v for k, v in stats["histogram"].items() if v})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Offline Serper: record fixtures once, then replay the search path.
+
+First records responses from the local stand-in server (bench_serper_client)
+through a SERPER_MODE=record client into a temporary fixture directory.
+Then it drives SerperClient.raw_search from ``--threads`` threads against
+replay transports with different latency and error settings. No network
+is used and no API quota is spent. Each setting runs twice with the same
+seed to check the outcome sequence is reproducible (single thread).
+
+    python -m benchmarks.bench_serper_replay [--threads 8] [--calls 400]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.common import summarize, print_table
+
+MODELS = ["RAV4", "Camry", "Corolla", "Highlander", "Tacoma", "Tundra", "Sienna", "Prius", "4Runner", "Sequoia"]
+TOPICS = ["specs", "mpg", "towing capacity", "price"]
+SETTINGS = {
+    "instant": dict(latency_ms=0, jitter_ms=0, error_rate=0),
+    "50ms_jitter20": dict(latency_ms=50, jitter_ms=20, error_rate=0),
+    "50ms_10pct_errors": dict(latency_ms=50, jitter_ms=20, error_rate=0.1),
+}
+
+
+def run(client, queries, threads, calls):
+    """raw_search ``calls`` times over ``threads`` threads; (seconds, latencies, outcomes)"""
+    latencies, outcomes, lock = [], [], threading.Lock()
+    per_thread = calls // threads
+
+    def worker(n):
+        for i in range(per_thread):
+            q = queries[(n * per_thread + i) % len(queries)]
+            start = time.perf_counter()
+            try:
+                client.raw_search(q)
+                outcome = "ok"
+            except Exception as e:
+                outcome = type(e).__name__
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                outcomes.append(outcome)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return time.perf_counter() - start, latencies, outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=400)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = os.path.join(tmp, "fixtures")
+        os.environ["SERPER_FIXTURES"] = fixtures  # read at import
+        from tools.serper_client import SerperClient
+        from tools.serper_replay import ReplayAdapter
+        from benchmarks.bench_serper_client import start_server
+
+        server, url, _ = start_server(tmp, plain=True)
+        queries = [f"{m} {t}" for m in MODELS for t in TOPICS]
+        recorder = SerperClient(url=url, api_key="bench", mode="record")
+        recorded = {q: recorder.raw_search(q) for q in queries}
+        recorder.close()
+        server.shutdown()
+
+        check = SerperClient(url=url, mode="replay")
+        check.session.mount("http://", ReplayAdapter(fixtures, latency_ms=0, jitter_ms=0, error_rate=0))
+        assert all(check.raw_search(q) == recorded[q] for q in queries), "replay differs from recording"
+
+        rows = []
+        for name, setting in SETTINGS.items():
+            client = SerperClient(url=url, mode="replay", retries=2)
+            transport = ReplayAdapter(fixtures, seed=7, **setting)
+            client.session.mount("http://", transport)
+            elapsed, latencies, outcomes = run(client, queries, args.threads, args.calls)
+            repeats = []
+            for _ in range(2):
+                single = SerperClient(url=url, mode="replay", retries=0)
+                single.session.mount("http://", ReplayAdapter(fixtures, seed=11, **dict(setting, latency_ms=0,
+                                                                                        jitter_ms=0)))
+                repeats.append(run(single, queries, 1, 80)[2])
+            summary = summarize(latencies)
+            rows.append({"setting": name, "calls": len(outcomes), "qps": round(len(outcomes) / elapsed),
+                         "p50_ms": round(summary["p50_us"] / 1000, 1), "p95_ms": round(summary["p95_us"] / 1000, 1),
+                         "failed": sum(o != "ok" for o in outcomes), "injected": transport.stats()["injected"],
+                         "retries": client.stats()["retries"], "repeatable": repeats[0] == repeats[1]})
+    print_table(f"replayed Serper ({len(queries)} recorded queries, {args.threads} threads)", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""find_similar_models: web features + overlap scoring vs the similarity index.
+
+The old path fetched a feature list for the model from Serper (one web call
+per request, not timed here) and scored the ZIP's inventory with
+feature_match_tool. The stand-in target features are the union of the
+model's catalog features, which is the best case for that path. The index
+is timed on build, on a catalog refresh, and per lookup. The table also
+lists the closest models for each target as a sanity check.
+
+    python -m benchmarks.bench_similar_models [--scale medium] [--repeat 50]
+"""
+import argparse
+
+from database_setup import query_db
+from feature_matcher import feature_match_tool
+from inventory_query import lookup_inventory, drop_engines
+import similarity_index
+from benchmarks.common import timed, summarize, print_table
+from benchmarks.synthetic_data import synthetic_database
+
+TARGETS = ("RAV4", "Camry", "Tacoma", "Sienna")
+
+
+def catalog_features(model):
+    features = set()
+    for item in lookup_inventory(None, model):
+        features.update(item["features"] if isinstance(item["features"], list) else item["features"].keys())
+    return sorted(features)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", default="medium")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = []
+    with synthetic_database(args.scale):
+        zipcodes = [r[0] for r in query_db("SELECT zipcode FROM Dealership ORDER BY dealership_id LIMIT 20")]
+        index, build = timed(similarity_index.get_similarity_index)
+        _, rebuild = timed(index._build)
+        for model in TARGETS:
+            target = catalog_features(model)
+            old, new = [], []
+            for i in range(args.repeat):
+                candidates = lookup_inventory(zipcodes[i % len(zipcodes)])
+                old.append(timed(feature_match_tool, target, candidates, k=8)[1])
+                new.append(timed(similarity_index.similar_inventory, model, candidates, k=8)[1])
+            ranked = similarity_index.similar_inventory(model, lookup_inventory(zipcodes[0]), k=3) or []
+            rows.append({"model": model,
+                         "overlap_p50_ms": round(summarize(old)["p50_us"] / 1000, 3),
+                         "index_p50_ms": round(summarize(new)["p50_us"] / 1000, 3),
+                         "closest_models": ", ".join(name for name, _ in index.similar_models(model, k=3)),
+                         "top_near_zip": ", ".join(f"{r['model']} {r['trim']}" for r in ranked)})
+        stats = index.stats()
+        similarity_index.drop_similarity_indexes()
+        drop_engines()
+    print_table(f"similar models ({stats['vehicles']} vehicles, vocabulary {stats['vocabulary']}, "
+                f"build {build * 1000:.1f} ms, rebuild {rebuild * 1000:.1f} ms)", rows)
+
+
+if __name__ == "__main__":
+    main()
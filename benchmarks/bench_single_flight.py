@@ -0,0 +1,98 @@
+"""A burst of identical requests with and without single-flight coalescing.
+
+``--sessions`` threads start together behind a barrier and make the same
+call, like Streamlit sessions answering the same question after a
+marketing push. Wall time covers the whole burst, and "executions"
+counts how many times the work actually ran. The tools run against a
+synthetic database with the inventory snapshot off, so every search
+reaches SQLite. Serper runs against the local stand-in from
+bench_serper_client with a memory-only cache, a fresh query every round
+and ``--delay-ms`` per search.
+
+    python -m benchmarks.bench_single_flight [--sessions 32] [--rounds 5]
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.common import print_table
+
+
+def burst(fn, sessions):
+    """Run fn() in ``sessions`` threads released together; (seconds, results)"""
+    barrier = threading.Barrier(sessions + 1)
+    results = [None] * sessions
+
+    def worker(n):
+        barrier.wait()
+        results[n] = fn()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(sessions)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--scale", default="medium")
+    parser.add_argument("--delay-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    # The Serper client and search cache read their settings at import
+    os.environ.update({"SERPER_API_KEY": "bench", "SEARCH_CACHE_DB": "", "INVENTORY_SNAPSHOT": "0"})
+    from database_setup import query_db
+    from single_flight import get_flight
+    from tools import serper_client
+    from benchmarks.bench_serper_client import StandInHandler, start_server
+    from benchmarks.bench_tool_tokens import load_tools_module
+    from benchmarks.synthetic_data import synthetic_database
+
+    tools = load_tools_module()
+    rows = []
+
+    def measure(name, direct, coalesced, flight, inputs):
+        for path, fn in (("direct", direct), ("single_flight", coalesced)):
+            before = flight.stats()["executions"]
+            total = 0.0
+            for arg in inputs:
+                elapsed, results = burst(lambda: fn(arg), args.sessions)
+                assert len(set(map(json.dumps, results))) == 1, (name, path)
+                total += elapsed
+            executions = args.sessions * len(inputs) if path == "direct" else flight.stats()["executions"] - before
+            rows.append({"call": name, "path": path, "calls": args.sessions * len(inputs), "executions": executions,
+                         "burst_ms": round(total / len(inputs) * 1000, 1)})
+
+    with synthetic_database(args.scale):
+        zipcode = query_db("SELECT zipcode FROM Dealership ORDER BY dealership_id LIMIT 1")[0][0]
+        vehicle_id = query_db("SELECT vehicle_id FROM Inventory WHERE available_status = 'available' LIMIT 1")[0][0]
+        searches = [json.dumps({"zipcode": zipcode, "radius_miles": 25 + r, "format": "compact"})
+                    for r in range(args.rounds)]
+        measure("vehicle_search_tool", tools._vehicle_search, tools.vehicle_search_tool,
+                get_flight("vehicle_search"), searches)
+        details = [json.dumps({"vehicle_id": vehicle_id})] * args.rounds
+        measure("get_vehicle_details_tool", tools._vehicle_details, tools.get_vehicle_details_tool,
+                get_flight("vehicle_details"), details)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server, url, _ = start_server(tmp, plain=True)
+        serper_client.SERPER_URL = url
+        StandInHandler.delay_ms = args.delay_ms
+        client = serper_client.get_client()
+        measure("serper_raw_search", client.raw_search, serper_client.serper_raw_search, get_flight("serper"),
+                [f"RAV4 specs round {r}" for r in range(args.rounds)])
+        server.shutdown()
+    print_table(f"{args.sessions} identical concurrent calls per burst", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Free-text inventory search: FTS5/BM25 vs a LIKE scan over Vehicle text.
+
+    python -m benchmarks.bench_text_search [--scale medium] [--repeat 50]
+"""
+import argparse
+
+from database_setup import query_db, parse_search_text, search_inventory_text
+from benchmarks.common import timed, summarize, print_table
+from benchmarks.synthetic_data import synthetic_database
+
+QUERIES = [
+    "white hybrid with AWD under 35k",
+    "rav4 between 25k and 40k",
+    "suv with sunroof and heated seats",
+    "tacoma 4WD over 30k",
+    "blue sports car",
+]
+
+
+def like_search(text, limit=50):
+    """Baseline: any term as a substring of model/trim/color/features JSON"""
+    parsed = parse_search_text(text)
+    clauses, params = [], []
+    for term in parsed["terms"]:
+        clauses.append("(v.model LIKE ? OR v.trim LIKE ? OR v.color LIKE ? OR v.features LIKE ?)")
+        params += [f"%{term}%"] * 4
+    query = ("SELECT v.id, v.model, v.trim, i.id FROM Vehicle v JOIN Inventory i ON i.vehicle_id = v.id "
+             "WHERE i.available_status = 'available'")
+    if clauses:
+        query += " AND (" + " OR ".join(clauses) + ")"
+    if parsed["max_price"] is not None:
+        query += " AND v.rate <= ?"
+        params.append(parsed["max_price"])
+    if parsed["min_price"] is not None:
+        query += " AND v.rate >= ?"
+        params.append(parsed["min_price"])
+    return query_db(query + " ORDER BY v.model, v.trim, i.id LIMIT ?", params + [limit])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", default="medium")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = []
+    with synthetic_database(args.scale):
+        for text in QUERIES:
+            for path, fn in (("fts5_bm25", lambda t: search_inventory_text(t)[0]), ("like_scan", like_search)):
+                samples, result = [], None
+                for _ in range(args.repeat):
+                    result, elapsed = timed(fn, text)
+                    samples.append(elapsed)
+                summary = summarize(samples)
+                top = f"{result[0][1]} {result[0][2]}" if result else "-"
+                rows.append({"query": text, "path": path, "rows_out": len(result), "top": top,
+                             "p50_ms": round(summary["p50_us"] / 1000, 2), "p95_ms": round(summary["p95_us"] / 1000, 2)})
+    print_table(f"free-text search ({args.scale})", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""vehicle_search_tool output size: full JSON pages vs the compact table.
+
+Counts the tokens the agent reads back for one search call. Uses tiktoken
+(cl100k_base) when it is installed, otherwise estimates 4 characters per
+token. "full" is the nested JSON with the default page size; "compact" is
+what the LangChain search_inventory tool returns by default.
+
+    python -m benchmarks.bench_tool_tokens [--scale medium] [--repeat 20]
+"""
+import argparse
+import importlib.util
+import json
+import os
+
+from database_setup import query_db
+from benchmarks.common import timed, summarize, print_table
+from benchmarks.synthetic_data import synthetic_database
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # optional
+    _ENCODING = None
+
+
+def count_tokens(text):
+    return len(_ENCODING.encode(text)) if _ENCODING else (len(text) + 3) // 4
+
+
+def load_tools_module():
+    """tools.py (the tools/ package shadows ``import tools``)"""
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools.py")
+    spec = importlib.util.spec_from_file_location("agent_tools_module", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", default="medium")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tools = load_tools_module()
+    rows = []
+    with synthetic_database(args.scale):
+        zipcode = query_db("SELECT zipcode FROM Dealership ORDER BY dealership_id LIMIT 1")[0][0]
+        cases = {
+            "zipcode": {"zipcode": zipcode},
+            "radius_25mi": {"zipcode": zipcode, "radius_miles": 25},
+            "model_features": {"model": "RAV4", "features": ["awd"]},
+            "free_text": {"search_text": "white hybrid with awd under 35k"},
+        }
+        variants = {
+            "full": {},
+            "full_limit_8": {"limit": 8},
+            "compact": {"format": "compact"},
+            "compact_features": {"format": "compact", "fields": ["model", "trim", "price", "features", "name", "city"]},
+        }
+        for case, query in cases.items():
+            for variant, extra in variants.items():
+                payload = json.dumps(dict(query, **extra))
+                out, _ = timed(tools.vehicle_search_tool, payload)
+                data = json.loads(out)
+                summary = summarize([timed(tools.vehicle_search_tool, payload)[1] for _ in range(args.repeat)])
+                rows.append({"case": case, "output": variant,
+                             "results": len(data.get("results") or data.get("rows") or []),
+                             "more": data.get("more", "?" if data.get("next_cursor") else 0),
+                             "chars": len(out), "tokens": count_tokens(out),
+                             "p50_ms": round(summary["p50_us"] / 1000, 2)})
+    print_table("search tool output" + ("" if _ENCODING else " (tokens estimated at 4 chars)"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run against a throw-away copy of the schema so the checked-in
+toyota_sales.db is never touched. Run them from the repository root, e.g.
+``python -m benchmarks.bench_connection_pool``.
+"""
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+import database_setup
+
+
+@contextmanager
+def temp_database():
+    """Point database_setup at a fresh, initialized temporary database"""
+    original = database_setup.DB_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        database_setup.DB_FILE = path
+        try:
+            database_setup.init_database()
+            yield path
+        finally:
+            database_setup.close_all_pools()
+            database_setup.drop_catalogs()
+            database_setup.DB_FILE = original
+
+
+def timed(fn, *args, **kwargs):
+    """Run fn once and return (result, elapsed seconds)"""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def summarize(samples):
+    """Latency summary in microseconds for a list of second-valued samples"""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e6
+    return {
+        "n": len(ordered),
+        "mean_us": round(statistics.fmean(ordered) * 1e6, 1),
+        "p50_us": round(pick(0.50), 1),
+        "p95_us": round(pick(0.95), 1),
+        "p99_us": round(pick(0.99), 1),
+    }
+
+
+def print_table(title, rows):
+    """Print a list of dicts as an aligned text table"""
+    print(f"\n== {title} ==")
+    if not rows:
+        print("(no rows)")
+        return
+    headers = list(rows[0].keys())
+    widths = [max(len(str(h)), *(len(str(r.get(h, ""))) for r in rows)) for h in headers]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    for r in rows:
+        print("  ".join(str(r.get(h, "")).ljust(w) for h, w in zip(headers, widths)))
@@ -0,0 +1,256 @@
+"""Deterministic synthetic dataset generator for scale benchmarks.
+
+Fills the existing schema with N dealerships across real metro ZIP areas,
+M vehicle configurations with varied features JSON, an Inventory table
+loaded through dealer_feed.load_feed (the bulk-insert path), and a
+history of Customer, TestDrive and Feedback rows. The same seed always
+produces the same database.
+
+    python -m benchmarks.synthetic_data --db big.db --scale medium
+    python -m benchmarks.synthetic_data --db big.db --dealers 2000 --inventory 5000000
+"""
+import argparse
+import json
+import os
+import random
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import database_setup
+from database_setup import transaction
+from dealer_feed import chunked, load_feed
+from benchmarks.common import temp_database
+
+# Inventory sizes used across the benchmarks: 10^3, 10^5, 10^7 rows
+SCALES = {
+    "small": {"dealers": 20, "vehicles": 100, "inventory": 1_000, "customers": 200, "test_drives": 300},
+    "medium": {"dealers": 500, "vehicles": 400, "inventory": 100_000, "customers": 20_000, "test_drives": 30_000},
+    "large": {"dealers": 5_000, "vehicles": 800, "inventory": 10_000_000, "customers": 1_000_000, "test_drives": 2_000_000},
+}
+
+# (city, state, 3-digit ZIP prefix, latitude, longitude) for US metros
+METROS = [
+    ("Los Angeles", "CA", "900", 34.05, -118.24), ("San Jose", "CA", "951", 37.34, -121.89),
+    ("San Diego", "CA", "921", 32.72, -117.16), ("San Francisco", "CA", "941", 37.77, -122.42),
+    ("Sacramento", "CA", "958", 38.58, -121.49), ("Seattle", "WA", "981", 47.61, -122.33),
+    ("Portland", "OR", "972", 45.52, -122.68), ("Phoenix", "AZ", "850", 33.45, -112.07),
+    ("Las Vegas", "NV", "891", 36.17, -115.14), ("Denver", "CO", "802", 39.74, -104.99),
+    ("Dallas", "TX", "752", 32.78, -96.80), ("Houston", "TX", "770", 29.76, -95.37),
+    ("Austin", "TX", "787", 30.27, -97.74), ("San Antonio", "TX", "782", 29.42, -98.49),
+    ("Chicago", "IL", "606", 41.88, -87.63), ("Minneapolis", "MN", "554", 44.98, -93.27),
+    ("Detroit", "MI", "482", 42.33, -83.05), ("Columbus", "OH", "432", 39.96, -83.00),
+    ("Atlanta", "GA", "303", 33.75, -84.39), ("Miami", "FL", "331", 25.76, -80.19),
+    ("Orlando", "FL", "328", 28.54, -81.38), ("Tampa", "FL", "336", 27.95, -82.46),
+    ("Charlotte", "NC", "282", 35.23, -80.84), ("Nashville", "TN", "372", 36.16, -86.78),
+    ("Washington", "DC", "200", 38.91, -77.04), ("Philadelphia", "PA", "191", 39.95, -75.17),
+    ("New York", "NY", "100", 40.71, -74.01), ("Boston", "MA", "021", 42.36, -71.06),
+    ("Newark", "NJ", "071", 40.74, -74.17), ("Baltimore", "MD", "212", 39.29, -76.61),
+]
+
+MODELS = {
+    "Camry": ("Sedan", ["LE", "SE", "XLE", "XSE", "TRD"], 26000),
+    "Corolla": ("Sedan", ["L", "LE", "SE", "XSE"], 22000),
+    "Avalon": ("Sedan", ["XLE", "Limited", "Touring"], 37000),
+    "Prius": ("Hybrid", ["L Eco", "LE", "XLE", "Limited"], 25000),
+    "Camry Hybrid": ("Hybrid", ["LE", "SE", "XLE"], 29000),
+    "RAV4": ("SUV", ["LE", "XLE", "XLE Premium", "Adventure", "Limited"], 29000),
+    "RAV4 Hybrid": ("Hybrid", ["LE", "XLE", "SE", "XSE"], 32000),
+    "Highlander": ("SUV", ["L", "LE", "XLE", "Limited", "Platinum"], 36000),
+    "Highlander Hybrid": ("Hybrid", ["LE", "XLE", "Limited"], 40000),
+    "4Runner": ("SUV", ["SR5", "TRD Off-Road", "Limited", "TRD Pro"], 40000),
+    "Sequoia": ("SUV", ["SR5", "Limited", "Platinum"], 60000),
+    "Tacoma": ("Truck", ["SR", "SR5", "TRD Sport", "TRD Off-Road"], 28000),
+    "Tundra": ("Truck", ["SR", "SR5", "Limited", "Platinum"], 38000),
+    "Sienna": ("Minivan", ["LE", "XLE", "Limited"], 38000),
+    "GR86": ("Sports Car", ["Base", "Premium"], 29000),
+    "GR Supra": ("Sports Car", ["2.0", "3.0", "3.0 Premium"], 45000),
+}
+
+COLORS = ["Super White", "Midnight Black", "Celestial Silver", "Magnetic Gray", "Ruby Flare Pearl",
+          "Barcelona Red", "Army Green", "Blueprint", "Wind Chill Pearl", "Lunar Rock", "Cavalry Blue"]
+
+ENGINES = {
+    "Sedan": ["1.8L 4-Cylinder", "2.0L 4-Cylinder", "2.5L 4-Cylinder", "3.5L V6"],
+    "Hybrid": ["1.8L Hybrid", "2.0L Hybrid", "2.5L Hybrid", "3.5L Hybrid"],
+    "SUV": ["2.5L 4-Cylinder", "3.5L V6", "4.0L V6", "3.4L Twin-Turbo V6"],
+    "Truck": ["2.7L 4-Cylinder", "3.5L V6", "3.5L Twin-Turbo V6"],
+    "Minivan": ["2.5L Hybrid"],
+    "Sports Car": ["2.4L Boxer-4", "2.0L Turbo", "3.0L Turbo I6"],
+}
+
+INVENTORY_STATUSES = [("available", 85), ("reserved", 5), ("sold", 7), ("maintenance", 3)]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn",
+               "Rahul", "Priya", "Wei", "Mei", "Carlos", "Maria", "Omar", "Fatima", "Ivan", "Olga"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Patel", "Johnson", "Nguyen", "Kim", "Brown", "Lopez", "Singh"]
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def make_features(rng, category):
+    """Varied features dict in the same shape as SAMPLE_VEHICLES"""
+    city, hwy = (rng.randint(40, 58), rng.randint(38, 53)) if category in ("Hybrid", "Minivan") else (rng.randint(15, 32), rng.randint(19, 41))
+    features = {
+        "engine": rng.choice(ENGINES[category]),
+        "mpg": f"{city}/{hwy}",
+        "transmission": rng.choice(["CVT", "6-Speed Automatic", "8-Speed Automatic", "10-Speed Automatic"]),
+        "safety": rng.choice(["Toyota Safety Sense 2.0", "Toyota Safety Sense 2.5", "Toyota Safety Sense 2.5+", "Toyota Safety Sense 3.0"]),
+    }
+    if category in ("SUV", "Truck", "Hybrid") and rng.random() < 0.7:
+        features["drivetrain"] = rng.choice(["AWD", "4WD"] if category != "Hybrid" else ["AWD", "FWD"])
+    if category in ("SUV", "Minivan"):
+        features["seats"] = rng.choice([5, 7, 8])
+    if category in ("Truck", "SUV") and rng.random() < 0.6:
+        features["towing"] = f"{rng.choice([1500, 3500, 5000, 6800, 8000, 12000])} lbs"
+    if category == "Truck":
+        features["bed"] = rng.choice(["5 ft", "5.5 ft", "6.1 ft", "6.5 ft", "8.1 ft"])
+    if category == "Hybrid":
+        features["emissions"] = rng.choice(["Ultra Low", "Super Ultra Low"])
+    for extra in ("sunroof", "heated seats", "leather", "navigation", "panoramic roof", "wireless charging"):
+        if rng.random() < 0.25:
+            features[extra] = "Yes"
+    return features
+
+
+def _zip_centroid_rows(rng):
+    """Centroids for every synthetic ZIP (metro prefix + 00..99), scattered
+    ~0.3 degrees around the metro center"""
+    for _, _, prefix, lat, lon in METROS:
+        for n in range(100):
+            yield f"{prefix}{n:02d}", round(lat + rng.uniform(-0.3, 0.3), 4), round(lon + rng.uniform(-0.3, 0.3), 4)
+
+
+def _dealer_rows(rng, count):
+    for n in range(count):
+        city, state, prefix, _, _ = METROS[n % len(METROS)]
+        zipcode = f"{prefix}{rng.randint(1, 99):02d}"
+        yield (f"Toyota of {city} #{n + 1}", city, zipcode, f"{rng.randint(100, 9999)} {rng.choice(['Main', 'Oak', 'Commerce', 'Market', 'Park'])} St",
+               f"dealer{n + 1}@toyota.example", f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}")
+
+
+def _vehicle_rows(rng, count):
+    names = sorted(MODELS)
+    for n in range(count):
+        model = names[n % len(names)]
+        category, trims, base = MODELS[model]
+        trim = trims[(n // len(names)) % len(trims)]
+        yield ("Toyota", model, trim, rng.choice(COLORS), float(round(base * rng.uniform(0.95, 1.45), -2)),
+               json.dumps(make_features(rng, category)))
+
+
+def _inventory_records(rng, count, dealer_ids, vehicle_ids):
+    for n in range(count):
+        yield {
+            "vin": f"SYN{n:014d}",
+            "dealership_id": rng.choice(dealer_ids),
+            "vehicle_id": rng.choice(vehicle_ids),
+            "status": _weighted(rng, INVENTORY_STATUSES),
+        }
+
+
+def generate_dataset(dealers, vehicles, inventory, customers, test_drives, seed=42,
+                     anchor=date(2025, 6, 1), chunk_size=50_000):
+    """Append a deterministic synthetic dataset to database_setup.DB_FILE.
+
+    Test drive dates span two years before ``anchor`` to 30 days after it.
+    """
+    rng = random.Random(seed)
+    stats = {}
+    with transaction() as conn:
+        # Separate generator so the rest of the dataset is unchanged by it
+        conn.executemany("INSERT OR IGNORE INTO ZipCentroid (zipcode, latitude, longitude) VALUES (?, ?, ?)",
+                         _zip_centroid_rows(random.Random(seed + 1)))
+        conn.executemany(
+            "INSERT INTO Dealership (dealership_name, city, zipcode, address, email, phone) VALUES (?, ?, ?, ?, ?, ?)",
+            _dealer_rows(rng, dealers),
+        )
+        dealer_ids = [r[0] for r in conn.execute("SELECT dealership_id FROM Dealership ORDER BY dealership_id")]
+        conn.executemany(
+            "INSERT INTO Salesperson (salesperson_name, email, phone, dealership_id) VALUES (?, ?, ?, ?)",
+            ((f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"sales{d}.{k}@toyota.example", None, d)
+             for d in dealer_ids for k in range(rng.randint(2, 5))),
+        )
+        conn.executemany(
+            "INSERT INTO Vehicle (make, model, trim, color, rate, features) VALUES (?, ?, ?, ?, ?, ?)",
+            _vehicle_rows(rng, vehicles),
+        )
+        vehicle_ids = [r[0] for r in conn.execute("SELECT id FROM Vehicle ORDER BY id")]
+        salespeople = {}
+        for sp_id, d in conn.execute("SELECT salesperson_id, dealership_id FROM Salesperson"):
+            salespeople.setdefault(d, []).append(sp_id)
+
+    stats["inventory"] = load_feed(_inventory_records(rng, inventory, dealer_ids, vehicle_ids), chunk_size=chunk_size)
+
+    with transaction() as conn:
+        for chunk in chunked(range(customers), chunk_size):
+            conn.executemany(
+                "INSERT OR IGNORE INTO Customer (customer_name, email, phone, zipcode, city) VALUES (?, ?, ?, ?, ?)",
+                [(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"customer{n}@example.com",
+                  f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+                  f"{METROS[n % len(METROS)][2]}{rng.randint(1, 99):02d}", METROS[n % len(METROS)][0])
+                 for n in chunk],
+            )
+        customer_ids = [r[0] for r in conn.execute("SELECT customer_id FROM Customer ORDER BY customer_id")]
+
+        feedback = 0
+        for chunk in chunked(range(test_drives), chunk_size):
+            rows = []
+            for _ in chunk:
+                dealer_id = rng.choice(dealer_ids)
+                day = anchor + timedelta(days=rng.randint(-730, 30))
+                status = "scheduled" if day >= anchor else _weighted(rng, [("completed", 70), ("no_show", 15), ("cancelled", 15)])
+                rows.append((rng.choice(customer_ids), dealer_id, rng.choice(salespeople.get(dealer_id, [None])),
+                             rng.choice(vehicle_ids), day.isoformat(), f"{rng.randint(9, 18):02d}:{rng.choice(['00', '30'])}:00",
+                             "", status, f"{day.isoformat()} 09:00:00"))
+            first = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM TestDrive").fetchone()[0]
+            conn.executemany(
+                "INSERT INTO TestDrive (customer_id, dealership_id, salesperson_id, vehicle_id, date, time, "
+                "special_request, status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            fb_rows = [
+                (first + i, json.dumps({"comfort": rng.randint(1, 5), "performance": rng.randint(1, 5), "salesperson": rng.randint(1, 5)}),
+                 rng.randint(1, 5))
+                for i, row in enumerate(rows) if row[7] == "completed" and rng.random() < 0.6
+            ]
+            conn.executemany("INSERT INTO Feedback (testdrive_id, feedback, overall_experience) VALUES (?, ?, ?)", fb_rows)
+            feedback += len(fb_rows)
+    stats.update({"dealers": dealers, "vehicles": vehicles, "customers": customers,
+                  "test_drives": test_drives, "feedback": feedback})
+    return stats
+
+
+@contextmanager
+def synthetic_database(scale="small", seed=42, **sizes):
+    """Temporary database filled with a synthetic dataset of the given scale"""
+    params = dict(SCALES[scale], **sizes)
+    with temp_database() as path:
+        generate_dataset(seed=seed, **params)
+        yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="database file to create")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    for name in SCALES["small"]:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, dest=name, help=f"override {name} count")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        raise SystemExit(f"{args.db} already exists; choose a new file")
+    params = dict(SCALES[args.scale])
+    params.update({k: getattr(args, k) for k in params if getattr(args, k) is not None})
+
+    database_setup.DB_FILE = args.db
+    database_setup.init_database()
+    stats = generate_dataset(seed=args.seed, **params)
+    inv = stats.pop("inventory")
+    print(f"Generated {stats} and {inv['loaded']:,} inventory rows ({inv['rows_per_s']:,} rows/s) in {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,62 @@
 # database_setup.py
 import sqlite3
+import asyncio
+import csv
 import json
+import math
+import os
+import re
+import queue
+import threading
+import time
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from functools import partial
 from pathlib import Path
 
-DB_FILE = "toyota_sales.db"
+from model_matcher import ModelMatcher, model_key, model_key_sql
+
+DB_FILE = os.getenv("DB_FILE", "toyota_sales.db")
+
+# Connection pool settings
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+HEALTH_CHECK_INTERVAL = 30.0  # seconds a connection may sit idle before it is re-checked
+# Async facade: worker threads running blocking DB calls (capped at POOL_SIZE
+# so every worker can hold a pooled connection without waiting)
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(POOL_SIZE)))
+PAGE_SIZE = 50  # default rows per keyset page
+STREAM_BATCH_SIZE = 500  # rows per fetchmany() when streaming
+# Vehicle catalog: seconds between CatalogVersion checks
+CATALOG_RECHECK_SECONDS = float(os.getenv("CATALOG_RECHECK_SECONDS", "2"))
+
+# Applied once when a connection is opened, not on every query
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+)
+
+# Read-only reporting connections (mode=ro URI; they never take the write lock)
+READ_ONLY_PRAGMAS = (
+    "PRAGMA query_only = ON",
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+)
+# Optional snapshot file for dashboards, refreshed via the backup API
+REPORTING_DB_FILE = os.getenv("REPORTING_DB_FILE")
+REPORTING_SNAPSHOT_INTERVAL = float(os.getenv("REPORTING_SNAPSHOT_INTERVAL", "300"))
+
+# ZIP centroids for radius search: "zipcode,latitude,longitude" CSV or a
+# Census ZCTA gazetteer file (GEOID, INTPTLAT, INTPTLONG columns)
+ZIP_CENTROIDS_FILE = os.getenv("ZIP_CENTROIDS_FILE", str(Path(__file__).with_name("data") / "zip_centroids.csv"))
+MILES_PER_DEGREE_LAT = 69.0
+EARTH_RADIUS_MILES = 3958.8
 
 # Database Schema
 SCHEMA = """
@@ -91,6 +144,207 @@ CREATE TABLE IF NOT EXISTS Feedback (
 );
 """
 
+# Explodes {v}.features JSON into VehicleFeature rows. Objects become
+# key/value pairs; list items become keys with value 'yes'.
+_VEHICLE_FEATURE_SYNC = """INSERT OR REPLACE INTO VehicleFeature (vehicle_id, key, value, num_value)
+    SELECT {v}.id,
+           lower(trim(CASE WHEN typeof(j.key) = 'integer' THEN CAST(j.value AS TEXT) ELSE j.key END)),
+           CASE WHEN typeof(j.key) = 'integer' THEN 'yes' ELSE lower(CAST(j.value AS TEXT)) END,
+           CASE WHEN typeof(j.key) != 'integer' AND ltrim(replace(CAST(j.value AS TEXT), ',', '')) GLOB '[0-9]*'
+                THEN CAST(replace(CAST(j.value AS TEXT), ',', '') AS REAL) END
+    FROM {source}json_each(CASE WHEN json_valid({v}.features) THEN {v}.features ELSE '{{}}' END) AS j"""
+
+# Centroid of a ZIP: exact 5-digit match, else the mean of known ZIPs
+# sharing its 3-digit prefix
+_ZIP_CENTROID_SQL = """COALESCE(
+        (SELECT {col} FROM ZipCentroid WHERE zipcode = substr({z}, 1, 5)),
+        (SELECT avg({col}) FROM ZipCentroid
+         WHERE zipcode >= substr({z}, 1, 3) AND zipcode < substr({z}, 1, 3) || ':'))"""
+
+
+def _locate_dealership_sql(z, where):
+    return (f"UPDATE Dealership SET latitude = {_ZIP_CENTROID_SQL.format(col='latitude', z=z)}, "
+            f"longitude = {_ZIP_CENTROID_SQL.format(col='longitude', z=z)} WHERE {where}")
+
+
+# Vehicle categories by model; also indexed for free-text search
+VEHICLE_CATEGORIES = {
+    "Sedan": ["Camry", "Corolla", "Avalon"],
+    "SUV": ["RAV4", "Highlander", "4Runner", "Sequoia", "Land Cruiser"],
+    "Hybrid": ["Prius", "Camry Hybrid", "RAV4 Hybrid", "Highlander Hybrid"],
+    "Truck": ["Tacoma", "Tundra"],
+    "Sports Car": ["GR86", "GR Supra"],
+    "Minivan": ["Sienna"]
+}
+
+# Flattened text for VehicleSearch: categories of the model, and feature
+# keys with their values ("drivetrain AWD"; bare key for yes/true flags)
+_VEHICLE_CATEGORY_SQL = "trim(" + " || ".join(
+    "CASE WHEN {v}.model IN (" + ", ".join(f"'{m}'" for m in models) + f") THEN '{category} ' ELSE '' END"
+    for category, models in VEHICLE_CATEGORIES.items()
+) + ")"
+_VEHICLE_FEATURE_TEXT_SQL = """(SELECT group_concat(
+        CASE WHEN typeof(j.key) = 'integer' THEN CAST(j.value AS TEXT)
+             WHEN lower(CAST(j.value AS TEXT)) IN ('yes', 'true', '1', 'standard') THEN j.key
+             ELSE j.key || ' ' || CAST(j.value AS TEXT) END, ' ')
+     FROM json_each(CASE WHEN json_valid({v}.features) THEN {v}.features ELSE '{{}}' END) AS j)"""
+
+
+def _vehicle_search_insert_sql(v, source=""):
+    return (f"INSERT INTO VehicleSearch (rowid, model, trim, color, category, features) "
+            f"SELECT {v}.id, {v}.model, {v}.trim, {v}.color, {_VEHICLE_CATEGORY_SQL.format(v=v)}, "
+            f"{_VEHICLE_FEATURE_TEXT_SQL.format(v=v)}{source}")
+
+
+# Schema migrations: (version, description, script). Applied in order by
+# migrate(); every step must be idempotent so re-running is always safe.
+# Use IF [NOT] EXISTS guards; ALTER TABLE ... ADD COLUMN has none, so
+# migrate() skips those statements when the column is already there.
+MIGRATIONS = [
+    (1, "baseline schema", SCHEMA),
+    (2, "indexes for inventory search, test drive listing and reservations", """
+CREATE INDEX IF NOT EXISTS idx_dealership_zipcode ON Dealership(zipcode, dealership_id);
+CREATE INDEX IF NOT EXISTS idx_inventory_dealer_status ON Inventory(dealership_id, available_status, vehicle_id);
+CREATE INDEX IF NOT EXISTS idx_inventory_vehicle_dealer_status ON Inventory(vehicle_id, dealership_id, available_status);
+CREATE INDEX IF NOT EXISTS idx_testdrive_date_time ON TestDrive(date, time);
+CREATE INDEX IF NOT EXISTS idx_testdrive_status ON TestDrive(status);
+"""),
+    (3, "normalized VehicleFeature table kept in sync with Vehicle.features", f"""
+CREATE TABLE IF NOT EXISTS VehicleFeature (
+    vehicle_id INTEGER NOT NULL,
+    key TEXT NOT NULL,       -- lower-cased JSON key (or the item for list-style features)
+    value TEXT,              -- lower-cased value text
+    num_value REAL,          -- leading number of value, e.g. 5000 for '5000 lbs'
+    PRIMARY KEY (vehicle_id, key),
+    FOREIGN KEY (vehicle_id) REFERENCES Vehicle(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_vehicle_feature_key_num ON VehicleFeature(key, num_value);
+CREATE INDEX IF NOT EXISTS idx_vehicle_feature_value ON VehicleFeature(value);
+
+CREATE TRIGGER IF NOT EXISTS trg_vehicle_feature_insert AFTER INSERT ON Vehicle BEGIN
+    {_VEHICLE_FEATURE_SYNC.format(v="NEW", source="")};
+END;
+CREATE TRIGGER IF NOT EXISTS trg_vehicle_feature_update AFTER UPDATE OF features ON Vehicle BEGIN
+    DELETE FROM VehicleFeature WHERE vehicle_id = OLD.id;
+    {_VEHICLE_FEATURE_SYNC.format(v="NEW", source="")};
+END;
+CREATE TRIGGER IF NOT EXISTS trg_vehicle_feature_delete AFTER DELETE ON Vehicle BEGIN
+    DELETE FROM VehicleFeature WHERE vehicle_id = OLD.id;
+END;
+
+DELETE FROM VehicleFeature;
+{_VEHICLE_FEATURE_SYNC.format(v="Vehicle", source="Vehicle, ")};
+"""),
+    (4, "ZIP centroids, dealership coordinates and R*Tree for radius search", f"""
+CREATE TABLE IF NOT EXISTS ZipCentroid (
+    zipcode TEXT PRIMARY KEY,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL
+) WITHOUT ROWID;
+ALTER TABLE Dealership ADD COLUMN latitude REAL;
+ALTER TABLE Dealership ADD COLUMN longitude REAL;
+CREATE VIRTUAL TABLE IF NOT EXISTS DealershipGeo USING rtree(dealership_id, min_lat, max_lat, min_lon, max_lon);
+
+-- Dealers without explicit coordinates are placed at their ZIP centroid
+CREATE TRIGGER IF NOT EXISTS trg_dealership_locate AFTER INSERT ON Dealership
+WHEN NEW.latitude IS NULL OR NEW.longitude IS NULL BEGIN
+    {_locate_dealership_sql("NEW.zipcode", "dealership_id = NEW.dealership_id")};
+END;
+CREATE TRIGGER IF NOT EXISTS trg_dealership_relocate AFTER UPDATE OF zipcode ON Dealership
+WHEN NEW.zipcode IS NOT OLD.zipcode BEGIN
+    {_locate_dealership_sql("NEW.zipcode", "dealership_id = NEW.dealership_id")};
+END;
+CREATE TRIGGER IF NOT EXISTS trg_dealership_geo_insert AFTER INSERT ON Dealership
+WHEN NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL BEGIN
+    INSERT OR REPLACE INTO DealershipGeo VALUES (NEW.dealership_id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_dealership_geo_update AFTER UPDATE OF latitude, longitude ON Dealership BEGIN
+    DELETE FROM DealershipGeo WHERE dealership_id = OLD.dealership_id;
+    INSERT INTO DealershipGeo SELECT NEW.dealership_id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude
+    WHERE NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_dealership_geo_delete AFTER DELETE ON Dealership BEGIN
+    DELETE FROM DealershipGeo WHERE dealership_id = OLD.dealership_id;
+END;
+"""),
+    (5, "InventoryChange log for incremental in-memory inventory snapshots", """
+-- Row-level inventory changes (new rows are found by id watermark instead);
+-- inventory_id NULL means a vehicle or dealer changed and readers rebuild
+CREATE TABLE IF NOT EXISTS InventoryChange (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    inventory_id INTEGER
+);
+CREATE TRIGGER IF NOT EXISTS trg_inventory_change_update AFTER UPDATE OF available_status, vehicle_id, dealership_id, vin ON Inventory
+WHEN NEW.available_status IS NOT OLD.available_status OR NEW.vehicle_id IS NOT OLD.vehicle_id
+  OR NEW.dealership_id IS NOT OLD.dealership_id OR NEW.vin IS NOT OLD.vin BEGIN
+    INSERT INTO InventoryChange (inventory_id) VALUES (NEW.id);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_inventory_change_delete AFTER DELETE ON Inventory BEGIN
+    INSERT INTO InventoryChange (inventory_id) VALUES (OLD.id);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_inventory_change_vehicle_update AFTER UPDATE ON Vehicle BEGIN
+    INSERT INTO InventoryChange (inventory_id) VALUES (NULL);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_inventory_change_vehicle_delete AFTER DELETE ON Vehicle BEGIN
+    INSERT INTO InventoryChange (inventory_id) VALUES (NULL);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_inventory_change_dealer_update AFTER UPDATE ON Dealership BEGIN
+    INSERT INTO InventoryChange (inventory_id) VALUES (NULL);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_inventory_change_dealer_delete AFTER DELETE ON Dealership BEGIN
+    INSERT INTO InventoryChange (inventory_id) VALUES (NULL);
+END;
+-- Keep the last ~100k changes; readers further behind rebuild from scratch
+CREATE TRIGGER IF NOT EXISTS trg_inventory_change_prune AFTER INSERT ON InventoryChange
+WHEN NEW.seq % 10000 = 0 BEGIN
+    DELETE FROM InventoryChange WHERE seq <= NEW.seq - 100000;
+END;
+"""),
+    (6, "VehicleSearch FTS5 index over model, trim, color, category and features", f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS VehicleSearch USING fts5(
+    model, trim, color, category, features,
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+CREATE TRIGGER IF NOT EXISTS trg_vehicle_search_insert AFTER INSERT ON Vehicle BEGIN
+    {_vehicle_search_insert_sql("NEW")};
+END;
+CREATE TRIGGER IF NOT EXISTS trg_vehicle_search_update AFTER UPDATE ON Vehicle BEGIN
+    DELETE FROM VehicleSearch WHERE rowid = OLD.id;
+    {_vehicle_search_insert_sql("NEW")};
+END;
+CREATE TRIGGER IF NOT EXISTS trg_vehicle_search_delete AFTER DELETE ON Vehicle BEGIN
+    DELETE FROM VehicleSearch WHERE rowid = OLD.id;
+END;
+
+DELETE FROM VehicleSearch;
+{_vehicle_search_insert_sql("Vehicle", " FROM Vehicle")};
+"""),
+    (7, "case-insensitive model index for prefix lookups", """
+CREATE INDEX IF NOT EXISTS idx_vehicle_model_nocase ON Vehicle(model COLLATE NOCASE, id);
+"""),
+    (8, "CatalogVersion row bumped on every Vehicle change", """
+CREATE TABLE IF NOT EXISTS CatalogVersion (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+INSERT OR IGNORE INTO CatalogVersion (name, version) VALUES ('vehicle', 0);
+CREATE TRIGGER IF NOT EXISTS trg_catalog_vehicle_insert AFTER INSERT ON Vehicle BEGIN
+    UPDATE CatalogVersion SET version = version + 1 WHERE name = 'vehicle';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_catalog_vehicle_update AFTER UPDATE ON Vehicle BEGIN
+    UPDATE CatalogVersion SET version = version + 1 WHERE name = 'vehicle';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_catalog_vehicle_delete AFTER DELETE ON Vehicle BEGIN
+    UPDATE CatalogVersion SET version = version + 1 WHERE name = 'vehicle';
+END;
+"""),
+    (9, "normalized model_key column and index for exact model lookups", f"""
+ALTER TABLE Vehicle ADD COLUMN model_key TEXT GENERATED ALWAYS AS ({model_key_sql("model")}) VIRTUAL;
+CREATE INDEX IF NOT EXISTS idx_vehicle_model_key ON Vehicle(model_key, id);
+DROP INDEX IF EXISTS idx_vehicle_model_nocase;
+"""),
+]
+
 # Sample Toyota Inventory for North America
 SAMPLE_DEALERSHIPS = [
     ("Toyota of Downtown Los Angeles", "Los Angeles", "90012", "123 Main St", "la@toyota.com", "213-555-0100"),
@@ -159,9 +413,315 @@ SAMPLE_INVENTORY = [
 ]
 
 
-def get_connection():
-    """Get SQLite database connection"""
-    return sqlite3.connect(DB_FILE)
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """Great-circle distance in miles (None if any coordinate is missing)"""
+    if None in (lat1, lon1, lat2, lon2):
+        return None
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _configure_connection(conn, pragmas=CONNECTION_PRAGMAS):
+    """Apply per-connection PRAGMAs and register SQL functions"""
+    for pragma in pragmas:
+        conn.execute(pragma)
+    conn.create_function("haversine_miles", 4, haversine_miles, deterministic=True)
+    return conn
+
+
+def get_connection(db_file=None):
+    """Get a new, configured SQLite database connection (caller closes it)"""
+    conn = sqlite3.connect(db_file or DB_FILE, timeout=BUSY_TIMEOUT_MS / 1000)
+    return _configure_connection(conn)
+
+
+def get_read_only_connection(db_file=None):
+    """Open a configured ``mode=ro`` connection usable from any thread
+    (caller closes it and serializes access)"""
+    conn = sqlite3.connect(
+        Path(db_file or DB_FILE).resolve().as_uri() + "?mode=ro",
+        uri=True,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,
+    )
+    return _configure_connection(conn, READ_ONLY_PRAGMAS)
+
+
+class ConnectionPool:
+    """Bounded pool of long-lived SQLite connections shared across threads.
+
+    Connections are opened lazily up to ``size``; callers beyond that wait for
+    one to be returned. Idle connections are health-checked before reuse.
+    With ``read_only`` the file is opened through a ``mode=ro`` URI, so
+    reads never compete with writers for the write lock under WAL.
+    """
+
+    def __init__(self, db_file=None, size=POOL_SIZE, read_only=False):
+        self.db_file = db_file or DB_FILE
+        self.size = size
+        self.read_only = read_only
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._all = set()
+        self._closed = False
+
+    def _connect(self):
+        if self.read_only:
+            conn = get_read_only_connection(self.db_file)
+        else:
+            conn = sqlite3.connect(
+                self.db_file,
+                timeout=BUSY_TIMEOUT_MS / 1000,
+                check_same_thread=False,
+            )
+            _configure_connection(conn)
+        with self._lock:
+            self._all.add(conn)
+        return conn
+
+    def _discard(self, conn):
+        with self._lock:
+            self._all.discard(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    @staticmethod
+    def _is_healthy(conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self, timeout=None):
+        """Take a connection from the pool, opening one if none is idle"""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("Timed out waiting for a database connection")
+        try:
+            while True:
+                try:
+                    conn, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+                if time.monotonic() - last_used < HEALTH_CHECK_INTERVAL or self._is_healthy(conn):
+                    return conn
+                self._discard(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn):
+        """Return a connection to the pool, rolling back any open transaction"""
+        try:
+            if self._closed:
+                self._discard(conn)
+                return
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put((conn, time.monotonic()))
+            except sqlite3.Error:
+                self._discard(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        with self._lock:
+            opened = len(self._all)
+        return {"db_file": self.db_file, "read_only": self.read_only, "size": self.size,
+                "open": opened, "idle": self._idle.qsize()}
+
+    def close(self):
+        """Close all connections; checked-out connections close on release"""
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_file=None, read_only=False):
+    """Get (or create) the process-wide pool for a database file"""
+    key = (os.path.abspath(db_file or DB_FILE), read_only)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(key[0], read_only=read_only)
+                _pools[key] = pool
+    return pool
+
+
+@contextmanager
+def pooled_connection(db_file=None, read_only=False):
+    """Borrow a pooled connection for the duration of a ``with`` block"""
+    with get_pool(db_file, read_only).connection() as conn:
+        yield conn
+
+
+_snapshot_lock = threading.Lock()
+_snapshot_taken_at = {}
+
+
+def refresh_reporting_snapshot(dest=None, db_file=None):
+    """Copy a consistent snapshot of the live database into ``dest``.
+
+    Uses the sqlite backup API from a read-only connection, so the copy is
+    a single point-in-time view and writers are never blocked under WAL.
+    """
+    with _snapshot_lock:
+        _copy_reporting_snapshot(dest, db_file)
+
+
+def _copy_reporting_snapshot(dest=None, db_file=None):
+    """refresh_reporting_snapshot body; caller holds _snapshot_lock"""
+    dest = dest or REPORTING_DB_FILE
+    if not dest:
+        raise ValueError("No reporting snapshot file configured (REPORTING_DB_FILE)")
+    with pooled_connection(db_file, read_only=True) as src:
+        dst = sqlite3.connect(dest, timeout=BUSY_TIMEOUT_MS / 1000)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+    _snapshot_taken_at[os.path.abspath(dest)] = time.monotonic()
+
+
+@contextmanager
+def reporting_connection(snapshot=True):
+    """Read-only connection for dashboards and analytics.
+
+    Serves from the REPORTING_DB_FILE snapshot when configured and
+    ``snapshot`` is set (refreshing it once it is older than
+    REPORTING_SNAPSHOT_INTERVAL), otherwise from a read-only connection to
+    the live database.
+    """
+    if not (snapshot and REPORTING_DB_FILE):
+        with pooled_connection(read_only=True) as conn:
+            yield conn
+        return
+    taken = _snapshot_taken_at.get(os.path.abspath(REPORTING_DB_FILE))
+    if taken is None:
+        refresh_reporting_snapshot()
+    elif time.monotonic() - taken > REPORTING_SNAPSHOT_INTERVAL:
+        # Only one caller refreshes; others keep reading the previous snapshot
+        if _snapshot_lock.acquire(blocking=False):
+            try:
+                # Another caller may have refreshed between the check and here
+                if _snapshot_taken_at.get(os.path.abspath(REPORTING_DB_FILE)) == taken:
+                    _copy_reporting_snapshot()
+            finally:
+                _snapshot_lock.release()
+    with pooled_connection(REPORTING_DB_FILE, read_only=True) as conn:
+        yield conn
+
+
+def close_all_pools():
+    """Shutdown hook: close every pooled connection"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_all_pools)
+
+
+def get_schema_version(conn):
+    """Return the highest applied migration version (0 for a fresh database)"""
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, description TEXT, "
+        "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+_ADD_COLUMN = re.compile(r"^\s*ALTER TABLE (\w+) ADD COLUMN (\w+)\b[^;]*;[ \t]*\n?", re.I | re.M)
+
+
+def _skip_existing_columns(conn, script):
+    """Drop ALTER TABLE ... ADD COLUMN statements for columns that exist"""
+    def keep(m):
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_xinfo({m.group(1)})")}
+        return "" if m.group(2) in columns else m.group(0)
+    return _ADD_COLUMN.sub(keep, script)
+
+
+def migrate(conn):
+    """Apply pending MIGRATIONS in order, one transaction per step"""
+    current = get_schema_version(conn)
+    conn.commit()
+    applied = []
+    for version, description, script in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version <= current:
+            continue
+        try:
+            conn.executescript(
+                "BEGIN;\n" + _skip_existing_columns(conn, script) + "\n"
+                f"INSERT INTO schema_version (version, description) VALUES ({int(version)}, "
+                + "'" + description.replace("'", "''") + "');\nCOMMIT;"
+            )
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        applied.append(version)
+    return applied
+
+
+def _read_zip_centroids(path):
+    """Yield (zipcode, lat, lon) from a simple CSV or a Census gazetteer file"""
+    with open(path, newline="", encoding="utf-8") as f:
+        first = f.readline()
+        f.seek(0)
+        reader = csv.DictReader(f, delimiter="\t" if "\t" in first else ",")
+        for row in reader:
+            row = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+            zipcode = row.get("zipcode") or row.get("geoid")
+            lat = row.get("latitude") or row.get("intptlat")
+            lon = row.get("longitude") or row.get("intptlong")
+            if not (zipcode and lat and lon):
+                continue
+            try:
+                yield zipcode.zfill(5), float(lat), float(lon)
+            except ValueError:
+                continue
+
+
+def load_zip_centroids(conn, path=None):
+    """Load ZIP centroids and place dealers that have no coordinates yet.
+    Returns the number of centroids loaded."""
+    rows = list(_read_zip_centroids(path or ZIP_CENTROIDS_FILE))
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO ZipCentroid (zipcode, latitude, longitude) VALUES (?, ?, ?)", rows)
+        conn.execute(_locate_dealership_sql("zipcode", "latitude IS NULL OR longitude IS NULL"))
+    return len(rows)
 
 
 def init_database():
@@ -169,8 +729,12 @@ def init_database():
     conn = get_connection()
     cursor = conn.cursor()
     
-    # Create tables
-    cursor.executescript(SCHEMA)
+    # Create or upgrade tables and indexes
+    migrate(conn)
+
+    # Ship-with-the-repo ZIP centroids for radius search
+    if os.path.exists(ZIP_CENTROIDS_FILE) and not conn.execute("SELECT 1 FROM ZipCentroid LIMIT 1").fetchone():
+        load_zip_centroids(conn)
     
     # Insert sample data
     try:
@@ -213,57 +777,295 @@ def init_database():
 
 def query_db(query, params=None):
     """Execute a SELECT query and return results"""
-    conn = get_connection()
-    cursor = conn.cursor()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            results = cursor.fetchall()
+            return results
+        except Exception as e:
+            print(f"Query error: {e}")
+            return []
+
+
+def query_reporting_db(query, params=None, snapshot=True):
+    """Execute a SELECT on the read-only reporting connection"""
     try:
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        results = cursor.fetchall()
-        return results
+        with reporting_connection(snapshot) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params or ())
+            return cursor.fetchall()
     except Exception as e:
-        print(f"Query error: {e}")
+        print(f"Reporting query error: {e}")
         return []
-    finally:
-        conn.close()
 
 
 def insert_data(query, params):
     """Execute an INSERT query and return the last row ID"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(query, params)
-        conn.commit()
-        return cursor.lastrowid
-    except Exception as e:
-        print(f"Insert error: {e}")
-        conn.rollback()
-        return None
-    finally:
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            conn.commit()
+            return cursor.lastrowid
+        except Exception as e:
+            print(f"Insert error: {e}")
+            conn.rollback()
+            return None
 
 
 def update_data(query, params):
     """Execute an UPDATE query"""
-    conn = get_connection()
-    cursor = conn.cursor()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            conn.commit()
+            return cursor.rowcount
+        except Exception as e:
+            print(f"Update error: {e}")
+            conn.rollback()
+            return 0
+
+
+@contextmanager
+def transaction(db_file=None):
+    """Run a block as one BEGIN IMMEDIATE transaction on a pooled connection.
+
+    The write lock is taken up front, so concurrent writers queue on
+    busy_timeout instead of failing at COMMIT. Commits once on success and
+    rolls back on any exception.
+    """
+    with pooled_connection(db_file) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+class BookingRejected(Exception):
+    """Raised inside book_test_drive's transaction to roll it back and
+    return ``result`` to the caller"""
+
+    def __init__(self, result):
+        super().__init__(result.get("error"))
+        self.result = result
+
+
+def book_test_drive(customer, vehicle_id=None, dealership_id=None, salesperson_id=None,
+                    inventory_id=None, date=None, time=None, special_request="", created_at=None):
+    """Book a test drive as a single unit of work.
+
+    Upserts the customer by email, reserves the inventory row only if it is
+    still available, and inserts the TestDrive row, all in one transaction.
+    A ``vehicle_id``/``dealership_id`` passed with ``inventory_id`` must
+    match that inventory row. Returns {"ok": True, ...ids} or
+    {"error": code} with nothing written.
+    """
     try:
-        cursor.execute(query, params)
-        conn.commit()
-        return cursor.rowcount
-    except Exception as e:
-        print(f"Update error: {e}")
-        conn.rollback()
-        return 0
-    finally:
-        conn.close()
+        with transaction() as conn:
+            return _book_test_drive(conn, customer, vehicle_id, dealership_id, salesperson_id, inventory_id,
+                                    date, time, special_request, created_at)
+    except BookingRejected as e:
+        return e.result
+
+
+def _book_test_drive(conn, customer, vehicle_id, dealership_id, salesperson_id, inventory_id, date, time,
+                     special_request, created_at):
+    cur = conn.cursor()
+    if inventory_id:
+        row = cur.execute(
+            "SELECT dealership_id, vehicle_id FROM Inventory WHERE id = ?",
+            (inventory_id,),
+        ).fetchone()
+        if row is None:
+            raise BookingRejected({"error": "inventory_unavailable", "inventory_id": inventory_id})
+        if (vehicle_id and str(vehicle_id) != str(row[1])) or (dealership_id and str(dealership_id) != str(row[0])):
+            raise BookingRejected({"error": "inventory_mismatch", "inventory_id": inventory_id,
+                                   "vehicle_id": row[1], "dealership_id": row[0]})
+        dealership_id, vehicle_id = row
+
+    if not all([customer.get("email"), vehicle_id, dealership_id, date, time]):
+        raise BookingRejected({"error": "missing_required_fields"})
+
+    cur.execute(
+        "INSERT INTO Customer (customer_name, email, phone, zipcode, city) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT(email) DO UPDATE SET customer_name = excluded.customer_name, "
+        "phone = excluded.phone, zipcode = excluded.zipcode, city = excluded.city",
+        (
+            customer.get("name"),
+            customer.get("email"),
+            customer.get("phone"),
+            customer.get("zipcode"),
+            customer.get("city"),
+        ),
+    )
+    customer_id = cur.execute(
+        "SELECT customer_id FROM Customer WHERE email = ?", (customer.get("email"),)
+    ).fetchone()[0]
+
+    if inventory_id:
+        cur.execute(
+            "UPDATE Inventory SET available_status = 'reserved' "
+            "WHERE id = ? AND available_status = 'available'",
+            (inventory_id,),
+        )
+        if cur.rowcount != 1:
+            raise BookingRejected({"error": "inventory_unavailable", "inventory_id": inventory_id})
+
+    cur.execute(
+        "INSERT INTO TestDrive (customer_id, dealership_id, salesperson_id, vehicle_id, date, time, "
+        "special_request, status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, 'scheduled', "
+        "COALESCE(?, CURRENT_TIMESTAMP))",
+        (customer_id, dealership_id, salesperson_id, vehicle_id, date, time, special_request, created_at),
+    )
+    return {
+        "ok": True,
+        "testdrive_id": cur.lastrowid,
+        "customer_id": customer_id,
+        "inventory_id": inventory_id,
+    }
+
+
+# Hot queries shared with ui/admin_dashboard.py; check_query_plans() guards them
+TEST_DRIVES_SELECT = (
+    "SELECT td.id, td.date, td.time, td.status, td.special_request, td.created_at, "
+    "c.customer_name, c.email, c.phone, c.zipcode, "
+    "v.make, v.model, v.trim, v.color, v.rate, "
+    "d.dealership_name, d.city AS dealer_city, "
+    "COALESCE(s.salesperson_name, ''), COALESCE(s.email, '') "
+    "FROM TestDrive td JOIN Customer c ON td.customer_id = c.customer_id "
+    "JOIN Vehicle v ON td.vehicle_id = v.id "
+    "JOIN Dealership d ON td.dealership_id = d.dealership_id "
+    "LEFT JOIN Salesperson s ON td.salesperson_id = s.salesperson_id"
+)
+TEST_DRIVE_KEY = ("td.date", "td.time", "td.id")
+TEST_DRIVES_QUERY = TEST_DRIVES_SELECT + " ORDER BY td.date DESC, td.time DESC, td.id DESC"
+
+RESERVED_INVENTORY_QUERY = (
+    "SELECT id FROM Inventory WHERE vehicle_id = ? AND dealership_id = ? "
+    "AND available_status = 'reserved' ORDER BY id LIMIT 1"
+)
+
+
+_FEATURE_COMPARISON = re.compile(r"^\s*([a-z][a-z _-]*?)\s*(>=|<=|>|<|=)\s*([0-9][0-9,]*(?:\.[0-9]+)?)", re.I)
+
+
+def parse_feature_filter(term):
+    """Parse a feature filter: 'towing >= 5000' -> ('num', 'towing', '>=', 5000.0),
+    anything else -> ('text', 'awd') matched against feature keys and values"""
+    m = _FEATURE_COMPARISON.match(str(term))
+    if m:
+        key, op, number = m.groups()
+        return ("num", key.strip().lower(), op, float(number.replace(",", "")))
+    return ("text", str(term).strip().lower())
+
+
+def feature_filter_sql(term):
+    """SQL predicate (on v.id) and params for one feature filter"""
+    parsed = parse_feature_filter(term)
+    if parsed[0] == "num":
+        _, key, op, number = parsed
+        return (f"v.id IN (SELECT vehicle_id FROM VehicleFeature WHERE key = ? AND num_value {op} ?)",
+                [key, number])
+    text = parsed[1]
+    return ("v.id IN (SELECT vehicle_id FROM VehicleFeature WHERE instr(key, ?) > 0 OR instr(value, ?) > 0)",
+            [text, text])
+
+
+def keyset_sql(columns, after, descending=False):
+    """Return (clause, params) selecting rows strictly past the ``after``
+    cursor in ``columns`` order, as a row-value comparison"""
+    op = "<" if descending else ">"
+    return f"({', '.join(columns)}) {op} ({', '.join('?' * len(columns))})", list(after)
+
+
+def order_by_sql(columns, descending=False):
+    direction = " DESC" if descending else ""
+    return " ORDER BY " + ", ".join(c + direction for c in columns)
+
+
+# Trim is nullable; keying on COALESCE keeps row-value cursor comparisons
+# from evaluating to NULL (a NULL trim sorts with '', ties broken by id)
+INVENTORY_KEY = ("v.model", "COALESCE(v.trim, '')", "i.id")
+INVENTORY_NEAR_KEY = ("distance_miles",) + INVENTORY_KEY
+
+
+def bounding_box(lat, lon, radius_miles):
+    """(min_lat, max_lat, min_lon, max_lon) enclosing a radius around a point"""
+    dlat = radius_miles / MILES_PER_DEGREE_LAT
+    dlon = radius_miles / (MILES_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def zip_centroid(zipcode, conn=None):
+    """(lat, lon) for a ZIP from ZipCentroid (3-digit prefix fallback), or None"""
+    if conn is None:
+        with pooled_connection() as pooled:
+            return zip_centroid(zipcode, pooled)
+    row = conn.execute(
+        f"SELECT {_ZIP_CENTROID_SQL.format(col='latitude', z='?1')}, {_ZIP_CENTROID_SQL.format(col='longitude', z='?1')}",
+        (str(zipcode).strip(),),
+    ).fetchone()
+    return (row[0], row[1]) if row and row[0] is not None else None
 
 
-def get_inventory_by_zipcode(zipcode, model=None):
-    """Get available inventory near a zipcode"""
-    query = """
+def dealers_within(lat, lon, radius_miles, conn=None):
+    """[(dealership_id, distance_miles)] within the radius, nearest first.
+    The R*Tree narrows to the bounding box; haversine makes the cut."""
+    if conn is None:
+        with pooled_connection() as pooled:
+            return dealers_within(lat, lon, radius_miles, pooled)
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_miles)
+    rows = conn.execute(
+        "SELECT dealership_id, haversine_miles(?, ?, min_lat, min_lon) AS distance_miles FROM DealershipGeo "
+        "WHERE min_lat >= ? AND max_lat <= ? AND min_lon >= ? AND max_lon <= ?",
+        (lat, lon, min_lat, max_lat, min_lon, max_lon),
+    ).fetchall()
+    return sorted(((int(d), dist) for d, dist in rows if dist <= radius_miles), key=lambda r: r[1])
+
+
+def build_inventory_query(zipcode=None, model=None, trim=None, color=None, features=None, features_match="any",
+                          after=None, limit=None, near=None, vehicle_ids=None, dealer_ids=None):
+    """Build the available-inventory query used by get_inventory_by_zipcode.
+
+    ``features`` are feature filters ('AWD', 'towing >= 5000') evaluated
+    against VehicleFeature; ``features_match`` is 'any' or 'all'. Rows are
+    ordered by (model, trim, inventory id); ``after`` is a cursor from
+    inventory_cursor() and ``limit`` caps the page.
+
+    ``near`` = (lat, lon, radius_miles) replaces the exact ZIP match with a
+    radius search over DealershipGeo: rows gain a trailing distance_miles
+    column and are ordered nearest first. ``vehicle_ids`` and
+    ``dealer_ids`` restrict the search to those vehicles and dealers
+    (``dealer_ids`` replaces the ZIP match).
+    """
+    params = []
+    if near:
+        lat, lon, radius_miles = near
+        query = """
+    SELECT v.id, v.model, v.trim, v.color, v.rate, v.features, 
+           d.dealership_name, d.city, d.zipcode, d.address, d.phone,
+           i.id as inventory_id, i.vin,
+           haversine_miles(?, ?, g.min_lat, g.min_lon) AS distance_miles
+    FROM DealershipGeo g
+    JOIN Dealership d ON d.dealership_id = g.dealership_id
+    JOIN Inventory i ON i.dealership_id = d.dealership_id
+    JOIN Vehicle v ON v.id = i.vehicle_id
+    WHERE i.available_status = 'available'
+      AND g.min_lat >= ? AND g.max_lat <= ? AND g.min_lon >= ? AND g.max_lon <= ?
+      AND distance_miles <= ?
+    """
+        params.extend([lat, lon, *bounding_box(lat, lon, radius_miles), radius_miles])
+        order_key = INVENTORY_NEAR_KEY
+    else:
+        query = """
     SELECT v.id, v.model, v.trim, v.color, v.rate, v.features, 
            d.dealership_name, d.city, d.zipcode, d.address, d.phone,
            i.id as inventory_id, i.vin
@@ -272,32 +1074,694 @@ def get_inventory_by_zipcode(zipcode, model=None):
     JOIN Dealership d ON i.dealership_id = d.dealership_id
     WHERE i.available_status = 'available'
     """
+        order_key = INVENTORY_KEY
+        if dealer_ids is not None:
+            query += f" AND d.dealership_id IN ({','.join('?' * len(dealer_ids))})"
+            params.extend(dealer_ids)
+        elif zipcode:
+            query += " AND d.zipcode = ?"
+            params.append(zipcode)
     
+    if model:
+        query += " AND v.model_key = ?"
+        params.append(model_key(model))
+
+    if trim:
+        query += " AND LOWER(v.trim) = LOWER(?)"
+        params.append(trim)
+
+    if color:
+        query += " AND LOWER(v.color) = LOWER(?)"
+        params.append(color)
+
+    if vehicle_ids:
+        query += f" AND v.id IN ({','.join('?' * len(vehicle_ids))})"
+        params.extend(vehicle_ids)
+
+    if features:
+        clauses = []
+        for term in features:
+            clause, clause_params = feature_filter_sql(term)
+            clauses.append(clause)
+            params.extend(clause_params)
+        joiner = " AND " if features_match == "all" else " OR "
+        query += " AND (" + joiner.join(clauses) + ")"
+
+    if after:
+        clause, clause_params = keyset_sql(order_key, after)
+        query += " AND " + clause
+        params.extend(clause_params)
+
+    query += order_by_sql(order_key)
+    if limit:
+        query += " LIMIT ?"
+        params.append(int(limit))
+    return query, params
+
+
+def _near(zipcode, radius_miles):
+    """(lat, lon, radius) for a radius search, or None to match the ZIP exactly
+    (no radius requested, or the ZIP has no known centroid)"""
+    if not (zipcode and radius_miles):
+        return None
+    center = zip_centroid(zipcode)
+    return (center[0], center[1], float(radius_miles)) if center else None
+
+
+def canonical_model(model, db_file=None):
+    """Catalog spelling of a model typed by a user ('Rav 4' -> 'RAV4',
+    'Camery' -> 'Camry'); names nothing resembles pass through unchanged"""
+    if not model:
+        return model
+    try:
+        return get_catalog(db_file).get()["model_matcher"].canonical(model) or model
+    except sqlite3.Error:
+        return model
+
+
+def get_inventory_by_zipcode(zipcode, model=None, trim=None, color=None, features=None, features_match="any",
+                             radius_miles=None):
+    """Get available inventory near a zipcode, optionally filtered by trim,
+    color and features. With ``radius_miles`` it covers every dealer within
+    that distance of the ZIP centroid, nearest first."""
+    query, params = build_inventory_query(zipcode, canonical_model(model), trim, color, features, features_match,
+                                          near=_near(zipcode, radius_miles))
+    return query_db(query, params if params else None)
+
+
+def inventory_cursor(row):
+    """Keyset cursor for an inventory row: (model, trim or '', inventory_id),
+    led by distance_miles for radius searches"""
+    if len(row) > 13:
+        return [row[13], row[1], row[2] or "", row[11]]
+    return [row[1], row[2] or "", row[11]]
+
+
+def get_inventory_page(zipcode=None, model=None, trim=None, color=None, features=None, features_match="any",
+                       after=None, limit=PAGE_SIZE, radius_miles=None):
+    """Return (rows, next_cursor) for one keyset page of available inventory.
+
+    next_cursor is None on the last page; pass it back as ``after``.
+    """
+    query, params = build_inventory_query(zipcode, canonical_model(model), trim, color, features, features_match,
+                                          after=after, limit=limit + 1, near=_near(zipcode, radius_miles))
+    return split_page(query_db(query, params), limit, inventory_cursor)
+
+
+def _count_sql(query):
+    """COUNT(*) over an inventory query, without its ORDER BY"""
+    return "SELECT COUNT(*) FROM (" + query.rsplit(" ORDER BY ", 1)[0] + ")"
+
+
+def count_inventory(zipcode=None, model=None, trim=None, color=None, features=None, features_match="any",
+                    radius_miles=None):
+    """Number of available rows get_inventory_page pages through"""
+    query, params = build_inventory_query(zipcode, canonical_model(model), trim, color, features, features_match,
+                                          near=_near(zipcode, radius_miles))
+    rows = query_db(_count_sql(query), params)
+    return rows[0][0] if rows else 0
+
+
+def iter_inventory(zipcode=None, model=None, trim=None, color=None, features=None, features_match="any",
+                   batch_size=STREAM_BATCH_SIZE, radius_miles=None):
+    """Stream available inventory rows without materializing the result"""
+    query, params = build_inventory_query(zipcode, canonical_model(model), trim, color, features, features_match,
+                                          near=_near(zipcode, radius_miles))
+    return stream_query(query, params, batch_size)
+
+
+# Facets: price buckets are [lower, upper) dollar ranges over Vehicle.rate
+PRICE_BUCKETS = [
+    ("Under $25k", None, 25000),
+    ("$25k-$35k", 25000, 35000),
+    ("$35k-$45k", 35000, 45000),
+    ("$45k-$60k", 45000, 60000),
+    ("$60k+", 60000, None),
+]
+FACETS = ("model", "trim", "color", "dealer", "price")
+_PRICE_BUCKET_SQL = "CASE " + " ".join(
+    f"WHEN v.rate < {upper} THEN {n}" for n, (_, _, upper) in enumerate(PRICE_BUCKETS) if upper
+) + f" WHEN v.rate IS NOT NULL THEN {len(PRICE_BUCKETS) - 1} END"
+
+
+def build_facet_query(zipcode=None, dealer_ids=None):
+    """Available inventory counted per (model, trim, color, dealer, price
+    bucket) for a ZIP, a list of dealers, or everywhere"""
+    query = f"""
+    SELECT v.model, v.trim, v.color, d.dealership_name, {_PRICE_BUCKET_SQL} AS bucket, COUNT(*)
+    FROM Inventory i
+    JOIN Vehicle v ON v.id = i.vehicle_id
+    JOIN Dealership d ON d.dealership_id = i.dealership_id
+    WHERE i.available_status = 'available'
+    """
     params = []
-    if zipcode:
+    if dealer_ids is not None:
+        query += f" AND d.dealership_id IN ({','.join('?' * len(dealer_ids))})"
+        params.extend(dealer_ids)
+    elif zipcode:
         query += " AND d.zipcode = ?"
         params.append(zipcode)
-    
-    if model:
-        query += " AND LOWER(v.model) = LOWER(?)"
-        params.append(model)
-    
-    query += " ORDER BY v.model, v.trim"
-    
-    return query_db(query, params if params else None)
+    query += " GROUP BY v.model, v.trim, v.color, d.dealership_id, bucket"
+    return query, params
+
+
+def get_facet_groups(zipcode=None, radius_miles=None):
+    """Grouped counts for a location, fetched in one query. They do not
+    depend on model/trim/color filters, so callers can cache them per
+    location and re-count with count_facets() as the filters change."""
+    near = _near(zipcode, radius_miles)
+    dealer_ids = None
+    if near:
+        dealer_ids = [d for d, _ in dealers_within(*near)]
+        if not dealer_ids:
+            return []
+    query, params = build_facet_query(zipcode, dealer_ids)
+    return [
+        (model, trim, color, dealer, PRICE_BUCKETS[bucket][0] if bucket is not None else None, count)
+        for model, trim, color, dealer, bucket, count in query_db(query, params)
+    ]
+
+
+def count_facets(groups, vehicle_type=None, model=None, trim=None, color=None, dealer=None, price=None):
+    """Available counts per model, trim, color, dealer and price bucket.
+
+    Each facet is counted under every filter except its own, so a chosen
+    model still lists the other models that would match. Model, trim and
+    color compare case-insensitively, as in build_inventory_query. Returns
+    {"total": n, "model": {value: count}, ...}; price keeps bucket order,
+    the rest are sorted by value.
+    """
+    models = {m.lower() for m in VEHICLE_CATEGORIES.get(vehicle_type, [])} if vehicle_type else None
+    wanted = [(n, want) for n, want in enumerate((
+        model.lower() if model else None,
+        trim.lower() if trim else None,
+        color.lower() if color else None,
+        dealer or None,
+        price or None,
+    )) if want is not None]
+    counts = [{} for _ in FACETS]
+    total = 0
+    for row in groups:
+        values, count = row[:5], row[5]
+        keys = [(v or "").lower() for v in values[:3]] + list(values[3:])
+        if models is not None and keys[0] not in models:
+            continue
+        misses = [n for n, want in wanted if keys[n] != want]
+        if len(misses) > 1:
+            continue
+        if not misses:
+            total += count
+        for n, value in enumerate(values):
+            if value is not None and (not misses or misses[0] == n):
+                counts[n][value] = counts[n].get(value, 0) + count
+    counts = dict(zip(FACETS, counts))
+    result = {"total": total}
+    for facet in FACETS:
+        if facet == "price":
+            result[facet] = {label: counts[facet][label] for label, _, _ in PRICE_BUCKETS if label in counts[facet]}
+        else:
+            result[facet] = dict(sorted(counts[facet].items()))
+    return result
+
+
+def get_inventory_facets(zipcode=None, radius_miles=None, vehicle_type=None, model=None, trim=None, color=None,
+                         dealer=None, price=None):
+    """One-query faceted counts of available inventory (see count_facets)"""
+    return count_facets(get_facet_groups(zipcode, radius_miles), vehicle_type, model, trim, color, dealer, price)
+
+
+# A number followed by a unit ("over 50 mpg", "at least 7 seats") is not a price
+_PRICE_UNITS = (
+    r"mpge?|seats?|seaters?|passengers?|people|lbs?|pounds?|tons?|miles?|mi|mph|km|hp|horsepower|kw|kwh|"
+    r"cyl(?:inders?)?|doors?|inch(?:es)?|ft|feet|cu|cubic|liters?|gal(?:lons?)?|years?|yrs?|months?|speeds?"
+)
+_PRICE = r"\$?\s*(\d[\d,]*(?:\.\d+)?)(?![\d,]|\.\d)(?:\s*(k)\b|(?!\s*k\b))(?!\s*(?:" + _PRICE_UNITS + r")\b)"
+_PRICE_RANGE = re.compile(r"\bbetween\s+" + _PRICE + r"\s*(?:and|to|-)\s*" + _PRICE, re.I)
+_PRICE_MAX = re.compile(r"(?:\b(?:under|below|less than|up to|at most|max(?:imum)?|no more than)\b|<=?)\s*" + _PRICE, re.I)
+_PRICE_MIN = re.compile(r"(?:\b(?:over|above|more than|at least|min(?:imum)?)\b|>=?)\s*" + _PRICE, re.I)
+_SEARCH_STOPWORDS = {
+    "a", "an", "the", "with", "and", "or", "for", "in", "of", "on", "to", "me", "my", "i", "im", "want", "need",
+    "looking", "show", "find", "get", "any", "some", "that", "has", "have", "please", "car", "cars", "vehicle",
+    "vehicles", "toyota", "new", "price", "priced", "budget", "around", "near", "dollars", "usd",
+    "over", "under", "above", "below", "at", "least", "most", "more", "less", "than", "can",
+}
+
+
+def _price(number, thousands):
+    value = float(number.replace(",", ""))
+    # "under 35" in a car search means $35k
+    return value * 1000 if thousands or value < 1000 else value
+
+
+def parse_search_text(text):
+    """Split a free-text request into FTS terms and a price range, e.g.
+    'white hybrid with AWD under 35k' -> {'terms': ['white', 'hybrid', 'awd'],
+    'min_price': None, 'max_price': 35000.0}"""
+    text = str(text or "")
+    min_price = max_price = None
+    m = _PRICE_RANGE.search(text)
+    if m:
+        low, high = _price(m.group(1), m.group(2)), _price(m.group(3), m.group(4))
+        min_price, max_price = min(low, high), max(low, high)
+        text = text[:m.start()] + " " + text[m.end():]
+    m = _PRICE_MAX.search(text)
+    if m:
+        max_price = _price(m.group(1), m.group(2))
+        text = text[:m.start()] + " " + text[m.end():]
+    m = _PRICE_MIN.search(text)
+    if m:
+        min_price = _price(m.group(1), m.group(2))
+        text = text[:m.start()] + " " + text[m.end():]
+    terms = []
+    for word in re.findall(r"[\w.\-]+", text.lower()):
+        word = word.strip(".-")
+        if word and word not in _SEARCH_STOPWORDS and word not in terms:
+            terms.append(word)
+    return {"terms": terms, "min_price": min_price, "max_price": max_price}
+
+
+def fts_match_expression(terms):
+    """OR of quoted prefix terms: vehicles matching more terms rank higher"""
+    return " OR ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+
+def build_text_vehicle_query(terms, min_price=None, max_price=None):
+    """Vehicles matching ``terms`` in VehicleSearch with their BM25 score
+    (model weighted highest), best first; without terms every vehicle
+    scores 0"""
+    params = []
+    if terms:
+        query = ("SELECT v.id, s.score, v.model, v.trim "
+                 "FROM (SELECT rowid AS vehicle_id, bm25(VehicleSearch, 10.0, 4.0, 3.0, 3.0, 1.0) AS score "
+                 "FROM VehicleSearch WHERE VehicleSearch MATCH ?) s JOIN Vehicle v ON v.id = s.vehicle_id WHERE 1 = 1")
+        params.append(fts_match_expression(terms))
+    else:
+        query = "SELECT v.id, 0.0 AS score, v.model, v.trim FROM Vehicle v WHERE 1 = 1"
+    if min_price is not None:
+        query += " AND v.rate >= ?"
+        params.append(float(min_price))
+    if max_price is not None:
+        query += " AND v.rate <= ?"
+        params.append(float(max_price))
+    return query + " ORDER BY 2, v.model, v.trim", params
+
+
+def _text_search_scope(zipcode, radius_miles):
+    """(zipcode, dealer_ids) for a text search: with a radius, the dealers
+    within it ([] if none) replace the exact ZIP match"""
+    near = _near(zipcode, radius_miles)
+    if not near:
+        return zipcode, None
+    return None, [d for d, _ in dealers_within(*near)]
+
+
+def search_inventory_text(search_text, zipcode=None, min_price=None, max_price=None, after=None, limit=PAGE_SIZE,
+                          model=None, trim=None, color=None, features=None, features_match="any", radius_miles=None):
+    """Free-text inventory search: (rows, next_cursor), BM25-ranked.
+
+    Rows carry a trailing text_score and are ordered by (score, model, trim,
+    inventory id). Matching vehicles are ranked first (a few hundred at
+    most), then their available inventory is read group by group until the
+    page is full, so no query sorts the whole inventory. Prices stated in
+    the text ('under 35k') apply unless ``min_price``/``max_price`` are set.
+    Model, trim, color, features and radius_miles filter the matches as in
+    get_inventory_page (a radius does not change the relevance order).
+    """
+    parsed = parse_search_text(search_text)
+    min_price = parsed["min_price"] if min_price is None else min_price
+    max_price = parsed["max_price"] if max_price is None else max_price
+    vehicle_query, vehicle_params = build_text_vehicle_query(parsed["terms"], min_price, max_price)
+    cursor_group = (after[0], after[1], after[2] or "") if after else None
+    model = canonical_model(model)
+    zipcode, dealer_ids = _text_search_scope(zipcode, radius_miles)
+    if dealer_ids == []:
+        return [], None
+
+    rows = []
+    try:
+        with pooled_connection() as conn:
+            groups = {}
+            for vehicle_id, score, group_model, group_trim in conn.execute(vehicle_query, vehicle_params):
+                key = (score, group_model, group_trim or "")
+                groups.setdefault(key, (group_model, group_trim, []))[2].append(vehicle_id)
+            for group, (group_model, group_trim, vehicle_ids) in groups.items():
+                if cursor_group and group < cursor_group:
+                    continue
+                resume = [group_model, group_trim or "", after[3]] if group == cursor_group else None
+                query, params = build_inventory_query(zipcode, model, trim, color, features, features_match,
+                                                      after=resume, limit=limit + 1 - len(rows),
+                                                      vehicle_ids=vehicle_ids, dealer_ids=dealer_ids)
+                rows.extend(row + (group[0],) for row in conn.execute(query, params))
+                if len(rows) > limit:
+                    break
+    except sqlite3.Error as e:
+        print(f"Text search error: {e}")
+        return [], None
+    return split_page(rows, limit, inventory_cursor)
+
+
+def text_vehicle_ids(search_text, min_price=None, max_price=None):
+    """Vehicles matching a free-text search (prices in the text apply unless given)"""
+    parsed = parse_search_text(search_text)
+    min_price = parsed["min_price"] if min_price is None else min_price
+    max_price = parsed["max_price"] if max_price is None else max_price
+    vehicle_query, vehicle_params = build_text_vehicle_query(parsed["terms"], min_price, max_price)
+    return [r[0] for r in query_db(vehicle_query, vehicle_params)]
+
+
+def count_inventory_text(search_text, zipcode=None, min_price=None, max_price=None, model=None, trim=None, color=None,
+                         features=None, features_match="any", radius_miles=None):
+    """Number of available rows search_inventory_text pages through"""
+    vehicle_ids = text_vehicle_ids(search_text, min_price, max_price)
+    zipcode, dealer_ids = _text_search_scope(zipcode, radius_miles)
+    if not vehicle_ids or dealer_ids == []:
+        return 0
+    query, params = build_inventory_query(zipcode, canonical_model(model), trim, color, features, features_match,
+                                          vehicle_ids=vehicle_ids, dealer_ids=dealer_ids)
+    rows = query_db(_count_sql(query), params)
+    return rows[0][0] if rows else 0
+
+
+INVENTORY_LISTING_SELECT = (
+    "SELECT i.id AS inventory_id, v.id AS vehicle_id, v.make, v.model, v.trim, v.color, v.rate, "
+    "d.dealership_name, d.city, d.zipcode, i.available_status, i.vin "
+    "FROM Inventory i JOIN Vehicle v ON i.vehicle_id = v.id "
+    "JOIN Dealership d ON i.dealership_id = d.dealership_id"
+)
+
+
+def inventory_listing_cursor(row):
+    """Keyset cursor for an admin listing row: (model, trim or '', inventory_id)"""
+    return [row[3], row[4] or "", row[0]]
+
+
+def build_inventory_listing_query(status=None, after=None, limit=None):
+    """Admin inventory listing (every status), ordered by (model, trim, id)"""
+    where, params = [], []
+    if status:
+        where.append("i.available_status = ?")
+        params.append(status)
+    if after:
+        clause, clause_params = keyset_sql(INVENTORY_KEY, after)
+        where.append(clause)
+        params.extend(clause_params)
+    query = INVENTORY_LISTING_SELECT
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += order_by_sql(INVENTORY_KEY)
+    if limit:
+        query += " LIMIT ?"
+        params.append(int(limit))
+    return query, params
+
+
+def build_test_drives_query(status=None, dealership_name=None, date=None, after=None, limit=None):
+    """Test drives newest first, keyset-ordered by (date, time, id)"""
+    where, params = [], []
+    if status:
+        where.append("td.status = ?")
+        params.append(status)
+    if dealership_name:
+        where.append("d.dealership_name = ?")
+        params.append(dealership_name)
+    if date:
+        where.append("td.date = ?")
+        params.append(date)
+    if after:
+        clause, clause_params = keyset_sql(TEST_DRIVE_KEY, after, descending=True)
+        where.append(clause)
+        params.extend(clause_params)
+    query = TEST_DRIVES_SELECT
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += order_by_sql(TEST_DRIVE_KEY, descending=True)
+    if limit:
+        query += " LIMIT ?"
+        params.append(int(limit))
+    return query, params
+
+
+def split_page(rows, limit, cursor_fn):
+    """Trim a limit+1 fetch to ``limit`` rows and derive the next cursor"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, cursor_fn(rows[-1])
+    return rows, None
+
+
+def stream_query(query, params=None, batch_size=STREAM_BATCH_SIZE, reporting=False, snapshot=True):
+    """Yield rows of a SELECT in fetchmany() batches.
+
+    Holds one pooled connection (read-only reporting connection when
+    ``reporting`` is set) until the generator is exhausted or closed, so
+    memory stays flat regardless of result size.
+    """
+    conn_ctx = reporting_connection(snapshot) if reporting else pooled_connection()
+    with conn_ctx as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params or ())
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield from batch
+        except sqlite3.Error as e:
+            print(f"Stream query error: {e}")
+        finally:
+            cursor.close()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor():
+    """Dedicated, bounded executor for database work from async code"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, min(DB_EXECUTOR_WORKERS, POOL_SIZE)),
+                                           thread_name_prefix="db")
+        return _executor
+
+
+def shutdown_db_executor():
+    """Shutdown hook: finish queued DB work and stop the executor threads"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+# Registered after close_all_pools, so it runs first at exit
+atexit.register(shutdown_db_executor)
+
+
+async def run_in_db_executor(fn, *args, **kwargs):
+    """Await a blocking database call on the DB executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), partial(fn, *args, **kwargs))
+
+
+async def aquery_db(query, params=None):
+    return await run_in_db_executor(query_db, query, params)
+
+
+async def aget_inventory_by_zipcode(zipcode, model=None, trim=None, color=None, features=None, features_match="any",
+                                    radius_miles=None):
+    return await run_in_db_executor(get_inventory_by_zipcode, zipcode, model, trim, color, features, features_match,
+                                    radius_miles)
+
+
+async def aget_inventory_page(zipcode=None, model=None, trim=None, color=None, features=None, features_match="any",
+                              after=None, limit=PAGE_SIZE, radius_miles=None):
+    return await run_in_db_executor(get_inventory_page, zipcode, model, trim, color, features, features_match,
+                                    after, limit, radius_miles)
+
+
+async def abook_test_drive(customer, **kwargs):
+    """Async book_test_drive: the whole BEGIN IMMEDIATE transaction runs on
+    one executor thread and one pooled connection"""
+    return await run_in_db_executor(book_test_drive, customer, **kwargs)
+
+
+# Query-plan guard: (name, sql, params, plan aliases that must not be
+# full-scanned, index names that must appear, ORDER BY must come from an index)
+HOT_QUERY_PLANS = [
+    ("inventory_by_zipcode", *build_inventory_query("90012"), ("d", "i"),
+     ("idx_dealership_zipcode", "idx_inventory_dealer_status"), False),
+    ("test_drives_by_date", TEST_DRIVES_QUERY, (), (),
+     ("idx_testdrive_date_time",), True),
+    ("inventory_by_model", *build_inventory_query(model="RAV4"), ("v",),
+     ("idx_vehicle_model_key",), False),
+    ("inventory_within_radius", *build_inventory_query(near=(34.06, -118.24, 25.0)), ("d", "i"),
+     ("VIRTUAL TABLE INDEX", "idx_inventory_dealer_status"), False),
+    ("inventory_text_search_vehicles", *build_text_vehicle_query(["white", "hybrid"], max_price=35000.0), ("v",),
+     ("VIRTUAL TABLE INDEX",), False),
+    ("inventory_facets_by_zipcode", *build_facet_query("90012"), ("d", "i"),
+     ("idx_dealership_zipcode", "idx_inventory_dealer_status"), False),
+    ("test_drives_page", *build_test_drives_query(after=("2025-01-01", "10:00", 1), limit=PAGE_SIZE), (),
+     ("idx_testdrive_date_time",), True),
+    ("test_drives_by_status", "SELECT COUNT(*) FROM TestDrive WHERE status = ?", ("scheduled",), ("TestDrive",),
+     ("idx_testdrive_status",), False),
+    ("reserved_inventory_for_release", RESERVED_INVENTORY_QUERY, (1, 1), ("Inventory",),
+     ("idx_inventory_vehicle_dealer_status",), False),
+]
+
+
+def explain_query_plan(conn, query, params=()):
+    """Return the EXPLAIN QUERY PLAN detail lines for a query"""
+    rows = conn.execute("EXPLAIN QUERY PLAN " + query, tuple(params)).fetchall()
+    return [row[-1] for row in rows]
+
+
+def check_query_plans(conn=None):
+    """Return a list of problems where a hot query lost its index (empty = OK)"""
+    if conn is None:
+        with pooled_connection() as pooled:
+            return check_query_plans(pooled)
+    problems = []
+    for name, query, params, no_scan, expected_indexes, indexed_order in HOT_QUERY_PLANS:
+        plan = explain_query_plan(conn, query, params)
+        text = "\n".join(plan)
+        for line in plan:
+            words = line.split()
+            if words[:1] == ["SCAN"] and len(words) > 1 and words[1] in no_scan and "INDEX" not in line:
+                problems.append(f"{name}: full table scan: {line}")
+        for index_name in expected_indexes:
+            if index_name not in text:
+                problems.append(f"{name}: expected index {index_name} not used")
+        if indexed_order and "USE TEMP B-TREE FOR ORDER BY" in text:
+            problems.append(f"{name}: ORDER BY is not served by an index")
+    return problems
+
+
+class VehicleCatalog:
+    """Models, trims, colors, categories and the feature vocabulary, kept in
+    memory across sessions.
+
+    Reloaded only when the 'vehicle' row of CatalogVersion moves (Vehicle
+    triggers bump it); that row is re-read at most every
+    ``recheck_seconds``, so renders in between never touch SQLite.
+    """
+
+    def __init__(self, db_file=None, recheck_seconds=CATALOG_RECHECK_SECONDS):
+        self.db_file = db_file or DB_FILE
+        self.recheck_seconds = recheck_seconds
+        self._conn = None
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self.version = None
+        self.data = None
+        self.counters = {"hits": 0, "misses": 0, "checks": 0}
+
+    def _version(self):
+        row = self._conn.execute("SELECT version FROM CatalogVersion WHERE name = 'vehicle'").fetchone()
+        return row[0] if row else 0
+
+    def _load(self):
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            version = self._version()
+            vehicles = conn.execute(
+                "SELECT DISTINCT model, trim, color FROM Vehicle ORDER BY model, trim, color"
+            ).fetchall()
+            features = conn.execute(
+                "SELECT DISTINCT key, CASE WHEN num_value IS NULL THEN value END FROM VehicleFeature ORDER BY 1, 2"
+            ).fetchall()
+        finally:
+            conn.commit()
+        trims = {}
+        for model, trim, _ in vehicles:
+            model_trims = trims.setdefault(model, [])
+            if trim is not None and trim not in model_trims:
+                model_trims.append(trim)
+        feature_values = {}
+        for key, value in features:
+            values = feature_values.setdefault(key, [])
+            if value is not None:
+                values.append(value)
+        self.data = {
+            "version": version,
+            "categories": {category: list(models) for category, models in VEHICLE_CATEGORIES.items()},
+            "models": list(trims),
+            "trims": trims,
+            "colors": sorted({color for _, _, color in vehicles if color}),
+            "feature_keys": list(feature_values),
+            "feature_values": feature_values,
+            "model_matcher": ModelMatcher(trims),
+        }
+        self.version = version
+
+    def get(self):
+        """Current catalog dict (shared; treat as read-only)"""
+        with self._lock:
+            now = time.monotonic()
+            if self.data is not None and now - self._checked_at < self.recheck_seconds:
+                self.counters["hits"] += 1
+                return self.data
+            if self._conn is None:
+                self._conn = get_read_only_connection(self.db_file)
+            self._checked_at = now
+            self.counters["checks"] += 1
+            if self.data is not None and self._version() == self.version:
+                self.counters["hits"] += 1
+                return self.data
+            self.counters["misses"] += 1
+            self._load()
+            return self.data
+
+    def stats(self):
+        with self._lock:
+            return {"db_file": self.db_file, "version": self.version, **self.counters}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self.data = None
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(db_file=None):
+    """Process-wide VehicleCatalog for a database file"""
+    key = os.path.abspath(db_file or DB_FILE)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = VehicleCatalog(key)
+        return catalog
+
+
+def drop_catalogs():
+    with _catalogs_lock:
+        catalogs = list(_catalogs.values())
+        _catalogs.clear()
+    for catalog in catalogs:
+        catalog.close()
+
+
+def catalog_data():
+    """The catalog, or an empty one (categories only) if it cannot be read"""
+    try:
+        return get_catalog().get()
+    except sqlite3.Error as e:
+        print(f"Catalog error: {e}")
+        return {"version": None, "categories": {c: list(m) for c, m in VEHICLE_CATEGORIES.items()},
+                "models": [], "trims": {}, "colors": [], "feature_keys": [], "feature_values": {},
+                "model_matcher": ModelMatcher([])}
 
 
 def get_vehicle_types():
     """Get distinct vehicle types based on model categories"""
-    vehicle_categories = {
-        "Sedan": ["Camry", "Corolla", "Avalon"],
-        "SUV": ["RAV4", "Highlander", "4Runner", "Sequoia", "Land Cruiser"],
-        "Hybrid": ["Prius", "Camry Hybrid", "RAV4 Hybrid", "Highlander Hybrid"],
-        "Truck": ["Tacoma", "Tundra"],
-        "Sports Car": ["GR86", "GR Supra"],
-        "Minivan": ["Sienna"]
-    }
-    return vehicle_categories
+    return catalog_data()["categories"]
 
 
 def get_models_by_type(vehicle_type):
@@ -307,18 +1771,27 @@ def get_models_by_type(vehicle_type):
 
 
 def get_all_models():
-    """Get all available Toyota models from database"""
-    query = "SELECT DISTINCT model FROM Vehicle ORDER BY model"
-    results = query_db(query)
-    return [row[0] for row in results] if results else []
+    """Get all Toyota models in the catalog"""
+    return catalog_data()["models"]
 
 
 def get_trims_by_model(model):
     """Get available trims for a specific model"""
-    query = "SELECT DISTINCT trim FROM Vehicle WHERE model = ? ORDER BY trim"
-    results = query_db(query, (model,))
-    return [row[0] for row in results] if results else []
+    return catalog_data()["trims"].get(model, [])
 
 
 if __name__ == "__main__":
-    init_database()
\ No newline at end of file
+    import sys
+
+    init_database()
+    if "--load-zip-centroids" in sys.argv:
+        path = sys.argv[sys.argv.index("--load-zip-centroids") + 1]
+        with closing(get_connection()) as conn:
+            print(f"Loaded {load_zip_centroids(conn, path)} ZIP centroids from {path}")
+    if "--check-plans" in sys.argv:
+        issues = check_query_plans()
+        for issue in issues:
+            print(f"Query plan problem: {issue}")
+        if issues:
+            sys.exit(1)
+        print("Query plans OK")
\ No newline at end of file
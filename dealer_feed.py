@@ -0,0 +1,359 @@
+# dealer_feed.py
+"""Bulk ingestion of nightly dealer inventory feeds.
+
+A feed is a CSV file (with a header row) or JSON Lines file, one VIN per
+record:
+
+    vin, dealership_id | dealership_name, vehicle_id | (model, trim, color),
+    price, features (JSON object), status (default 'available')
+
+Usage:
+    python dealer_feed.py load feed.csv [--chunk-size 50000]
+    python dealer_feed.py reconcile feed.csv [--dry-run]
+
+``load`` upserts every record; ``reconcile`` treats the feed as the full
+current stock of each dealer in it and applies only the differences.
+"""
+import csv
+import json
+import sqlite3
+import sys
+import time
+from itertools import islice
+
+from database_setup import transaction
+
+CHUNK_SIZE = 50_000
+
+UPSERT_INVENTORY = (
+    "INSERT INTO Inventory (vehicle_id, dealership_id, available_status, vin) VALUES (?, ?, ?, ?) "
+    # A car reserved for a test drive keeps its status, vehicle and dealer,
+    # so the booked TestDrive still points at the dealer holding it
+    "ON CONFLICT(vin) DO UPDATE SET "
+    "vehicle_id = CASE WHEN Inventory.available_status = 'reserved' "
+    "THEN Inventory.vehicle_id ELSE excluded.vehicle_id END, "
+    "dealership_id = CASE WHEN Inventory.available_status = 'reserved' "
+    "THEN Inventory.dealership_id ELSE excluded.dealership_id END, "
+    "available_status = CASE WHEN Inventory.available_status = 'reserved' "
+    "THEN 'reserved' ELSE excluded.available_status END"
+)
+
+
+def iter_feed_records(path, fmt=None):
+    """Stream feed records as dicts from a CSV or JSONL file"""
+    fmt = fmt or ("jsonl" if str(path).endswith((".jsonl", ".ndjson")) else "csv")
+    with open(path, newline="", encoding="utf-8") as fh:
+        if fmt == "csv":
+            yield from csv.DictReader(fh)
+        else:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def chunked(iterable, size):
+    """Yield lists of up to ``size`` items from any iterable"""
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _clean(value):
+    return str(value).strip() if value not in (None, "") else ""
+
+
+def vehicle_key(model, trim, color):
+    """Case-insensitive lookup key for a Vehicle configuration"""
+    return (_clean(model).lower(), _clean(trim).lower(), _clean(color).lower())
+
+
+class FeedLookups:
+    """In-memory foreign-key resolution for dealers and vehicles.
+
+    Loaded once per feed so each record resolves with dict lookups instead
+    of a query per row. Unknown vehicle configurations are created on the
+    fly; unknown dealers are rejected.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.dealer_ids = set()
+        self.dealer_by_name = {}
+        for dealer_id, name in conn.execute("SELECT dealership_id, dealership_name FROM Dealership"):
+            self.dealer_ids.add(dealer_id)
+            self.dealer_by_name[name.strip().lower()] = dealer_id
+        self.vehicles = {}
+        self.vehicle_ids = set()
+        for vid, model, trim, color in conn.execute("SELECT id, model, trim, color FROM Vehicle ORDER BY id"):
+            self.vehicle_ids.add(vid)
+            self.vehicles.setdefault(vehicle_key(model, trim, color), vid)
+        self.vehicles_created = 0
+        self._resolved = {}
+
+    def resolve(self, record):
+        """(dealer_id, vehicle_id) for a record, memoized on the raw fields"""
+        raw = (record.get("dealership_id"), record.get("dealership_name"), record.get("vehicle_id"),
+               record.get("model"), record.get("trim"), record.get("color"))
+        try:
+            return self._resolved[raw]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable values (e.g. nested JSON); resolve uncached
+            dealer_id = self.dealer(record)
+            return dealer_id, self.vehicle(record) if dealer_id else None
+        dealer_id = self.dealer(record)
+        resolved = (dealer_id, self.vehicle(record) if dealer_id else None)
+        self._resolved[raw] = resolved
+        return resolved
+
+    def dealer(self, record):
+        raw_id = _clean(record.get("dealership_id"))
+        if raw_id:
+            try:
+                dealer_id = int(raw_id)
+            except ValueError:
+                return None
+            return dealer_id if dealer_id in self.dealer_ids else None
+        return self.dealer_by_name.get(_clean(record.get("dealership_name")).lower())
+
+    def vehicle(self, record):
+        raw_id = _clean(record.get("vehicle_id"))
+        if raw_id:
+            try:
+                vehicle_id = int(raw_id)
+            except ValueError:
+                return None
+            return vehicle_id if vehicle_id in self.vehicle_ids else None
+        model = _clean(record.get("model"))
+        if not model:
+            return None
+        key = vehicle_key(model, record.get("trim"), record.get("color"))
+        vid = self.vehicles.get(key)
+        if vid is None:
+            features = record.get("features")
+            if isinstance(features, dict):
+                features = json.dumps(features)
+            try:
+                price = float(_clean(record.get("price")) or "nan")
+            except ValueError:
+                price = float("nan")
+            cur = self.conn.execute(
+                "INSERT INTO Vehicle (make, model, trim, color, rate, features) VALUES ('Toyota', ?, ?, ?, ?, ?)",
+                (model, _clean(record.get("trim")) or None, _clean(record.get("color")) or None,
+                 None if price != price else price, features or None),
+            )
+            vid = cur.lastrowid
+            self.vehicles[key] = vid
+            self.vehicles_created += 1
+        return vid
+
+
+def _secondary_indexes(conn, table):
+    """(name, sql) for explicitly created indexes on a table"""
+    return conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,),
+    ).fetchall()
+
+
+def load_feed(records, chunk_size=CHUNK_SIZE, defer_indexes=True):
+    """Upsert an iterable of feed records into Inventory in one transaction.
+
+    Records are resolved against in-memory dealer/vehicle lookups and
+    written with chunked executemany. When ``defer_indexes`` is set the
+    Inventory secondary indexes are dropped for the load and rebuilt once
+    at the end (inside the same transaction, so readers never see them
+    missing). Returns a stats dict including rows per second.
+    """
+    start = time.perf_counter()
+    stats = {"rows": 0, "loaded": 0, "rejected": 0, "vehicles_created": 0}
+    with transaction() as conn:
+        lookups = FeedLookups(conn)
+        deferred = _secondary_indexes(conn, "Inventory") if defer_indexes else []
+        for name, _ in deferred:
+            conn.execute(f'DROP INDEX "{name}"')
+
+        for chunk in chunked(records, chunk_size):
+            batch = []
+            for record in chunk:
+                vin = record.get("vin")
+                vin = vin.strip() if isinstance(vin, str) else _clean(vin)
+                dealer_id, vehicle_id = lookups.resolve(record)
+                if not (vin and dealer_id and vehicle_id):
+                    stats["rejected"] += 1
+                    continue
+                status = record.get("status")
+                batch.append((vehicle_id, dealer_id, status.strip().lower() if status else "available", vin))
+            conn.executemany(UPSERT_INVENTORY, batch)
+            stats["rows"] += len(chunk)
+            stats["loaded"] += len(batch)
+
+        for _, sql in deferred:
+            conn.execute(sql)
+        stats["vehicles_created"] = lookups.vehicles_created
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_s"] = round(stats["rows"] / elapsed) if elapsed else stats["rows"]
+    return stats
+
+
+def _fingerprint(vehicle_id, status):
+    """Comparable digest of the fields a feed controls for one VIN"""
+    return (vehicle_id, status)
+
+
+def diff_dealer_snapshot(current, incoming):
+    """Diff one dealer's stored inventory against its incoming feed.
+
+    ``current`` maps vin -> (inventory_id, vehicle_id, status) and
+    ``incoming`` maps vin -> fingerprint. Rows that are currently reserved
+    are never changed or removed. Returns (inserts, updates, deletes,
+    unchanged, reserved_skipped) where the first three are executemany
+    parameter lists.
+    """
+    inserts, updates, deletes = [], [], []
+    unchanged = reserved_skipped = 0
+    for vin, fingerprint in incoming.items():
+        row = current.get(vin)
+        if row is None:
+            inserts.append((*fingerprint, vin))
+        elif _fingerprint(row[1], row[2]) == fingerprint:
+            unchanged += 1
+        elif row[2] == "reserved":
+            reserved_skipped += 1
+        else:
+            updates.append((*fingerprint, row[0]))
+    for vin, (inventory_id, _, status) in current.items():
+        if vin in incoming:
+            continue
+        if status == "reserved":
+            reserved_skipped += 1
+        else:
+            deletes.append((inventory_id,))
+    return inserts, updates, deletes, unchanged, reserved_skipped
+
+
+def reconcile_feed(records, dry_run=False):
+    """Apply only what changed in a feed, in one transaction.
+
+    Each dealer present in the feed is diffed against its current
+    Inventory snapshot (one indexed read per dealer); new VINs are
+    inserted, changed VINs updated and VINs missing from the feed
+    deleted. Dealers absent from the feed are left alone. Returns stats.
+    """
+    start = time.perf_counter()
+    stats = {"rows": 0, "rejected": 0, "dealers": 0, "inserted": 0, "updated": 0,
+             "deleted": 0, "unchanged": 0, "reserved_skipped": 0, "vehicles_created": 0}
+    with transaction() as conn:
+        lookups = FeedLookups(conn)
+        incoming = {}
+        for record in records:
+            stats["rows"] += 1
+            vin = record.get("vin")
+            vin = vin.strip() if isinstance(vin, str) else _clean(vin)
+            dealer_id, vehicle_id = lookups.resolve(record)
+            if not (vin and dealer_id and vehicle_id):
+                stats["rejected"] += 1
+                continue
+            status = record.get("status")
+            incoming.setdefault(dealer_id, {})[vin] = _fingerprint(
+                vehicle_id, status.strip().lower() if status else "available"
+            )
+
+        for dealer_id, feed in incoming.items():
+            current = {
+                vin: (inventory_id, vehicle_id, status)
+                for vin, inventory_id, vehicle_id, status in conn.execute(
+                    "SELECT vin, id, vehicle_id, available_status FROM Inventory WHERE dealership_id = ?",
+                    (dealer_id,),
+                )
+            }
+            inserts, updates, deletes, unchanged, reserved = diff_dealer_snapshot(current, feed)
+            if not dry_run:
+                # A new VIN may still exist under another dealer; the upsert moves it
+                # unless it is reserved there
+                conn.executemany(UPSERT_INVENTORY, [(v, dealer_id, st, vin) for v, st, vin in inserts])
+                conn.executemany(
+                    "UPDATE Inventory SET vehicle_id = ?, available_status = ? "
+                    "WHERE id = ? AND available_status != 'reserved'",
+                    updates,
+                )
+                conn.executemany(
+                    "DELETE FROM Inventory WHERE id = ? AND available_status != 'reserved'", deletes
+                )
+            stats["dealers"] += 1
+            stats["inserted"] += len(inserts)
+            stats["updated"] += len(updates)
+            stats["deleted"] += len(deletes)
+            stats["unchanged"] += unchanged
+            stats["reserved_skipped"] += reserved
+
+        stats["vehicles_created"] = lookups.vehicles_created
+        if dry_run:
+            conn.rollback()
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_s"] = round(stats["rows"] / elapsed) if elapsed else stats["rows"]
+    return stats
+
+
+def reconcile_feed_file(path, fmt=None, dry_run=False):
+    """Reconcile Inventory against a CSV/JSONL feed file"""
+    return reconcile_feed(iter_feed_records(path, fmt), dry_run=dry_run)
+
+
+def load_feed_file(path, fmt=None, chunk_size=CHUNK_SIZE, defer_indexes=True):
+    """Stream a CSV/JSONL feed file into Inventory"""
+    return load_feed(iter_feed_records(path, fmt), chunk_size=chunk_size, defer_indexes=defer_indexes)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Dealer inventory feed tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    load = sub.add_parser("load", help="bulk load a CSV/JSONL feed into Inventory")
+    load.add_argument("path")
+    load.add_argument("--format", choices=["csv", "jsonl"])
+    load.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    load.add_argument("--keep-indexes", action="store_true", help="maintain indexes row by row")
+    reconcile = sub.add_parser("reconcile", help="apply only the changes in a full-stock feed")
+    reconcile.add_argument("path")
+    reconcile.add_argument("--format", choices=["csv", "jsonl"])
+    reconcile.add_argument("--dry-run", action="store_true", help="report the diff without writing")
+    args = parser.parse_args(argv)
+
+    if args.command == "load":
+        try:
+            stats = load_feed_file(args.path, args.format, args.chunk_size, not args.keep_indexes)
+        except (OSError, sqlite3.Error, ValueError) as e:
+            print(f"Feed load error: {e}")
+            return 1
+        print(
+            f"Loaded {stats['loaded']:,} of {stats['rows']:,} rows "
+            f"({stats['rejected']:,} rejected, {stats['vehicles_created']} new vehicles) "
+            f"in {stats['seconds']}s: {stats['rows_per_s']:,} rows/s"
+        )
+    elif args.command == "reconcile":
+        try:
+            stats = reconcile_feed_file(args.path, args.format, args.dry_run)
+        except (OSError, sqlite3.Error, ValueError) as e:
+            print(f"Feed reconcile error: {e}")
+            return 1
+        print(
+            f"{'Would apply' if args.dry_run else 'Applied'} across {stats['dealers']} dealers: "
+            f"{stats['inserted']:,} inserted, {stats['updated']:,} updated, {stats['deleted']:,} deleted, "
+            f"{stats['unchanged']:,} unchanged, {stats['reserved_skipped']:,} reserved rows kept "
+            f"({stats['rejected']:,} rejected) in {stats['seconds']}s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Shared top-k feature matching for the agent tools.
+
+feature_match_tool used to build a Python set per candidate, score every
+candidate and fully sort the list, only for callers to keep the first
+eight. The matcher here keeps one lowercased feature vocabulary and a
+packed uint64 bit row per distinct feature list, so scoring a batch of
+inventory rows is a vectorized popcount (or a weighted sum of bit columns)
+over the few distinct lists, and only the best ``k`` are selected with
+``argpartition``. Ties keep input order, as the old stable sort did.
+Without NumPy the same scores are computed with Python int bitmasks.
+"""
+import os
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python scoring
+    np = None
+
+WORD_BITS = 64
+# Distinct feature lists (raw or normalized) kept encoded; past this the
+# vocabulary and rows start over, so a long-running app stays bounded
+MAX_FEATURE_LISTS = int(os.getenv("FEATURE_MATCHER_MAX_LISTS", "4096"))
+
+
+def _normalize(features):
+    return tuple(sorted({str(f).strip().lower() for f in features or [] if str(f).strip()}))
+
+
+def _popcount_rows(words):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    return np.unpackbits(words.view(np.uint8), axis=1).sum(axis=1, dtype=np.int64)
+
+
+class FeatureMatcher:
+    """Feature vocabulary plus a packed bit row per distinct feature list.
+
+    Inventory rows sharing a vehicle share one encoded row, so after
+    warm-up a call only looks up its candidates' lists. Both grow until
+    ``max_lists`` distinct lists are held, then start over empty.
+    """
+
+    def __init__(self, max_lists=MAX_FEATURE_LISTS):
+        self.max_lists = max_lists
+        self.resets = 0
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.vocabulary = {}
+        self._rows = {}
+        self._raw_rows = {}
+        self._masks = []
+        self._bits = None
+
+    def _encode(self, features):
+        raw = tuple(features or ())
+        row = self._raw_rows.get(raw)
+        if row is not None:
+            return row
+        key = _normalize(raw)
+        row = self._rows.get(key)
+        if row is None:
+            mask = 0
+            for name in key:
+                mask |= 1 << self.vocabulary.setdefault(name, len(self.vocabulary))
+            row = self._rows[key] = len(self._masks)
+            self._masks.append(mask)
+        self._raw_rows[raw] = row
+        return row
+
+    def _matrix(self):
+        """Packed (distinct lists x words) uint64 matrix. Existing masks never
+        change, so growth only widens it with zero words and packs new rows."""
+        words = max(1, (len(self.vocabulary) + WORD_BITS - 1) // WORD_BITS)
+        bits = self._bits if self._bits is not None else np.zeros((0, words), dtype=np.uint64)
+        if bits.shape[1] < words:
+            bits = np.hstack([bits, np.zeros((len(bits), words - bits.shape[1]), dtype=np.uint64)])
+        if len(bits) < len(self._masks):
+            new = np.zeros((len(self._masks) - len(bits), words), dtype=np.uint64)
+            for r, mask in enumerate(self._masks[len(bits):]):
+                for w in range(words):
+                    new[r, w] = (mask >> (w * WORD_BITS)) & 0xFFFFFFFFFFFFFFFF
+            bits = np.vstack([bits, new])
+        self._bits = bits
+        return bits
+
+    def _target(self, target_features, weights):
+        """Column -> weight for the target features known to the vocabulary"""
+        weights = {str(k).strip().lower(): float(v) for k, v in (weights or {}).items()}
+        target = {}
+        for name in _normalize(target_features):
+            col = self.vocabulary.get(name)
+            if col is not None:
+                target[col] = weights.get(name, 1.0)
+        return target
+
+    def scores(self, target_features, candidates, weights=None):
+        """Score per candidate: shared feature count, or summed weights"""
+        with self._lock:
+            if len(self._raw_rows) > self.max_lists or len(self._masks) > self.max_lists:
+                self._clear()
+                self.resets += 1
+            rows = []
+            for c in candidates:
+                raw = tuple(c.get("features") or ())
+                row = self._raw_rows.get(raw)
+                rows.append(self._encode(raw) if row is None else row)
+            target = self._target(target_features, weights)
+            if np is None:
+                return [sum(w for col, w in target.items() if self._masks[r] >> col & 1) for r in rows]
+            bits = self._matrix()
+        rows = np.fromiter(rows, dtype=np.int64, count=len(rows))
+        if not target:
+            return np.zeros(len(rows))
+        if all(w == 1.0 for w in target.values()):
+            words = np.zeros(bits.shape[1], dtype=np.uint64)
+            for col in target:
+                words[col // WORD_BITS] |= np.uint64(1 << (col % WORD_BITS))
+            per_row = _popcount_rows(bits & words).astype(float)
+        else:
+            per_row = np.zeros(len(bits))
+            for col, weight in target.items():
+                column = (bits[:, col // WORD_BITS] >> np.uint64(col % WORD_BITS)) & np.uint64(1)
+                per_row += column.astype(float) * weight
+        return per_row[rows]
+
+    def stats(self):
+        with self._lock:
+            return {"vocabulary": len(self.vocabulary), "lists": len(self._masks),
+                    "raw_lists": len(self._raw_rows), "resets": self.resets}
+
+    def top_k(self, target_features, candidates, k=None, weights=None):
+        """Candidates ordered by score (best first), at most ``k`` of them"""
+        if not candidates:
+            return []
+        scores = self.scores(target_features, candidates, weights)
+        n = len(candidates)
+        k = n if k is None else max(0, min(int(k), n))
+        if not k:
+            return []
+        if np is None:
+            order = sorted(range(n), key=lambda i: -scores[i])[:k]
+            return [candidates[i] for i in order]
+        if k < n:
+            # The k-th best score is the cut; every row scoring above it is
+            # in, and ties at the cut are filled in input order.
+            cut = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            above = np.flatnonzero(scores > cut)
+            at_cut = np.flatnonzero(scores == cut)[:k - len(above)]
+            picked = np.concatenate([above, at_cut])
+        else:
+            picked = np.arange(n)
+        order = picked[np.lexsort((picked, -scores[picked]))]
+        return [candidates[i] for i in order]
+
+
+_matcher = FeatureMatcher()
+
+
+def get_matcher():
+    """Process-wide matcher shared by every feature_match_tool caller"""
+    return _matcher
+
+
+def feature_match_tool(target_features, candidates, k=None, weights=None):
+    """Rank candidate inventory dicts by overlap with target_features.
+
+    ``weights`` maps feature name to weight (default 1 each); ``k`` keeps
+    only the best k. Candidates are returned unchanged, best first.
+    """
+    return _matcher.top_k(target_features, candidates, k=k, weights=weights)
@@ -0,0 +1,429 @@
+"""Process-wide columnar snapshot of available inventory.
+
+vehicle_search_tool filters model, trim, color, dealer, distance and
+features with vectorized NumPy masks over this snapshot instead of running
+a SQLite query per call. Before each search the snapshot checks
+``PRAGMA data_version`` on its own read-only connection; when another
+connection has committed, it applies the InventoryChange log (status
+flips, deletes, and new rows past its id watermark) in place, and only
+rebuilds from scratch after vehicle/dealer edits, a gap in the log, or
+heavy churn.
+
+Pages match database_setup.get_inventory_page row for row, including the
+keyset cursors. Exact-ZIP searches, which SQLite answers from an index,
+and everything when NumPy is missing (or INVENTORY_SNAPSHOT=0) go to
+SQLite.
+"""
+import os
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # optional: searches fall back to SQL
+    np = None
+
+import database_setup
+from database_setup import (
+    PAGE_SIZE,
+    EARTH_RADIUS_MILES,
+    canonical_model,
+    get_read_only_connection,
+    get_inventory_page,
+    count_inventory as count_inventory_sql,
+    count_inventory_text as count_inventory_text_sql,
+    text_vehicle_ids,
+    parse_feature_filter,
+    zip_centroid,
+)
+
+SNAPSHOT_ENABLED = os.getenv("INVENTORY_SNAPSHOT", "1") != "0"
+REBUILD_FRACTION = 0.05  # apply changes in place up to this share of rows
+ID_BITS = 32  # inventory ids live in the low bits of the sort key
+_OPS = {">=": np.greater_equal, "<=": np.less_equal, ">": np.greater, "<": np.less, "=": np.equal} if np else {}
+
+
+class InventorySnapshot:
+    """Columnar copy of available inventory for one database file.
+
+    Rows are kept sorted by (model, trim, inventory id), the same order as
+    the SQL keyset pages. Vehicles carry a packed feature bitset over every
+    (key, value) pair in VehicleFeature plus a numeric column per key.
+    """
+
+    def __init__(self, db_file=None):
+        self.db_file = db_file or database_setup.DB_FILE
+        self._conn = get_read_only_connection(self.db_file)
+        self._lock = threading.Lock()
+        self.counters = {"builds": 0, "incremental": 0, "searches": 0}
+        self.data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        self._build()
+
+    # -- loading -----------------------------------------------------------
+
+    def _build(self):
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            self._load_vehicles(conn)
+            self._load_dealers(conn)
+            rows = conn.execute(
+                "SELECT id, vehicle_id, dealership_id, vin FROM Inventory WHERE available_status = 'available'"
+            ).fetchall()
+            self.last_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM InventoryChange").fetchone()[0]
+            self.max_inventory_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM Inventory").fetchone()[0]
+        finally:
+            conn.commit()
+        # Rows pointing at a missing vehicle or dealer drop out, as in the SQL join
+        rows = [r for r in rows if r[1] in self.veh_pos and r[2] in self.dealer_pos]
+        inv_id, veh_idx, dealer_idx, vin = self._columns(rows)
+        order = np.argsort(self._sort_key(veh_idx, inv_id), kind="stable")
+        self.inv_id, self.veh_idx, self.dealer_idx, self.vin = inv_id[order], veh_idx[order], dealer_idx[order], vin[order]
+        self.key = self._sort_key(self.veh_idx, self.inv_id)
+        self.counters["builds"] += 1
+
+    def _load_vehicles(self, conn):
+        vehicles = conn.execute("SELECT id, model, trim, color, rate, features FROM Vehicle ORDER BY id").fetchall()
+        self.veh_ids = [v[0] for v in vehicles]
+        self.veh_pos = {vid: n for n, vid in enumerate(self.veh_ids)}
+        self.veh_rows = [(v[0], v[1], v[2], v[3], v[4], v[5]) for v in vehicles]
+        self.veh_rate = np.array([v[4] if v[4] is not None else np.nan for v in vehicles], dtype=np.float64)
+        self.veh_model = self._codes([v[1] for v in vehicles], "model")
+        self.veh_trim = self._codes([v[2] for v in vehicles], "trim")
+        self.veh_color = self._codes([v[3] for v in vehicles], "color")
+
+        # Dense rank of (model, trim) in the SQL keyset order, where a NULL
+        # trim sorts as ''
+        pair_key = lambda m, t: (m, t or "")
+        self.mt_pairs = sorted({pair_key(v[1], v[2]) for v in vehicles})
+        rank = {p: n for n, p in enumerate(self.mt_pairs)}
+        self.veh_rank = np.array([rank[pair_key(v[1], v[2])] for v in vehicles], dtype=np.int64)
+
+        self._term_cache = {}
+        features = conn.execute("SELECT vehicle_id, key, value, num_value FROM VehicleFeature").fetchall()
+        self.feature_pairs = sorted({(key, value or "") for _, key, value, _ in features})
+        pair_col = {p: n for n, p in enumerate(self.feature_pairs)}
+        words = max(1, (len(self.feature_pairs) + 63) // 64)
+        self.feature_bits = np.zeros((len(vehicles), words), dtype=np.uint64)
+        self.feature_num = {}
+        for vehicle_id, key, value, num_value in features:
+            v = self.veh_pos.get(vehicle_id)
+            if v is None:
+                continue
+            col = pair_col[(key, value or "")]
+            self.feature_bits[v, col // 64] |= np.uint64(1 << (col % 64))
+            if num_value is not None:
+                column = self.feature_num.setdefault(key, np.full(len(vehicles), np.nan))
+                column[v] = num_value
+
+    def _codes(self, values, name):
+        """Integer codes per vehicle, plus a lower-cased value -> codes lookup"""
+        vocab = sorted({v for v in values if v is not None})
+        code = {v: n for n, v in enumerate(vocab)}
+        lookup = {}
+        for v in vocab:
+            lookup.setdefault(v.lower(), []).append(code[v])
+        setattr(self, f"{name}_lookup", lookup)
+        return np.array([code.get(v, -1) for v in values], dtype=np.int32)
+
+    def _load_dealers(self, conn):
+        dealers = conn.execute(
+            "SELECT d.dealership_id, d.dealership_name, d.city, d.zipcode, d.address, d.phone, g.min_lat, g.min_lon "
+            "FROM Dealership d LEFT JOIN DealershipGeo g ON g.dealership_id = d.dealership_id ORDER BY d.dealership_id"
+        ).fetchall()
+        self.dealer_pos = {d[0]: n for n, d in enumerate(dealers)}
+        self.dealer_rows = [d[1:6] for d in dealers]
+        self.dealer_zip = {}
+        for n, d in enumerate(dealers):
+            self.dealer_zip.setdefault(d[3], []).append(n)
+        self.dealer_lat = np.radians(np.array([d[6] if d[6] is not None else np.nan for d in dealers], dtype=np.float64))
+        self.dealer_lon = np.radians(np.array([d[7] if d[7] is not None else np.nan for d in dealers], dtype=np.float64))
+
+    def _columns(self, rows):
+        """Inventory rows -> (inv_id, veh_idx, dealer_idx, vin) arrays; None
+        if a row references a vehicle or dealer the snapshot does not know"""
+        try:
+            veh_idx = np.fromiter((self.veh_pos[r[1]] for r in rows), dtype=np.int32, count=len(rows))
+            dealer_idx = np.fromiter((self.dealer_pos[r[2]] for r in rows), dtype=np.int32, count=len(rows))
+        except KeyError:
+            return None
+        inv_id = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        vin = np.array([r[3] for r in rows], dtype=object)
+        return inv_id, veh_idx, dealer_idx, vin
+
+    def _sort_key(self, veh_idx, inv_id):
+        return ((self.veh_rank[veh_idx] * 2 + 1) << ID_BITS) | inv_id
+
+    # -- refresh -----------------------------------------------------------
+
+    def refresh(self):
+        """Bring the snapshot up to date if any connection has committed"""
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self.data_version:
+            return
+        if not self._apply_changes():
+            self._build()
+        self.data_version = version
+
+    def _apply_changes(self):
+        """Patch rows from the InventoryChange log; False means rebuild"""
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            changes = conn.execute(
+                "SELECT seq, inventory_id FROM InventoryChange WHERE seq > ? ORDER BY seq", (self.last_seq,)
+            ).fetchall()
+            if changes and changes[0][0] != self.last_seq + 1:
+                return False  # the log was pruned past our position
+            if any(inventory_id is None for _, inventory_id in changes):
+                return False  # vehicle or dealer changed
+            changed = sorted({inventory_id for _, inventory_id in changes if inventory_id <= self.max_inventory_id})
+            added = conn.execute(
+                "SELECT id, vehicle_id, dealership_id, vin FROM Inventory WHERE id > ? AND available_status = 'available'",
+                (self.max_inventory_id,),
+            ).fetchall()
+            if len(changed) + len(added) > REBUILD_FRACTION * max(len(self.inv_id), 1000):
+                return False
+            for start in range(0, len(changed), 500):
+                chunk = changed[start:start + 500]
+                added += conn.execute(
+                    "SELECT id, vehicle_id, dealership_id, vin FROM Inventory "
+                    f"WHERE id IN ({','.join('?' * len(chunk))}) AND available_status = 'available'",
+                    chunk,
+                ).fetchall()
+            max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM Inventory").fetchone()[0]
+        finally:
+            conn.commit()
+
+        columns = self._columns(added)
+        if columns is None:
+            return False
+        if changed:
+            keep = ~np.isin(self.inv_id, np.array(changed, dtype=np.int64))
+            self.inv_id, self.veh_idx, self.dealer_idx, self.vin, self.key = (
+                self.inv_id[keep], self.veh_idx[keep], self.dealer_idx[keep], self.vin[keep], self.key[keep])
+        if added:
+            inv_id, veh_idx, dealer_idx, vin = columns
+            key = self._sort_key(veh_idx, inv_id)
+            order = np.argsort(key)
+            at = np.searchsorted(self.key, key[order])
+            self.inv_id = np.insert(self.inv_id, at, inv_id[order])
+            self.veh_idx = np.insert(self.veh_idx, at, veh_idx[order])
+            self.dealer_idx = np.insert(self.dealer_idx, at, dealer_idx[order])
+            self.vin = np.insert(self.vin, at, vin[order])
+            self.key = np.insert(self.key, at, key[order])
+        self.last_seq = changes[-1][0] if changes else self.last_seq
+        self.max_inventory_id = max_id
+        self.counters["incremental"] += 1
+        return True
+
+    # -- search ------------------------------------------------------------
+
+    def _vehicle_mask(self, model, trim, color, features, features_match):
+        mask = np.ones(len(self.veh_ids), dtype=bool)
+        for value, codes, lookup in ((model, self.veh_model, self.model_lookup),
+                                     (trim, self.veh_trim, self.trim_lookup),
+                                     (color, self.veh_color, self.color_lookup)):
+            if value:
+                mask &= np.isin(codes, lookup.get(str(value).lower(), []))
+        if features:
+            terms = [self._feature_mask(term) for term in features]
+            combined = np.logical_and.reduce(terms) if features_match == "all" else np.logical_or.reduce(terms)
+            mask &= combined
+        return mask
+
+    def _feature_mask(self, term):
+        """Vehicles matching one feature filter (same rules as feature_filter_sql)"""
+        parsed = parse_feature_filter(term)
+        if parsed[0] == "num":
+            _, key, op, number = parsed
+            column = self.feature_num.get(key)
+            if column is None:
+                return np.zeros(len(self.veh_ids), dtype=bool)
+            with np.errstate(invalid="ignore"):
+                return _OPS[op](column, number)
+        text = parsed[1]
+        words = self._term_cache.get(text)
+        if words is None:
+            words = np.zeros(self.feature_bits.shape[1], dtype=np.uint64)
+            for col, (key, value) in enumerate(self.feature_pairs):
+                if text in key or text in value:
+                    words[col // 64] |= np.uint64(1 << (col % 64))
+            self._term_cache[text] = words
+        return (self.feature_bits & words).any(axis=1)
+
+    def _cursor_key(self, model, trim):
+        """Sort-key prefix for a cursor's (model, trim); pairs the snapshot
+        does not hold land between their neighbours"""
+        pair = (model, trim or "")
+        lo, hi = 0, len(self.mt_pairs)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.mt_pairs[mid] < pair:
+                lo = mid + 1
+            else:
+                hi = mid
+        present = lo < len(self.mt_pairs) and self.mt_pairs[lo] == pair
+        return (lo * 2 + 1 if present else lo * 2) << ID_BITS
+
+    def _distances(self, lat, lon):
+        """Haversine miles from a point to every dealer (NaN if unplaced)"""
+        phi = np.radians(lat)
+        dphi = self.dealer_lat - phi
+        dlambda = self.dealer_lon - np.radians(lon)
+        a = np.sin(dphi / 2) ** 2 + np.cos(phi) * np.cos(self.dealer_lat) * np.sin(dlambda / 2) ** 2
+        return 2 * EARTH_RADIUS_MILES * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+    def _row_mask(self, zipcode, model, trim, color, features, features_match, near):
+        """(row mask, per-dealer distance or None) for a filter set"""
+        mask = self._vehicle_mask(model, trim, color, features, features_match)[self.veh_idx]
+        dealer_distance = None
+        if near:
+            lat, lon, radius_miles = near
+            dealer_distance = self._distances(lat, lon)
+            with np.errstate(invalid="ignore"):
+                mask &= (dealer_distance <= radius_miles)[self.dealer_idx]
+        elif zipcode:
+            dealer_mask = np.zeros(len(self.dealer_rows), dtype=bool)
+            dealer_mask[self.dealer_zip.get(zipcode, [])] = True
+            mask &= dealer_mask[self.dealer_idx]
+        return mask, dealer_distance
+
+    def count(self, zipcode=None, model=None, trim=None, color=None, features=None, features_match="any", near=None,
+              vehicle_ids=None):
+        """Rows search() pages through for these filters, optionally only
+        for ``vehicle_ids``"""
+        with self._lock:
+            self.refresh()
+            mask = self._row_mask(zipcode, model, trim, color, features, features_match, near)[0]
+            if vehicle_ids is not None:
+                wanted = np.zeros(len(self.veh_ids), dtype=bool)
+                wanted[[self.veh_pos[v] for v in vehicle_ids if v in self.veh_pos]] = True
+                mask &= wanted[self.veh_idx]
+            return int(mask.sum())
+
+    def search(self, zipcode=None, model=None, trim=None, color=None, features=None, features_match="any",
+               after=None, limit=PAGE_SIZE, near=None):
+        """(rows, next_cursor) with the same rows and order as get_inventory_page"""
+        with self._lock:
+            self.refresh()
+            self.counters["searches"] += 1
+            mask, dealer_distance = self._row_mask(zipcode, model, trim, color, features, features_match, near)
+            distance = None
+            if near:
+                sel = np.flatnonzero(mask)
+                distance = dealer_distance[self.dealer_idx[sel]]
+                order = np.lexsort((self.key[sel], distance))
+                sel, distance = sel[order], distance[order]
+                if after:
+                    cursor_key = self._cursor_key(after[1], after[2]) | int(after[3])
+                    keep = (distance > after[0]) | ((distance == after[0]) & (self.key[sel] > cursor_key))
+                    sel, distance = sel[keep], distance[keep]
+                sel, distance = sel[:limit + 1], distance[:limit + 1]
+            else:
+                start = 0
+                if after:
+                    start = int(np.searchsorted(self.key, self._cursor_key(after[0], after[1]) | int(after[2]), "right"))
+                sel = np.flatnonzero(mask[start:])[:limit + 1] + start
+            rows = [self._row(i, None if distance is None else float(distance[n])) for n, i in enumerate(sel)]
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            return rows, ([last[13], last[1], last[2] or "", last[11]] if near else [last[1], last[2] or "", last[11]])
+        return rows, None
+
+    def _row(self, i, distance):
+        vehicle = self.veh_rows[self.veh_idx[i]]
+        row = vehicle + self.dealer_rows[self.dealer_idx[i]] + (int(self.inv_id[i]), self.vin[i])
+        return row if distance is None else row + (distance,)
+
+    def stats(self):
+        return {"rows": int(len(self.inv_id)), "vehicles": len(self.veh_ids), "dealers": len(self.dealer_rows),
+                "feature_pairs": len(self.feature_pairs), **self.counters}
+
+    def close(self):
+        self._conn.close()
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_snapshot(db_file=None):
+    """Shared snapshot for a database file, built on first use"""
+    key = os.path.abspath(db_file or database_setup.DB_FILE)
+    with _snapshots_lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is None:
+            snapshot = _snapshots[key] = InventorySnapshot(key)
+        return snapshot
+
+
+def drop_snapshots():
+    with _snapshots_lock:
+        snapshots = list(_snapshots.values())
+        _snapshots.clear()
+    for snapshot in snapshots:
+        snapshot.close()
+
+
+def search_inventory_page(zipcode=None, model=None, trim=None, color=None, features=None, features_match="any",
+                          after=None, limit=PAGE_SIZE, radius_miles=None):
+    """Drop-in for database_setup.get_inventory_page served from the snapshot"""
+    model = canonical_model(model)
+    if np is None or not SNAPSHOT_ENABLED:
+        return get_inventory_page(zipcode, model, trim, color, features, features_match, after, limit, radius_miles)
+    near = None
+    if zipcode and radius_miles:
+        center = zip_centroid(zipcode)
+        near = (center[0], center[1], float(radius_miles)) if center else None
+    if zipcode and not near:
+        # An exact ZIP is already narrow and index-served in SQL
+        return get_inventory_page(zipcode, model, trim, color, features, features_match, after, limit)
+    try:
+        return get_snapshot().search(zipcode, model, trim, color, features, features_match, after, limit, near)
+    except Exception as e:
+        print(f"Inventory snapshot error, using SQL: {e}")
+        return get_inventory_page(zipcode, model, trim, color, features, features_match, after, limit, radius_miles)
+
+
+def count_inventory(zipcode=None, model=None, trim=None, color=None, features=None, features_match="any",
+                    radius_miles=None):
+    """Drop-in for database_setup.count_inventory, routed like search_inventory_page"""
+    model = canonical_model(model)
+    if np is None or not SNAPSHOT_ENABLED:
+        return count_inventory_sql(zipcode, model, trim, color, features, features_match, radius_miles)
+    near = None
+    if zipcode and radius_miles:
+        center = zip_centroid(zipcode)
+        near = (center[0], center[1], float(radius_miles)) if center else None
+    if zipcode and not near:
+        return count_inventory_sql(zipcode, model, trim, color, features, features_match)
+    try:
+        return get_snapshot().count(zipcode, model, trim, color, features, features_match, near)
+    except Exception as e:
+        print(f"Inventory snapshot error, using SQL: {e}")
+        return count_inventory_sql(zipcode, model, trim, color, features, features_match, radius_miles)
+
+
+def count_inventory_text(search_text, zipcode=None, min_price=None, max_price=None, model=None, trim=None, color=None,
+                         features=None, features_match="any", radius_miles=None):
+    """Drop-in for database_setup.count_inventory_text: vehicles from the FTS
+    index, rows counted on the snapshot"""
+    filters = (model, trim, color, features, features_match, radius_miles)
+    if np is None or not SNAPSHOT_ENABLED or (zipcode and not radius_miles):
+        return count_inventory_text_sql(search_text, zipcode, min_price, max_price, *filters)
+    try:
+        near = None
+        if zipcode:
+            center = zip_centroid(zipcode)
+            if not center:
+                return count_inventory_text_sql(search_text, zipcode, min_price, max_price, *filters)
+            near = (center[0], center[1], float(radius_miles))
+        vehicle_ids = text_vehicle_ids(search_text, min_price, max_price)
+        if not vehicle_ids:
+            return 0
+        return get_snapshot().count(None, canonical_model(model), trim, color, features, features_match, near,
+                                    vehicle_ids)
+    except Exception as e:
+        print(f"Inventory snapshot error, using SQL: {e}")
+        return count_inventory_text_sql(search_text, zipcode, min_price, max_price, *filters)
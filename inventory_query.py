@@ -0,0 +1,210 @@
+"""One inventory lookup for every agent front end.
+
+The standalone Streamlit apps, tools/inventory.py and the ui helpers each
+looked up dealer ids for a ZIP, ran a second ``IN (...)`` query with
+``Vehicle.model LIKE '%model%'`` on a connection of their own, and built
+slightly different dicts. lookup_inventory() answers the same question
+with a single Dealership -> Inventory -> Vehicle join (or a DealershipGeo
+radius join), a model_key prefix range served by idx_vehicle_model_key,
+and one row shape. Model text is mapped to the catalog first, so "Rav 4"
+and "Camery" find RAV4 and Camry.
+
+Results are cached per database in a small LRU that is cleared whenever
+``PRAGMA data_version`` shows another connection has committed, so a
+reservation is visible on the next lookup.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import database_setup
+from database_setup import (
+    bounding_box,
+    get_catalog,
+    get_read_only_connection,
+    pooled_connection,
+    zip_centroid,
+)
+from model_matcher import model_key
+
+CACHE_SIZE = int(os.getenv("INVENTORY_LOOKUP_CACHE_SIZE", "256"))
+
+LOOKUP_COLUMNS = (
+    "inventory_id", "vin", "available_status", "vehicle_id", "make", "model", "trim", "color", "features", "rate",
+    "dealership_id", "dealership_name", "city", "zipcode", "address", "dealership_email", "phone",
+)
+_SELECT = """
+    SELECT i.id, i.vin, i.available_status, v.id, v.make, v.model, v.trim, v.color, v.features, v.rate,
+           d.dealership_id, d.dealership_name, d.city, d.zipcode, d.address, d.email, d.phone"""
+
+
+def _key_range(key):
+    """[low, high) bounds covering every model_key that starts with ``key``"""
+    return key, key[:-1] + chr(ord(key[-1]) + 1)
+
+
+def build_lookup_query(zipcode=None, model=None, status=None, near=None):
+    """Inventory rows for a ZIP (or ``near`` = (lat, lon, radius_miles)) in
+    LOOKUP_COLUMNS order, plus distance_miles for radius lookups.
+
+    ``model`` matches as a model_key prefix ('rav4' finds RAV4 and RAV4
+    Hybrid); ``status`` limits available_status, None keeps all.
+    """
+    params = []
+    if near:
+        lat, lon, radius_miles = near
+        # Distance once per dealer in the box, not once per inventory row
+        query = """
+    WITH near (dealership_id, distance_miles) AS MATERIALIZED (
+        SELECT dealership_id, haversine_miles(?, ?, min_lat, min_lon) FROM DealershipGeo
+        WHERE min_lat >= ? AND max_lat <= ? AND min_lon >= ? AND max_lon <= ?
+    )""" + _SELECT + """, g.distance_miles
+    FROM near g
+    JOIN Dealership d ON d.dealership_id = g.dealership_id
+    JOIN Inventory i ON i.dealership_id = d.dealership_id
+    JOIN Vehicle v ON v.id = i.vehicle_id
+    WHERE g.distance_miles <= ?"""
+        params.extend([lat, lon, *bounding_box(lat, lon, radius_miles), radius_miles])
+        order = " ORDER BY distance_miles, v.model, v.trim, i.id"
+    else:
+        query = _SELECT + """
+    FROM Dealership d
+    JOIN Inventory i ON i.dealership_id = d.dealership_id
+    JOIN Vehicle v ON v.id = i.vehicle_id
+    WHERE 1 = 1"""
+        order = " ORDER BY v.model, v.trim, i.id"
+        if zipcode:
+            query += " AND d.zipcode = ?"
+            params.append(zipcode)
+    key = model_key(model)
+    if key:
+        query += " AND v.model_key >= ? AND v.model_key < ?"
+        params.extend(_key_range(key))
+    if status:
+        query += " AND i.available_status = ?"
+        params.append(status)
+    return query + order, params
+
+
+@lru_cache(maxsize=4096)
+def _parse_features(raw):
+    """Parsed Vehicle.features, shared by every row of a vehicle (read-only)"""
+    if not raw:
+        return []
+    try:
+        return json.loads(raw)
+    except Exception:
+        try:
+            return json.loads(raw.replace("'", '"'))
+        except Exception:
+            return []
+
+
+def _to_dict(row):
+    item = dict(zip(LOOKUP_COLUMNS, row))
+    item["features"] = _parse_features(item["features"])
+    if len(row) > len(LOOKUP_COLUMNS):
+        item["distance_miles"] = round(row[-1], 1)
+    return item
+
+
+class InventoryQueryEngine:
+    """Runs lookups on pooled read-only connections with an LRU of results.
+
+    A private read-only connection only watches ``PRAGMA data_version``;
+    when it moves the cache is dropped before the next lookup.
+    """
+
+    def __init__(self, db_file=None, cache_size=CACHE_SIZE):
+        self.db_file = db_file or database_setup.DB_FILE
+        self.cache_size = cache_size
+        self._watch = get_read_only_connection(self.db_file)
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self.data_version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+        self.counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def _check_version(self):
+        version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+        if version != self.data_version:
+            self.data_version = version
+            self._cache.clear()
+            self.counters["invalidations"] += 1
+
+    def lookup(self, zipcode=None, model=None, radius_miles=None, status=None):
+        """Inventory dicts (see LOOKUP_COLUMNS) for a ZIP, nearest first when
+        ``radius_miles`` is given and the ZIP has a known centroid"""
+        if model:
+            model = get_catalog(self.db_file).get()["model_matcher"].prefix_key(model)
+        key = (zipcode or None, model_key(model), float(radius_miles or 0), status or None)
+        with self._lock:
+            self._check_version()
+            version = self.data_version
+            rows = self._cache.get(key)
+            if rows is not None:
+                self._cache.move_to_end(key)
+                self.counters["hits"] += 1
+        if rows is None:
+            with pooled_connection(self.db_file, read_only=True) as conn:
+                near = None
+                if zipcode and radius_miles:
+                    center = zip_centroid(zipcode, conn)
+                    near = (center[0], center[1], float(radius_miles)) if center else None
+                query, params = build_lookup_query(zipcode, model, status, near)
+                rows = [_to_dict(r) for r in conn.execute(query, params).fetchall()]
+            with self._lock:
+                self.counters["misses"] += 1
+                if version != self.data_version:
+                    return [dict(item) for item in rows]
+                self._cache[key] = rows
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        # Callers annotate and reformat items; keep the cached copies intact
+        return [dict(item) for item in rows]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"db_file": self.db_file, "cached": len(self._cache), "data_version": self.data_version,
+                    **self.counters}
+
+    def close(self):
+        with self._lock:
+            self._cache.clear()
+            self._watch.close()
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(db_file=None):
+    """Shared engine for a database file, created on first use"""
+    key = os.path.abspath(db_file or database_setup.DB_FILE)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = InventoryQueryEngine(key)
+        return engine
+
+
+def drop_engines():
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        engine.close()
+
+
+def lookup_inventory(zipcode=None, model=None, radius_miles=None, status=None, db_file=None):
+    """Inventory near a ZIP as dicts, any status unless ``status`` is given"""
+    try:
+        return get_engine(db_file).lookup(zipcode, model, radius_miles, status)
+    except Exception as e:
+        print(f"Inventory lookup error: {e}")
+        return []
@@ -0,0 +1,128 @@
+"""Map model names typed in chat to canonical catalog models.
+
+"Rav 4", "rav4hybrid", "Toyota Camry" and "Camery" all name models the
+catalog knows as RAV4, RAV4 Hybrid and Camry. model_key() is the
+normalized form stored in Vehicle.model_key (lower case, no spaces or
+punctuation), so spacing and case variants are exact index lookups.
+ModelMatcher covers the rest: a key that starts a catalog model, then
+trigram candidates checked by edit distance for typos, then a catalog
+model followed by one of its catalog trims ("RAV4 XLE"). Other trailing
+words ("Highlander Hybrid" when only Highlander is stocked) match
+nothing rather than a different model. The model vocabulary is small, so
+every lookup is in memory.
+"""
+from functools import lru_cache
+
+KEY_DROP = " -._/'"  # removed by model_key() and model_key_sql()
+MAKE_PREFIX = "toyota"
+
+
+def model_key(model):
+    """Normalized model name: 'RAV4 Hybrid' / 'rav-4 hybrid' -> 'rav4hybrid'"""
+    return "".join(c for c in "".join(str(model or "").split()).lower() if c not in KEY_DROP)
+
+
+def model_key_sql(column):
+    """SQL expression equal to model_key() for an ASCII model column"""
+    expr = column
+    for c in KEY_DROP:
+        expr = f"replace({expr}, '{c}', '')" if c != "'" else f"replace({expr}, '''', '')"
+    return f"lower({expr})"
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit=None):
+    """Optimal string alignment distance (adjacent swaps count as one edit);
+    stops early once every path exceeds ``limit``"""
+    if abs(len(a) - len(b)) > (limit if limit is not None else len(a) + len(b)):
+        return abs(len(a) - len(b))
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        row = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            row[j] = min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], prev2[j - 2] + 1)
+        if limit is not None and min(row) > limit:
+            return min(row)
+        prev2, prev = prev, row
+    return prev[-1]
+
+
+def max_typos(key):
+    """Edits tolerated for a key of this length"""
+    return 1 if len(key) <= 5 else 2 if len(key) <= 9 else 3
+
+
+class ModelMatcher:
+    """Canonical model lookup over one catalog's model names.
+
+    ``models`` is a list of names or a {model: [trims]} dict; trims let
+    "RAV4 XLE" resolve to RAV4.
+    """
+
+    def __init__(self, models):
+        trims = models if isinstance(models, dict) else {}
+        self.models = {}
+        self.trim_keys = {}
+        for model in models:
+            if model:
+                key = model_key(model)
+                self.models.setdefault(key, model)
+                self.trim_keys.setdefault(key, set()).update(model_key(t) for t in trims.get(model) or () if t)
+        self.keys = sorted(self.models)
+        self.grams = {key: trigrams(key) for key in self.keys}
+        self.match = lru_cache(maxsize=1024)(self._match)
+
+    def _strip_make(self, key):
+        if key.startswith(MAKE_PREFIX) and key != MAKE_PREFIX and key not in self.models:
+            return key[len(MAKE_PREFIX):]
+        return key
+
+    def completions(self, key):
+        """Catalog keys starting with ``key``, shortest first"""
+        return sorted((k for k in self.keys if k.startswith(key)), key=lambda k: (len(k), k))
+
+    def _match(self, text):
+        """(lookup key, canonical model) for user text; the key is the
+        corrected one after a typo, and (typed key, None) if nothing is close"""
+        key = self._strip_make(model_key(text))
+        if not key:
+            return key, None
+        if key in self.models:
+            return key, self.models[key]
+        completions = self.completions(key)
+        if completions:
+            return key, self.models[completions[0]]
+        limit = max_typos(key)
+        grams = trigrams(key)
+        best = None
+        for candidate in self.keys:
+            overlap = len(grams & self.grams[candidate]) / len(grams | self.grams[candidate])
+            if not overlap and len(key) > 3:
+                continue
+            distance = edit_distance(key, candidate, limit)
+            if distance <= limit:
+                rank = (distance, -overlap, len(candidate), candidate)
+                if best is None or rank < best:
+                    best = rank
+        if best:
+            return best[3], self.models[best[3]]
+        # A catalog model plus one of its trims ('rav4xle', 'tacomatrdsport')
+        base = max((k for k in self.keys if len(k) >= 3 and key.startswith(k) and key[len(k):] in self.trim_keys[k]),
+                   key=len, default=None)
+        return (base, self.models[base]) if base else (key, None)
+
+    def canonical(self, text):
+        """Catalog model for user text ('Camery' -> 'Camry'), or None"""
+        return self.match(text)[1]
+
+    def prefix_key(self, text):
+        """model_key prefix to look up: the typed key when it starts a catalog
+        model ('rav' covers RAV4 and RAV4 Hybrid), else the corrected key"""
+        return self.match(text)[0]
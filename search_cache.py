@@ -0,0 +1,203 @@
+"""Shared cache for web search (Serper) results.
+
+The agent asks the same spec questions ("RAV4 specs", "Camry hybrid mpg")
+all day, and every call used to go to the network. Results are cached by
+normalized query in two tiers: an in-process LRU, and a SQLite file that
+survives restarts and is shared by every app on the host. The file is
+separate from toyota_sales.db so cache writes never bump its
+data_version (which would drop the inventory caches).
+
+An entry is fresh for ``ttl`` seconds. For another ``stale_ttl`` seconds it
+is still served, and a background refresh replaces it. Only successful
+results are stored. Failed fetches are not cached, and a failed refresh
+keeps the stale copy.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+SEARCH_CACHE_DB = os.getenv("SEARCH_CACHE_DB", "search_cache.db")  # "" keeps the cache in memory only
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "86400"))
+SEARCH_CACHE_STALE = float(os.getenv("SEARCH_CACHE_STALE", "604800"))
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "512"))
+PRUNE_EVERY = 256  # disk writes between sweeps of fully expired rows
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS SearchCache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def normalize_query(query):
+    """Cache form of a query: lower case, single spaces, no trailing '?!.'"""
+    return " ".join(str(query or "").lower().split()).rstrip("?!. ")
+
+
+def cache_key(namespace, query, location=None):
+    """Key for one kind of result (``namespace``) of a query at a location"""
+    return f"{namespace}|{normalize_query(location)}|{normalize_query(query)}"
+
+
+class SearchCache:
+    """Two-tier TTL cache with stale-while-revalidate.
+
+    Values must be JSON-serializable. Returned values are shared between
+    callers, so treat them as read-only.
+    """
+
+    def __init__(self, db_file=SEARCH_CACHE_DB, ttl=SEARCH_CACHE_TTL, stale_ttl=SEARCH_CACHE_STALE,
+                 max_entries=SEARCH_CACHE_SIZE):
+        self.db_file = db_file
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (value, fetched_at, expires_at)
+        self._refreshing = set()
+        self._writes = 0
+        self._conn = None
+        if db_file:
+            self._conn = sqlite3.connect(db_file, check_same_thread=False, timeout=5)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "stale_hits": 0, "misses": 0,
+                         "refreshes": 0, "refresh_errors": 0, "evictions": 0}
+
+    def _lookup(self, key):
+        """(value, fetched_at, expires_at) from memory, then disk; caller holds the lock"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry, "memory_hits"
+        if self._conn is not None:
+            row = self._conn.execute(
+                "SELECT value, fetched_at, expires_at FROM SearchCache WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                entry = (json.loads(row[0]), row[1], row[2])
+                self._remember(key, entry)
+                return entry, "disk_hits"
+        return None, None
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def get(self, key):
+        """Cached value while fresh or stale-but-servable, else None"""
+        with self._lock:
+            entry, _ = self._lookup(key)
+        if entry is None or time.time() >= entry[2] + self.stale_ttl:
+            return None
+        return entry[0]
+
+    def put(self, key, value, ttl=None):
+        now = time.time()
+        entry = (value, now, now + (self.ttl if ttl is None else ttl))
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO SearchCache (key, value, fetched_at, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), entry[1], entry[2]),
+                )
+                self._writes += 1
+                if self._writes % PRUNE_EVERY == 0:
+                    self._conn.execute("DELETE FROM SearchCache WHERE expires_at < ?", (now - self.stale_ttl,))
+                self._conn.commit()
+
+    def get_or_fetch(self, key, fetch, ttl=None):
+        """Cached value for ``key``, calling ``fetch()`` on a miss. A stale
+        entry is returned at once and refreshed in the background."""
+        now = time.time()
+        with self._lock:
+            entry, tier = self._lookup(key)
+            if entry is not None and now < entry[2]:
+                self.counters[tier] += 1
+                return entry[0]
+            if entry is not None and now < entry[2] + self.stale_ttl:
+                self.counters["stale_hits"] += 1
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    threading.Thread(target=self._refresh, args=(key, fetch, ttl), daemon=True).start()
+                return entry[0]
+            self.counters["misses"] += 1
+        value = fetch()
+        self.put(key, value, ttl)
+        return value
+
+    def _refresh(self, key, fetch, ttl):
+        try:
+            self.put(key, fetch(), ttl)
+            with self._lock:
+                self.counters["refreshes"] += 1
+        except Exception as e:
+            print(f"Search cache refresh failed for {key!r}: {e}")
+            with self._lock:
+                self.counters["refresh_errors"] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM SearchCache")
+                self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = sum(self.counters[k] for k in ("memory_hits", "disk_hits", "stale_hits", "misses"))
+            hits = lookups - self.counters["misses"]
+            return {"db_file": self.db_file, "in_memory": len(self._memory),
+                    "hit_rate": round(hits / lookups, 3) if lookups else None, **self.counters}
+
+    def close(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache():
+    """Process-wide SearchCache, opened on first use (memory only if the
+    cache file cannot be opened)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = SearchCache()
+            except sqlite3.Error as e:
+                print(f"Search cache file unavailable, using memory only: {e}")
+                _cache = SearchCache(db_file="")
+        return _cache
+
+
+def close_search_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
+
+
+def cached_search(namespace, query, fetch, location=None, ttl=None):
+    """``fetch()`` for a query through the shared cache"""
+    return get_search_cache().get_or_fetch(cache_key(namespace, query, location), fetch, ttl)
@@ -0,0 +1,256 @@
+"""Local spec-similarity index over the vehicle catalog.
+
+find_similar_models used to fetch a feature list from the web for the
+requested model and score nearby inventory by feature overlap. This index
+answers "cars like the RAV4" from the catalog alone. Each vehicle is a
+TF-IDF vector over its model, trim, category and features text, joined
+with z-scored numeric specs parsed from Vehicle.features (price, mpg,
+seats, towing). Cosine similarity between vehicles, and between every
+model's centroid and every vehicle, is precomputed at build time; the
+index rebuilds when the catalog version moves (see VehicleCatalog).
+Needs NumPy; callers fall back to their previous path without it.
+"""
+import json
+import math
+import os
+import re
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # optional: callers fall back to feature overlap
+    np = None
+
+import database_setup
+from database_setup import VEHICLE_CATEGORIES, get_catalog, get_read_only_connection
+
+NEIGHBOURS = 20  # precomputed nearest vehicles per vehicle
+NUMERIC_WEIGHT = float(os.getenv("SIMILARITY_NUMERIC_WEIGHT", "0.5"))  # share of the vector given to specs
+NUMERIC_SPECS = ("price", "mpg", "seats", "towing")
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+_FLAG_VALUES = {"yes", "true", "1", "standard"}
+_CATEGORY_OF = {model.lower(): [c for c, models in VEHICLE_CATEGORIES.items() if model in models]
+                for models in VEHICLE_CATEGORIES.values() for model in models}
+
+
+def _numbers(value):
+    return [float(n.replace(",", "")) for n in _NUMBER.findall(str(value))]
+
+
+def vehicle_document(model, trim, features):
+    """(tokens, {spec: value}) for one Vehicle row"""
+    text = [model or "", trim or ""] + _CATEGORY_OF.get((model or "").lower(), [])
+    specs = {}
+    for key, value in features.items() if isinstance(features, dict) else ((f, "yes") for f in features or []):
+        key = str(key).lower()
+        value = str(value)
+        text.append(key if value.lower() in _FLAG_VALUES else f"{key} {value}")
+        numbers = _numbers(value)
+        if key in ("mpg", "seats", "towing") and numbers:
+            # "28/39" mpg is city/highway; use the mean
+            specs[key] = sum(numbers) / len(numbers)
+    return _TOKEN.findall(" ".join(text).lower()), specs
+
+
+class SimilarityIndex:
+    """Vehicle vectors and precomputed neighbours for one database file"""
+
+    def __init__(self, db_file=None):
+        self.db_file = db_file or database_setup.DB_FILE
+        self._lock = threading.Lock()
+        self.version = None
+        self.counters = {"builds": 0, "lookups": 0}
+        self._build()
+
+    def _build(self):
+        conn = get_read_only_connection(self.db_file)
+        try:
+            conn.execute("BEGIN")
+            row = conn.execute("SELECT version FROM CatalogVersion WHERE name = 'vehicle'").fetchone()
+            vehicles = conn.execute("SELECT id, model, trim, rate, features FROM Vehicle ORDER BY id").fetchall()
+            conn.commit()
+        finally:
+            conn.close()
+        self.version = row[0] if row else 0
+
+        docs, specs = [], []
+        for _, model, trim, rate, raw in vehicles:
+            try:
+                features = json.loads(raw) if raw else {}
+            except Exception:
+                features = {}
+            tokens, vehicle_specs = vehicle_document(model, trim, features)
+            vehicle_specs["price"] = rate
+            docs.append(tokens)
+            specs.append(vehicle_specs)
+
+        self.vehicle_ids = np.array([v[0] for v in vehicles], dtype=np.int64)
+        self.vehicle_pos = {int(v): n for n, v in enumerate(self.vehicle_ids)}
+        self.vehicle_model = [v[1] for v in vehicles]
+        self.vocabulary = {}
+        for tokens in docs:
+            for token in tokens:
+                self.vocabulary.setdefault(token, len(self.vocabulary))
+
+        # TF-IDF: log-scaled term counts times smoothed inverse document frequency
+        tf = np.zeros((len(docs), max(1, len(self.vocabulary))), dtype=np.float32)
+        for n, tokens in enumerate(docs):
+            for token in tokens:
+                tf[n, self.vocabulary[token]] += 1
+        tf = np.log1p(tf)
+        df = (tf > 0).sum(axis=0)
+        idf = np.log((1 + len(docs)) / (1 + df)) + 1
+        text = _unit_rows(tf * idf)
+
+        # Numeric specs: z-scores clipped to +-3 sigma; a missing spec sits at the mean
+        numeric = np.zeros((len(docs), len(NUMERIC_SPECS)), dtype=np.float32)
+        for c, spec in enumerate(NUMERIC_SPECS):
+            column = np.array([s.get(spec) if s.get(spec) is not None else np.nan for s in specs], dtype=np.float64)
+            known = ~np.isnan(column)
+            if known.sum() > 1 and column[known].std() > 0:
+                z = (column - column[known].mean()) / column[known].std()
+                numeric[:, c] = np.clip(np.nan_to_num(z), -3, 3) / 3
+        numeric /= math.sqrt(len(NUMERIC_SPECS))
+
+        self.vectors = _unit_rows(np.hstack([text * math.sqrt(1 - NUMERIC_WEIGHT),
+                                             numeric * math.sqrt(NUMERIC_WEIGHT)]))
+        self._precompute()
+        self.counters["builds"] += 1
+
+    def _precompute(self):
+        vectors = self.vectors
+        n = len(vectors)
+        k = min(NEIGHBOURS, max(0, n - 1))
+        self.neighbours = np.zeros((n, k), dtype=np.int64)
+        self.neighbour_scores = np.zeros((n, k), dtype=np.float32)
+        for start in range(0, n, 1024):
+            block = vectors[start:start + 1024] @ vectors.T
+            block[np.arange(len(block)), np.arange(start, start + len(block))] = -np.inf
+            if k:
+                top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(block, top, axis=1)
+                order = np.argsort(-scores, axis=1, kind="stable")
+                self.neighbours[start:start + len(block)] = np.take_along_axis(top, order, axis=1)
+                self.neighbour_scores[start:start + len(block)] = np.take_along_axis(scores, order, axis=1)
+
+        # Every model's centroid against every vehicle
+        models = {}
+        for pos, model in enumerate(self.vehicle_model):
+            models.setdefault((model or "").lower(), []).append(pos)
+        self.models = {name: np.array(pos) for name, pos in models.items()}
+        self.model_names = {(model or "").lower(): model for model in self.vehicle_model}
+        centroids = _unit_rows(np.stack([vectors[pos].mean(axis=0) for pos in self.models.values()])) if models \
+            else np.zeros((0, vectors.shape[1]), dtype=np.float32)
+        scores = centroids @ vectors.T
+        self.model_scores = {name: scores[i] for i, name in enumerate(self.models)}
+
+    def refresh(self):
+        """Rebuild if the catalog version moved since the last build (caller
+        holds the lock)"""
+        version = get_catalog(self.db_file).get()["version"]
+        if version is not None and version != self.version:
+            self._build()
+
+    def resolve_model(self, model_name):
+        """Catalog model key for user text: exact, else the one it prefixes"""
+        key = " ".join(str(model_name or "").lower().split())
+        if key in self.models:
+            return key
+        matches = sorted(name for name in self.models if name.startswith(key)) if key else []
+        return matches[0] if matches else None
+
+    def _model_similarity(self, model_name):
+        """model_similarity body; caller holds the lock, so the scores and
+        every attribute read alongside them come from one build"""
+        self.refresh()
+        self.counters["lookups"] += 1
+        key = self.resolve_model(model_name)
+        return (key, self.model_scores[key]) if key else None
+
+    def model_similarity(self, model_name):
+        """Cosine score of every vehicle against the model's centroid, or None"""
+        with self._lock:
+            return self._model_similarity(model_name)
+
+    def similar_vehicles(self, vehicle_id, k=NEIGHBOURS):
+        """[(vehicle_id, score)] nearest to one vehicle, best first"""
+        with self._lock:
+            self.refresh()
+            self.counters["lookups"] += 1
+            pos = self.vehicle_pos.get(int(vehicle_id))
+            if pos is None:
+                return []
+            ids, scores = self.neighbours[pos][:k], self.neighbour_scores[pos][:k]
+            return [(int(self.vehicle_ids[i]), round(float(s), 4)) for i, s in zip(ids, scores)]
+
+    def similar_models(self, model_name, k=5):
+        """[(model, score)] whose vehicles sit closest to the model's centroid"""
+        with self._lock:
+            found = self._model_similarity(model_name)
+            if not found:
+                return []
+            key, scores = found
+            best = {}
+            for name, positions in self.models.items():
+                if name != key:
+                    best[self.model_names[name]] = round(float(scores[positions].max()), 4)
+        return sorted(best.items(), key=lambda item: -item[1])[:k]
+
+    def rank_inventory(self, model_name, candidates, k=None, include_same_model=False):
+        """Inventory dicts (with vehicle_id) ranked by similarity to a model,
+        each copied with a "similarity" score; None if the model is unknown"""
+        with self._lock:
+            found = self._model_similarity(model_name)
+            if not found:
+                return None
+            key, scores = found
+            ranked = []
+            for item in candidates:
+                pos = self.vehicle_pos.get(item.get("vehicle_id"))
+                if pos is None or (not include_same_model and (item.get("model") or "").lower() == key):
+                    continue
+                ranked.append((float(scores[pos]), item))
+        ranked.sort(key=lambda pair: -pair[0])
+        return [dict(item, similarity=round(score, 4)) for score, item in ranked[:k]]
+
+    def stats(self):
+        with self._lock:
+            return {"vehicles": int(len(self.vehicle_ids)), "vocabulary": len(self.vocabulary),
+                    "models": len(self.models), "version": self.version, **self.counters}
+
+
+def _unit_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_similarity_index(db_file=None):
+    """Shared index for a database file, built on first use"""
+    key = os.path.abspath(db_file or database_setup.DB_FILE)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = SimilarityIndex(key)
+        return index
+
+
+def drop_similarity_indexes():
+    with _indexes_lock:
+        _indexes.clear()
+
+
+def similar_inventory(model_name, candidates, k=None, db_file=None):
+    """Rank inventory dicts by spec similarity to model_name; None when the
+    index cannot answer (no NumPy, unknown model, or an error)"""
+    if np is None:
+        return None
+    try:
+        return get_similarity_index(db_file).rank_inventory(model_name, candidates, k=k)
+    except Exception as e:
+        print(f"Similarity index error: {e}")
+        return None
@@ -0,0 +1,83 @@
+"""Single-flight execution for identical concurrent lookups.
+
+When many sessions ask the same thing at the same moment, the first caller
+for a key runs the work and later callers with the same key wait for it
+and get the same result (or the same exception) instead of running their
+own copy. Nothing is kept once the call finishes; caching is left to the
+layers that already do it (search_cache, the inventory engine).
+"""
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """In-flight calls by key, with counts of executed and coalesced calls"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.counters = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        """fn(*args, **kwargs), shared with any identical call already running"""
+        with self._lock:
+            self.counters["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.counters["executions"] += 1
+            else:
+                self.counters["coalesced"] += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._calls), **self.counters}
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def get_flight(name):
+    """Process-wide SingleFlight for one kind of call"""
+    with _flights_lock:
+        flight = _flights.get(name)
+        if flight is None:
+            flight = _flights[name] = SingleFlight()
+        return flight
+
+
+def single_flight(name, key, fn, *args, **kwargs):
+    """Run fn under the ``name`` group, coalesced by ``key``"""
+    return get_flight(name).do(key, fn, *args, **kwargs)
+
+
+def single_flight_stats():
+    """Counters per group, e.g. {"serper": {"calls", "executions", "coalesced", ...}}"""
+    with _flights_lock:
+        flights = dict(_flights)
+    return {name: flight.stats() for name, flight in flights.items()}
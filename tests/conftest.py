@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database_setup  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """database_setup pointed at a fresh, initialized temporary database"""
+    monkeypatch.setattr(database_setup, "DB_FILE", str(tmp_path / "toyota_sales.db"))
+    database_setup.init_database()
+    yield database_setup
+    database_setup.close_all_pools()
+    database_setup.drop_catalogs()
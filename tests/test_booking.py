@@ -0,0 +1,30 @@
+CUSTOMER = {"name": "Test Customer", "email": "test@example.com"}
+
+
+def _status(db, inventory_id):
+    return db.query_db("SELECT available_status FROM Inventory WHERE id = ?", (inventory_id,))[0][0]
+
+
+def test_booking_reserves_the_inventory_row(db):
+    result = db.book_test_drive(CUSTOMER, inventory_id=1, date="2030-01-01", time="10:00")
+    assert result["ok"]
+    assert _status(db, 1) == "reserved"
+    assert db.query_db("SELECT vehicle_id, dealership_id FROM TestDrive WHERE id = ?",
+                       (result["testdrive_id"],)) == [(1, 1)]
+
+
+def test_mismatched_vehicle_is_rejected_without_writes(db):
+    result = db.book_test_drive(CUSTOMER, inventory_id=1, vehicle_id=2, dealership_id=1,
+                                date="2030-01-01", time="10:00")
+    assert result["error"] == "inventory_mismatch"
+    assert _status(db, 1) == "available"
+    assert db.query_db("SELECT COUNT(*) FROM TestDrive") == [(0,)]
+    assert db.query_db("SELECT COUNT(*) FROM Customer") == [(0,)]
+
+
+def test_unavailable_inventory_rolls_back_the_customer(db):
+    assert db.book_test_drive(CUSTOMER, inventory_id=1, date="2030-01-01", time="10:00")["ok"]
+    other = {"name": "Other", "email": "other@example.com"}
+    result = db.book_test_drive(other, inventory_id=1, date="2030-01-02", time="10:00")
+    assert result["error"] == "inventory_unavailable"
+    assert db.query_db("SELECT COUNT(*) FROM Customer WHERE email = ?", (other["email"],)) == [(0,)]
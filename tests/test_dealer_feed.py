@@ -0,0 +1,22 @@
+import pytest
+
+from dealer_feed import load_feed, reconcile_feed
+
+VIN = "JTDKN3DU5N0123456"  # sample inventory row 1: vehicle 1 at dealer 1
+CUSTOMER = {"name": "Feed Customer", "email": "feed@example.com"}
+
+
+def _inventory(db):
+    return db.query_db("SELECT vehicle_id, dealership_id, available_status FROM Inventory WHERE vin = ?", (VIN,))[0]
+
+
+@pytest.mark.parametrize("apply_feed", [load_feed, reconcile_feed])
+def test_reserved_vin_stays_with_its_dealer(db, apply_feed):
+    assert db.book_test_drive(CUSTOMER, inventory_id=1, date="2030-01-01", time="10:00")["ok"]
+    apply_feed([{"vin": VIN, "dealership_id": 2, "vehicle_id": 3}])
+    assert _inventory(db) == (1, 1, "reserved")
+
+
+def test_available_vin_moves_to_the_feed_dealer(db):
+    load_feed([{"vin": VIN, "dealership_id": 2, "vehicle_id": 3}])
+    assert _inventory(db) == (3, 2, "available")
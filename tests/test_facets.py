@@ -0,0 +1,24 @@
+ZIP = "90012"
+
+
+def test_chosen_model_still_lists_the_others(db):
+    facets = db.get_inventory_facets(ZIP, model="RAV4")
+    assert {"RAV4", "Camry", "Prius"} <= set(facets["model"])
+    assert facets["total"] == facets["model"]["RAV4"] == db.count_inventory(ZIP, model="RAV4")
+    assert db.get_inventory_facets(ZIP)["total"] == db.count_inventory(ZIP)
+
+
+def test_count_facets_filters_and_bucket_order(db):
+    groups = [
+        ("Camry", "LE", "White", "A", "$25k-$35k", 2),
+        ("RAV4", "XLE", "Blue", "A", "$35k-$45k", 3),
+        ("Tacoma", "SR5", "White", "B", "Under $25k", 1),
+        ("Sequoia", "Platinum", "Black", "B", "$60k+", 4),
+    ]
+    facets = db.count_facets(groups, vehicle_type="SUV", color="white")
+    assert facets["total"] == 0
+    assert facets["model"] == {} and facets["color"] == {"Black": 4, "Blue": 3}
+
+    facets = db.count_facets(groups)
+    assert facets["total"] == 10
+    assert list(facets["price"]) == ["Under $25k", "$25k-$35k", "$35k-$45k", "$60k+"]
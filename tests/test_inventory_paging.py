@@ -0,0 +1,67 @@
+import pytest
+
+ZIP = "99999"
+
+
+@pytest.fixture
+def inventory_ids(db):
+    """Rows (Zeta, NULL), (Zeta, X), (Zeta, NULL), (Zeta Two, Y) at one dealer"""
+    with db.transaction() as conn:
+        dealer_id = conn.execute(
+            "INSERT INTO Dealership (dealership_name, city, zipcode) VALUES ('Paging Toyota', 'Nowhere', ?)", (ZIP,)
+        ).lastrowid
+        ids = []
+        for n, (model, trim) in enumerate([("Zeta", None), ("Zeta", "X"), ("Zeta", None), ("Zeta Two", "Y")]):
+            vehicle_id = conn.execute(
+                "INSERT INTO Vehicle (model, trim, color, rate) VALUES (?, ?, 'White', 30000)", (model, trim)
+            ).lastrowid
+            ids.append(conn.execute(
+                "INSERT INTO Inventory (vehicle_id, dealership_id, vin) VALUES (?, ?, ?)",
+                (vehicle_id, dealer_id, f"PAGING{n:011d}"),
+            ).lastrowid)
+    return ids
+
+
+def _all_pages(fetch):
+    ids, cursor = [], None
+    while True:
+        rows, cursor = fetch(cursor)
+        ids.extend(rows)
+        if cursor is None:
+            return ids
+
+
+def test_inventory_pages_cross_null_trims(db, inventory_ids):
+    rows = _all_pages(lambda after: db.get_inventory_page(zipcode=ZIP, after=after, limit=1))
+    assert [r[11] for r in rows] == [inventory_ids[n] for n in (0, 2, 1, 3)]
+
+
+def test_snapshot_pages_match_sql(db, inventory_ids):
+    inventory_index = pytest.importorskip("inventory_index")
+    if inventory_index.np is None:
+        pytest.skip("NumPy not installed")
+    snapshot = inventory_index.InventorySnapshot()
+    try:
+        pages = [snapshot.search(zipcode=ZIP, limit=1)]
+        while pages[-1][1] is not None:
+            pages.append(snapshot.search(zipcode=ZIP, after=pages[-1][1], limit=1))
+    finally:
+        snapshot.close()
+    sql_pages = [db.get_inventory_page(zipcode=ZIP, limit=1)]
+    while sql_pages[-1][1] is not None:
+        sql_pages.append(db.get_inventory_page(zipcode=ZIP, after=sql_pages[-1][1], limit=1))
+    assert pages == sql_pages
+
+
+def test_text_search_pages_cross_null_trims(db, inventory_ids):
+    rows = _all_pages(lambda after: db.search_inventory_text("zeta", zipcode=ZIP, after=after, limit=1))
+    assert sorted(r[11] for r in rows) == inventory_ids
+
+
+def test_admin_listing_pages_cross_null_trims(db, inventory_ids):
+    def fetch(after):
+        query, params = db.build_inventory_listing_query(after=after, limit=2)
+        return db.split_page(db.query_db(query, params), 1, db.inventory_listing_cursor)
+
+    rows = _all_pages(fetch)
+    assert len(rows) == len({r[0] for r in rows}) == db.query_db("SELECT COUNT(*) FROM Inventory")[0][0]
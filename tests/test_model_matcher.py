@@ -0,0 +1,30 @@
+from model_matcher import ModelMatcher
+
+CATALOG = {"RAV4": ["LE", "XLE"], "RAV4 Hybrid": ["LE"], "Highlander": ["L", "XLE"], "Tacoma": ["SR", "TRD Sport"],
+           "Camry": ["LE", "SE"]}
+
+
+def test_spelling_variants_resolve():
+    matcher = ModelMatcher(CATALOG)
+    for text, model in [("Rav 4", "RAV4"), ("rav4hybrid", "RAV4 Hybrid"), ("Camery", "Camry"),
+                        ("Toyota Camry", "Camry"), ("Highlandr", "Highlander")]:
+        assert matcher.canonical(text) == model, text
+
+
+def test_model_with_catalog_trim_resolves_to_the_model():
+    matcher = ModelMatcher(CATALOG)
+    assert matcher.canonical("RAV4 XLE") == "RAV4"
+    assert matcher.canonical("Tacoma TRD Sport") == "Tacoma"
+
+
+def test_unknown_trailing_words_do_not_match_another_model():
+    matcher = ModelMatcher(CATALOG)
+    assert matcher.match("Highlander Hybrid") == ("highlanderhybrid", None)
+    assert matcher.canonical("Camry Platinum") is None
+    assert ModelMatcher(list(CATALOG)).canonical("RAV4 XLE") is None
+
+
+def test_unknown_model_is_reported_as_no_inventory(db):
+    assert db.canonical_model("Highlander Hybrid") == "Highlander Hybrid"
+    assert db.get_inventory_by_zipcode("10001", "Highlander Hybrid") == []
+    assert db.get_inventory_by_zipcode("10001", "Highlander XLE")
@@ -0,0 +1,14 @@
+from contextlib import closing
+
+
+def test_hot_queries_use_their_indexes(db):
+    with closing(db.get_connection()) as conn:
+        assert db.check_query_plans(conn) == []
+
+
+def test_migrations_can_be_reapplied(db):
+    with closing(db.get_connection()) as conn:
+        conn.execute("DELETE FROM schema_version")
+        conn.commit()
+        assert db.migrate(conn) == [version for version, _, _ in db.MIGRATIONS]
+        assert db.check_query_plans(conn) == []
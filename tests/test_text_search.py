@@ -0,0 +1,49 @@
+import pytest
+
+
+def _models(rows):
+    return sorted({row[1] for row in rows})
+
+
+def test_explicit_filters_narrow_text_matches(db):
+    rows, _ = db.search_inventory_text("hybrid", model="prius")
+    assert _models(rows) == ["Prius"]
+    assert db.count_inventory_text("hybrid", model="prius") == len(rows)
+
+    rows, _ = db.search_inventory_text("hybrid", features=["mpg"], color="barcelona red")
+    assert [(row[1], row[2]) for row in rows] == [("Prius", "LE")]
+
+
+def test_radius_limits_text_matches_to_nearby_dealers(db):
+    rows, _ = db.search_inventory_text("camry", zipcode="90012", radius_miles=50)
+    assert rows and {row[7] for row in rows} == {"Los Angeles"}
+    assert db.count_inventory_text("camry", zipcode="90012", radius_miles=50) == len(rows)
+    assert len(db.search_inventory_text("camry")[0]) > len(rows)
+
+
+def test_snapshot_text_count_matches_sql(db):
+    inventory_index = pytest.importorskip("inventory_index")
+    try:
+        for kwargs in ({"model": "prius"}, {"zipcode": "90012", "radius_miles": 50}, {"color": "midnight black"}):
+            assert inventory_index.count_inventory_text("hybrid camry", **kwargs) == \
+                db.count_inventory_text("hybrid camry", **kwargs)
+    finally:
+        inventory_index.drop_snapshots()
+
+
+@pytest.mark.parametrize("text, min_price, max_price", [
+    ("prius over 50 mpg", None, None),
+    ("at least 8 seats", None, None),
+    ("truck that can tow over 5000 lbs", None, None),
+    ("SUV with at least 7 seats under 40k", None, 40000),
+    ("hybrid between $20,000 and 30k", 20000, 30000),
+    ("camry under 35", None, 35000),
+])
+def test_unit_numbers_are_not_prices(db, text, min_price, max_price):
+    parsed = db.parse_search_text(text)
+    assert (parsed["min_price"], parsed["max_price"]) == (min_price, max_price)
+
+
+def test_mpg_request_still_finds_the_prius(db):
+    rows, _ = db.search_inventory_text("prius over 50 mpg")
+    assert "Prius" in _models(rows)
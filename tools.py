@@ -13,20 +13,20 @@ try:
 except Exception:
     from langchain.tools import Tool  # type: ignore
 
-try:
-    from langchain_community.utilities import GoogleSerperAPIWrapper
-except Exception:
-    GoogleSerperAPIWrapper = None  # type: ignore
-
 from database_setup import (
     query_db,
-    insert_data,
-    update_data,
-    get_inventory_by_zipcode,
+    PAGE_SIZE,
+    parse_search_text,
+    search_inventory_text,
+    book_test_drive,
+    abook_test_drive,
+    run_in_db_executor,
 )
+from inventory_index import search_inventory_page, count_inventory, count_inventory_text
+from tools.serper_client import serper_available, serper_search_and_parse, serper_batch_search, SERPER_BATCH_MAX
+from single_flight import single_flight
 
 load_dotenv()
-SERPER_API_KEY = os.getenv("SERPER_API_KEY")
 
 
 def serper_search_tool(json_input: str) -> str:
@@ -35,19 +35,109 @@ def serper_search_tool(json_input: str) -> str:
         q = payload.get("q", "").strip()
         if not q:
             return json.dumps({"error": "missing_query"})
-        if not SERPER_API_KEY or GoogleSerperAPIWrapper is None:
+        if not serper_available():
             return json.dumps({
                 "ok": True,
                 "text": f"No SERPER configured. For '{q}', check toyota.com or official resources.",
             })
-        search = GoogleSerperAPIWrapper()
-        out = search.run(q)
+        out = serper_search_and_parse(q)["summary"].strip()
         return json.dumps({"ok": True, "text": out})
     except Exception as e:
         return json.dumps({"error": "serper_failed", "detail": str(e)})
 
 
+def serper_batch_search_tool(json_input: str) -> str:
+    """Several web searches in one step: {"queries": [...]} or a JSON list.
+    Results come back in query order; failed queries carry an error."""
+    try:
+        payload = json.loads(json_input)
+        queries = payload.get("queries", []) if isinstance(payload, dict) else payload
+        if not isinstance(queries, list) or not queries:
+            return json.dumps({"error": "missing_queries"})
+        queries = [str(q).strip() for q in queries]
+        if not serper_available():
+            return json.dumps({
+                "ok": True,
+                "results": [{"q": q, "text": f"No SERPER configured. For '{q}', check toyota.com or official resources."}
+                            for q in queries],
+            })
+        results = []
+        for item in serper_batch_search(queries):
+            if item["ok"]:
+                results.append({"q": item["q"], "text": item["result"]["summary"].strip()})
+            else:
+                results.append({"q": item["q"], "error": item["error"]})
+        return json.dumps({"ok": True, "results": results, "failed": sum("error" in r for r in results)})
+    except Exception as e:
+        return json.dumps({"error": "serper_failed", "detail": str(e)})
+
+
+# Compact (LLM-facing) search output: inventory row index of each field.
+# Vehicle fields go in "rows"; dealer fields are listed once in "dealers"
+# and rows point at them by position.
+VEHICLE_FIELDS = {"inventory_id": 11, "vehicle_id": 0, "model": 1, "trim": 2, "color": 3, "price": 4,
+                  "features": 5, "vin": 12}
+DEALER_FIELDS = {"name": 6, "city": 7, "zipcode": 8, "address": 9, "phone": 10}
+COMPACT_FIELDS = ("inventory_id", "vehicle_id", "model", "trim", "color", "price", "name", "city")
+TOOL_MAX_RESULTS = int(os.getenv("TOOL_MAX_RESULTS", "8"))
+
+
+def _features_text(raw):
+    """Features JSON as one short string ("drivetrain: AWD; mpg: 28/39")"""
+    try:
+        feat = json.loads(raw) if raw else {}
+    except Exception:
+        return ""
+    if isinstance(feat, dict):
+        return "; ".join(f"{k}: {v}" for k, v in feat.items())
+    if isinstance(feat, list):
+        return ", ".join(str(f) for f in feat)
+    return str(feat)
+
+
+def _compact_results(inv, fields, text_mode):
+    """(columns, rows, dealer_columns, dealers) for a page of inventory rows"""
+    fields = [f for f in (fields or COMPACT_FIELDS) if f in VEHICLE_FIELDS or f in DEALER_FIELDS]
+    vehicle_fields = ["inventory_id"] + [f for f in fields if f in VEHICLE_FIELDS and f != "inventory_id"]
+    dealer_fields = [f for f in fields if f in DEALER_FIELDS] or ["name"]
+    near = not text_mode and any(len(row) > 13 for row in inv)
+    columns = vehicle_fields + (["relevance"] if text_mode else []) + ["dealer"]
+    dealer_columns = dealer_fields + (["distance_miles"] if near else [])
+
+    dealers, dealer_pos, rows, features = [], {}, [], {}
+    for row in inv:
+        dealer = tuple(row[DEALER_FIELDS[f]] for f in dealer_fields) + ((round(row[13], 1),) if near else ())
+        if dealer not in dealer_pos:
+            dealer_pos[dealer] = len(dealers)
+            dealers.append(list(dealer))
+        out = []
+        for f in vehicle_fields:
+            if f == "features":
+                if row[0] not in features:
+                    features[row[0]] = _features_text(row[5])
+                out.append(features[row[0]])
+            else:
+                out.append(row[VEHICLE_FIELDS[f]])
+        if text_mode:
+            out.append(round(-row[13], 3))
+        rows.append(out + [dealer_pos[dealer]])
+    return columns, rows, dealer_columns, dealers
+
+
+def _flight_key(json_input: str) -> str:
+    """Tool arguments in canonical form: key order and spacing do not matter"""
+    try:
+        return json.dumps(json.loads(json_input), sort_keys=True, separators=(",", ":"))
+    except Exception:
+        return json_input
+
+
 def vehicle_search_tool(json_input: str) -> str:
+    """Inventory search; identical concurrent searches share one execution"""
+    return single_flight("vehicle_search", _flight_key(json_input), _vehicle_search, json_input)
+
+
+def _vehicle_search(json_input: str) -> str:
     try:
         q = json.loads(json_input)
     except Exception:
@@ -58,14 +148,78 @@ def vehicle_search_tool(json_input: str) -> str:
     color = q.get("color")
     zipcode = q.get("zipcode")
     features = q.get("features", []) or []
+    radius_miles = q.get("radius_miles")
+    compact = q.get("format") == "compact"
+    cursor = q.get("cursor")
+    if isinstance(cursor, str):
+        try:
+            cursor = json.loads(cursor)
+        except Exception:
+            return json.dumps({"error": "invalid_cursor"})
+    # Compact cursors also carry how many rows were already shown
+    seen = 0
+    if isinstance(cursor, dict):
+        try:
+            seen = int(cursor.get("seen") or 0)
+        except (TypeError, ValueError):
+            return json.dumps({"error": "invalid_cursor"})
+        cursor = cursor.get("after")
+    # (model, trim, inventory_id), led by a score or distance for text and
+    # radius searches
+    try:
+        valid = seen >= 0 and (cursor is None or (isinstance(cursor, list) and len(cursor) in (3, 4)
+                                                  and int(cursor[-1]) >= 0))
+    except (TypeError, ValueError):
+        valid = False
+    if not valid:
+        return json.dumps({"error": "invalid_cursor"})
+    default_limit = TOOL_MAX_RESULTS if compact else PAGE_SIZE
+    try:
+        limit = max(1, min(int(q.get("max_results") or q.get("limit") or default_limit), PAGE_SIZE))
+    except (TypeError, ValueError):
+        limit = default_limit
+
+    search_text = (q.get("search_text") or "").strip()
 
     try:
-        inv = (
-            get_inventory_by_zipcode(zipcode, model)
-            if (zipcode or model)
-            else get_inventory_by_zipcode(None, None)
-        )
+        if search_text:
+            # Free text ("white hybrid with AWD under 35k"): BM25 over the
+            # VehicleSearch FTS index plus the stated price range, narrowed
+            # by any explicit filters passed alongside it
+            inv, next_cursor = search_inventory_text(search_text, zipcode, q.get("min_price"), q.get("max_price"),
+                                                     after=cursor, limit=limit, model=model, trim=trim, color=color,
+                                                     features=features, radius_miles=radius_miles)
+        else:
+            # Filters run as vectorized masks over the in-memory inventory
+            # snapshot (SQL when NumPy is unavailable); one keyset page at a
+            # time, continued with next_cursor
+            inv, next_cursor = search_inventory_page(zipcode, model, trim, color, features, after=cursor, limit=limit,
+                                                     radius_miles=radius_miles)
+        if compact:
+            columns, rows, dealer_columns, dealers = _compact_results(inv, q.get("fields"), bool(search_text))
+            more = 0
+            if next_cursor is not None:
+                if search_text:
+                    total = count_inventory_text(search_text, zipcode, q.get("min_price"), q.get("max_price"),
+                                                 model, trim, color, features, radius_miles=radius_miles)
+                else:
+                    total = count_inventory(zipcode, model, trim, color, features, radius_miles=radius_miles)
+                more = max(total - seen - len(rows), 1)
+            response = {
+                "ok": True,
+                "columns": columns,
+                "rows": rows,
+                "dealer_columns": dealer_columns,
+                "dealers": dealers,
+                "more": more,
+                "next_cursor": {"after": next_cursor, "seen": seen + len(rows)} if next_cursor is not None else None,
+            }
+            if search_text:
+                response["parsed"] = parse_search_text(search_text)
+            return json.dumps(response, default=str, separators=(",", ":"))
+
         results = []
+        parsed_features = {}
         for row in inv:
             (
                 vid,
@@ -81,22 +235,16 @@ def vehicle_search_tool(json_input: str) -> str:
                 d_phone,
                 inv_id,
                 vin,
-            ) = row
+            ) = row[:13]
 
-            if trim and str(v_trim).lower() != str(trim).lower():
-                continue
-            if color and str(v_color).lower() != str(color).lower():
-                continue
-
-            try:
-                feat = json.loads(v_features) if v_features else {}
-            except Exception:
-                feat = {}
-
-            if features:
-                joined = json.dumps(feat).lower()
-                if not any(str(f).lower() in joined for f in features):
-                    continue
+            # Parse each vehicle's features JSON once, not once per inventory row
+            feat = parsed_features.get(vid)
+            if feat is None:
+                try:
+                    feat = json.loads(v_features) if v_features else {}
+                except Exception:
+                    feat = {}
+                parsed_features[vid] = feat
 
             results.append(
                 {
@@ -120,110 +268,78 @@ def vehicle_search_tool(json_input: str) -> str:
                     "inventory_id": inv_id,
                 }
             )
-        return json.dumps({"ok": True, "results": results}, default=str)
+            if search_text:
+                results[-1]["relevance"] = round(-row[13], 3)
+            elif len(row) > 13:
+                results[-1]["dealership"]["distance_miles"] = round(row[13], 1)
+        response = {"ok": True, "results": results, "next_cursor": next_cursor}
+        if search_text:
+            response["parsed"] = parse_search_text(search_text)
+        return json.dumps(response, default=str)
     except Exception as e:
         return json.dumps({"error": "inventory_query_failed", "detail": str(e)})
 
 
-def save_booking_tool(json_input: str) -> str:
+def _parse_booking(json_input: str):
+    """Return (book_test_drive kwargs, None) or (None, error JSON)"""
     try:
         payload = json.loads(json_input)
     except Exception:
-        return json.dumps({"error": "invalid_json"})
+        return None, json.dumps({"error": "invalid_json"})
 
     cust = payload.get("customer", {})
     vehicle = payload.get("vehicle", {})
     dealership_id = payload.get("dealership_id")
-    salesperson_id = payload.get("salesperson_id")
     inventory_id = payload.get("inventory_id")
     date_s = payload.get("date")
     time_s = payload.get("time")
-    special = payload.get("special_request", "")
 
-    # Resolve dealership_id and/or vehicle_id from inventory if provided
-    try:
-        if (not dealership_id or not vehicle.get("vehicle_id")) and inventory_id:
-            inv_rows = query_db(
-                "SELECT dealership_id, vehicle_id FROM Inventory WHERE id = ?",
-                (inventory_id,),
-            )
-            if inv_rows:
-                inv_dealer_id, inv_vehicle_id = inv_rows[0]
-                dealership_id = dealership_id or inv_dealer_id
-                if not vehicle.get("vehicle_id"):
-                    vehicle["vehicle_id"] = inv_vehicle_id
-    except Exception:
-        # Continue; required check below will handle any missing pieces
-        pass
+    if not all([cust.get("email"), vehicle.get("vehicle_id") or inventory_id, dealership_id or inventory_id, date_s, time_s]):
+        return None, json.dumps({"error": "missing_required_fields"})
 
-    required = [cust.get("email"), vehicle.get("vehicle_id"), dealership_id, date_s, time_s]
-    if not all(required):
-        return json.dumps({"error": "missing_required_fields"})
+    return {
+        "customer": cust,
+        "vehicle_id": vehicle.get("vehicle_id"),
+        "dealership_id": dealership_id,
+        "salesperson_id": payload.get("salesperson_id"),
+        "inventory_id": inventory_id,
+        "date": date_s,
+        "time": time_s,
+        "special_request": payload.get("special_request", ""),
+        "created_at": datetime.utcnow().isoformat(),
+    }, None
 
-    try:
-        existing = query_db("SELECT customer_id FROM Customer WHERE email = ?", (cust.get("email"),))
-        if existing:
-            customer_id = existing[0][0]
-            update_data(
-                "UPDATE Customer SET customer_name=?, phone=?, city=?, zipcode=? WHERE customer_id=?",
-                (
-                    cust.get("name"),
-                    cust.get("phone"),
-                    cust.get("city"),
-                    cust.get("zipcode"),
-                    customer_id,
-                ),
-            )
-        else:
-            customer_id = insert_data(
-                "INSERT INTO Customer (customer_name, email, phone, zipcode, city) VALUES (?, ?, ?, ?, ?)",
-                (
-                    cust.get("name"),
-                    cust.get("email"),
-                    cust.get("phone"),
-                    cust.get("zipcode"),
-                    cust.get("city"),
-                ),
-            )
 
-        if not customer_id:
-            return json.dumps({"error": "customer_save_failed"})
+def _booking_response(result: dict, inventory_id) -> str:
+    if not result.get("ok"):
+        return json.dumps(result)
+    return json.dumps({"ok": True, "testdrive_id": result["testdrive_id"], "inventory_id": inventory_id})
 
-        created = datetime.utcnow().isoformat()
-        testdrive_id = insert_data(
-            (
-                "INSERT INTO TestDrive (customer_id, dealership_id, salesperson_id, vehicle_id, date, time, special_request, status, created_at) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, 'scheduled', ?)"
-            ),
-            (
-                customer_id,
-                dealership_id,
-                salesperson_id,
-                vehicle.get("vehicle_id"),
-                date_s,
-                time_s,
-                special,
-                created,
-            ),
-        )
 
-        if not testdrive_id:
-            return json.dumps({"error": "booking_save_failed"})
-
-        # If we know the inventory row, reserve it to avoid double booking
-        if inventory_id:
-            try:
-                update_data(
-                    "UPDATE Inventory SET available_status = 'reserved' WHERE id = ?",
-                    (inventory_id,),
-                )
-            except Exception:
-                # Non-fatal; booking still succeeded
-                pass
-
-        return json.dumps({"ok": True, "testdrive_id": testdrive_id, "inventory_id": inventory_id})
+def save_booking_tool(json_input: str) -> str:
+    booking, error = _parse_booking(json_input)
+    if error:
+        return error
+
+    # One BEGIN IMMEDIATE transaction: resolve inventory, upsert customer,
+    # reserve the car only if still available, insert the TestDrive row.
+    try:
+        result = book_test_drive(**booking)
     except Exception as e:
         return json.dumps({"error": "save_failed", "detail": str(e)})
+    return _booking_response(result, booking["inventory_id"])
+
+
+async def asave_booking_tool(json_input: str) -> str:
+    """save_booking_tool for async agents; the transaction runs on the DB executor"""
+    booking, error = _parse_booking(json_input)
+    if error:
+        return error
+    try:
+        result = await abook_test_drive(**booking)
+    except Exception as e:
+        return json.dumps({"error": "save_failed", "detail": str(e)})
+    return _booking_response(result, booking["inventory_id"])
 
 
 def send_email_tool(json_input: str) -> str:
@@ -246,6 +362,11 @@ def send_email_tool(json_input: str) -> str:
 
 
 def get_vehicle_details_tool(json_input: str) -> str:
+    """Vehicle details; identical concurrent requests share one lookup"""
+    return single_flight("vehicle_details", _flight_key(json_input), _vehicle_details, json_input)
+
+
+def _vehicle_details(json_input: str) -> str:
     try:
         payload = json.loads(json_input)
         vid = payload.get("vehicle_id")
@@ -310,6 +431,36 @@ def get_vehicle_details_tool(json_input: str) -> str:
         return json.dumps({"error": "db_failed", "detail": str(e)})
 
 
+async def avehicle_search_tool(json_input: str) -> str:
+    return await run_in_db_executor(vehicle_search_tool, json_input)
+
+
+async def aget_vehicle_details_tool(json_input: str) -> str:
+    return await run_in_db_executor(get_vehicle_details_tool, json_input)
+
+
+def _inventory_input(s):
+    """Agent input as a vehicle_search_tool payload; compact unless the
+    agent asks for another format"""
+    if isinstance(s, str) and s.strip().isdigit():
+        q = {"zipcode": s.strip()}
+    elif isinstance(s, str) and not s.lstrip().startswith("{"):
+        q = {"search_text": s}
+    else:
+        try:
+            q = json.loads(s) if isinstance(s, str) else dict(s)
+        except Exception:
+            return s
+        if not isinstance(q, dict):
+            return s
+    q.setdefault("format", "compact")
+    return json.dumps(q)
+
+
+def _vehicle_details_input(s):
+    return s if isinstance(s, str) else json.dumps({"vehicle_id": s})
+
+
 # LangChain Tool wrappers
 serper_tool = Tool(
     name="search_toyota_info",
@@ -320,19 +471,45 @@ serper_tool = Tool(
     ),
 )
 
+def _batch_queries_input(s):
+    """A JSON list/object as given, else one query per line or ';'"""
+    text = s if isinstance(s, str) else json.dumps(s)
+    if text.lstrip()[:1] in ("[", "{"):
+        return text
+    return json.dumps([q for q in text.replace(";", "\n").splitlines() if q.strip()])
+
+
+serper_batch_tool = Tool(
+    name="search_toyota_info_batch",
+    func=lambda s: serper_batch_search_tool(_batch_queries_input(s)),
+    description=(
+        f"Run up to {SERPER_BATCH_MAX} Toyota info/spec searches at once, e.g. to compare models. "
+        "Input: JSON list of query strings (or one query per line). "
+        "Returns results in the same order; a failed query has an error instead of text."
+    ),
+)
+
 inventory_tool = Tool(
     name="search_inventory",
-    func=lambda s: (
-        vehicle_search_tool(json.dumps({"zipcode": s}) if isinstance(s, str) and s.isdigit() else s)
-    ),
+    func=lambda s: vehicle_search_tool(_inventory_input(s)),
+    coroutine=lambda s: avehicle_search_tool(_inventory_input(s)),
     description=(
-        "Search inventory by ZIP (string) or JSON with filters: {zipcode, model, trim, color, features}."
+        "Search inventory by ZIP (string), free text (string) or JSON with filters: {zipcode, radius_miles, model, trim, color, features, limit, cursor}. "
+        "radius_miles widens the ZIP to nearby dealers, nearest first. "
+        "Or pass search_text with the customer's own words (e.g. \"white hybrid with AWD under 35k\"), "
+        "optionally with zipcode/min_price/max_price, for relevance-ranked matches; "
+        "model, trim, color, features and radius_miles given alongside search_text must all match as well. "
+        "features is a list such as [\"AWD\", \"towing >= 5000\"]. "
+        "Results are a table: columns/rows, with each row's last value indexing dealers (dealer_columns). "
+        "Optional max_results (default 8) and fields, e.g. [\"model\", \"price\", \"features\", \"vin\", \"address\", \"phone\"]. "
+        "more says how many results are left; pass next_cursor back as cursor to get them."
     ),
 )
 
 booking_tool = Tool(
     name="save_test_drive",
     func=save_booking_tool,
+    coroutine=asave_booking_tool,
     description=(
         "Save test drive booking. Input JSON: {customer:{name,email,phone,city,zipcode}, "
         "vehicle:{vehicle_id}, dealership_id OR inventory_id, salesperson_id, date, time, special_request}."
@@ -341,7 +518,8 @@ booking_tool = Tool(
 
 vehicle_details_tool = Tool(
     name="get_vehicle_details",
-    func=lambda s: get_vehicle_details_tool(s if isinstance(s, str) else json.dumps({"vehicle_id": s})),
+    func=lambda s: get_vehicle_details_tool(_vehicle_details_input(s)),
+    coroutine=lambda s: aget_vehicle_details_tool(_vehicle_details_input(s)),
     description="Get vehicle details. Input JSON: {vehicle_id} or just vehicle_id as string.",
 )
 
@@ -352,4 +530,4 @@ send_email = Tool(
 )
 
 # Export list for agent creation
-tools = [serper_tool, inventory_tool, booking_tool, vehicle_details_tool, send_email]
+tools = [serper_tool, serper_batch_tool, inventory_tool, booking_tool, vehicle_details_tool, send_email]
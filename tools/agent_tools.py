@@ -2,12 +2,14 @@ import json
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
-from tools import SerperClient, NLUParser
-from ui import inventory_tool, feature_match_tool, schedule_test_drive, generate_and_send_emails_bg
+from tools.serper_client import get_client
+from tools.nlu_parser import NLUParser
+from feature_matcher import feature_match_tool
+from ui import inventory_tool, schedule_test_drive, generate_and_send_emails_bg
 
 class AgentTools:
     def __init__(self):
-        self.serper = SerperClient()
+        self.serper = get_client()
         self.nlu = NLUParser()
 
     def serper_search(self, query: str) -> str:
@@ -35,11 +37,11 @@ class AgentTools:
         except Exception:
             return 'Invalid payload for feature_match'
         candidates = inventory_tool(zipcode)
-        matched = feature_match_tool(feats, candidates)
+        matched = feature_match_tool(feats, candidates, k=8, weights=p.get('weights'))
         if not matched:
             return 'No similar models found nearby.'
         out = []
-        for m in matched[:8]:
+        for m in matched:
             out.append(f"{m['model']} {m['trim']} @ {m['dealership_name']} (VIN:{m['vin']}) — features: {', '.join(m.get('features',[]))}")
         return '\n'.join(out)
 
@@ -1,22 +1,167 @@
 import os
-import requests
+import random
 import re
-from typing import Dict, Any, List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from search_cache import cache_key, cached_search, normalize_query
+from single_flight import single_flight
+from tools.serper_replay import SERPER_MODE, RecordingAdapter, ReplayAdapter
+
+SERPER_URL = os.getenv("SERPER_URL", "https://google.serper.dev/search")
+SERPER_TIMEOUT = float(os.getenv("SERPER_TIMEOUT", "10"))  # per attempt (read); connect is capped at 3s
+SERPER_DEADLINE = float(os.getenv("SERPER_DEADLINE", "15"))  # whole call, retries included
+SERPER_RETRIES = int(os.getenv("SERPER_RETRIES", "2"))
+SERPER_POOL_SIZE = int(os.getenv("SERPER_POOL_SIZE", "10"))
+RETRY_STATUS = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.2  # seconds; attempt n sleeps uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**n))
+BACKOFF_CAP = 2.0
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+SERPER_BATCH_CONCURRENCY = int(os.getenv("SERPER_BATCH_CONCURRENCY", "8"))  # process-wide cap
+SERPER_BATCH_MAX = 10  # queries per batch
+
+class SerperClient:
+    """Long-lived Serper client: one pooled keep-alive session, bounded
+    retries with jittered exponential backoff, a deadline per call and a
+    latency histogram. Share it through get_client().
+
+    ``mode`` (SERPER_MODE by default) swaps the transport: "record" also
+    saves responses as fixtures and "replay" serves them offline (see
+    tools/serper_replay.py)."""
+
+    def __init__(self, url: str = None, api_key: str = None, timeout: float = SERPER_TIMEOUT,
+                 deadline: float = SERPER_DEADLINE, retries: int = SERPER_RETRIES,
+                 pool_size: int = SERPER_POOL_SIZE, verify=True, mode: str = None):
+        self.url = url or SERPER_URL
+        self.api_key = api_key
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.verify = verify  # per request: an env CA bundle would override Session.verify
+        self.mode = mode or SERPER_MODE
+        self.session = requests.Session()
+        if self.mode == "replay":
+            self.transport = ReplayAdapter()
+        elif self.mode == "record":
+            self.transport = RecordingAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        else:
+            self.transport = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", self.transport)
+        self.session.mount("http://", self.transport)
+        self._lock = threading.Lock()
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.counters = {"requests": 0, "attempts": 0, "retries": 0, "errors": 0, "total_ms": 0.0}
+
+    def _observe(self, elapsed_ms: float):
+        bucket = next((n for n, bound in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms <= bound),
+                      len(LATENCY_BUCKETS_MS))
+        self.histogram[bucket] += 1
+        self.counters["total_ms"] += elapsed_ms
+
+    def raw_search(self, q: str, location: str = None, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """POST one query; retries connection errors, timeouts, 429 and 5xx
+        until the attempts or the deadline (seconds) run out"""
+        api_key = self.api_key or os.getenv("SERPER_API_KEY") or ("replay" if self.mode == "replay" else None)
+        if not api_key:
+            raise RuntimeError("SERPER_API_KEY not set")
+        payload = {"q": q}
+        if location:
+            payload["location"] = location
+        headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
+        start = time.monotonic()
+        ends = start + (self.deadline if deadline is None else deadline)
+        attempt = 0
+        try:
+            while True:
+                remaining = ends - time.monotonic()
+                if remaining <= 0:
+                    raise requests.Timeout(f"Serper deadline exceeded after {attempt} attempt(s)")
+                with self._lock:
+                    self.counters["attempts"] += 1
+                retry_after = None
+                try:
+                    resp = self.session.post(self.url, headers=headers, json=payload, verify=self.verify,
+                                             timeout=(min(3.0, remaining), min(self.timeout, remaining)))
+                    if resp.status_code not in RETRY_STATUS or attempt >= self.retries:
+                        resp.raise_for_status()
+                        return resp.json()
+                    error = requests.HTTPError(f"{resp.status_code} from Serper", response=resp)
+                    retry_after = resp.headers.get("Retry-After")
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if attempt >= self.retries:
+                        raise
+                    error = e
+                pause = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+                if retry_after and retry_after.isdigit():
+                    pause = max(pause, float(retry_after))
+                if time.monotonic() + pause >= ends:
+                    raise error
+                time.sleep(pause)
+                attempt += 1
+                with self._lock:
+                    self.counters["retries"] += 1
+        except Exception:
+            with self._lock:
+                self.counters["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self.counters["requests"] += 1
+                self._observe((time.monotonic() - start) * 1000)
+
+    def search(self, q: str, location: str = None) -> Dict[str, Any]:
+        """Parsed summary, features and trims for a query (cached)"""
+        return serper_search_and_parse(q, location)
 
-SERPER_URL = "https://google.serper.dev/search"
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+            done = self.counters["requests"]
+            return {"url": self.url, "mode": self.mode, **self.counters, "total_ms": round(self.counters["total_ms"], 1),
+                    "mean_ms": round(self.counters["total_ms"] / done, 1) if done else None,
+                    "histogram": dict(zip(labels, self.histogram))}
+
+    def close(self):
+        self.session.close()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client() -> SerperClient:
+    """Process-wide SerperClient shared by the tools and the apps"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = SerperClient()
+        return _client
+
+def close_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+def serper_available() -> bool:
+    """True when searches can run: an API key is set or SERPER_MODE=replay"""
+    return bool(os.getenv("SERPER_API_KEY")) or SERPER_MODE == "replay"
 
 def serper_raw_search(q: str, location: str = None) -> Dict[str, Any]:
-    """Call Serper API with secure API key"""
-    api_key = os.getenv("SERPER_API_KEY")
-    if not api_key:
-        raise RuntimeError("SERPER_API_KEY not set")
-    headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
-    payload = {"q": q}
-    if location:
-        payload["location"] = location
-    resp = requests.post(SERPER_URL, headers=headers, json=payload, timeout=10)
-    resp.raise_for_status()
-    return resp.json()
+    """Serper results for a query, served from the shared search cache when fresh;
+    concurrent misses for the same query share one request. Replay mode skips
+    the cache so every call sees the replay latency, errors and current
+    fixtures."""
+    if SERPER_MODE == "replay":
+        key = cache_key("serper-replay", q, location)
+        return single_flight("serper-replay", key, get_client().raw_search, q, location)
+    key = cache_key("serper", q, location)
+    fetch = lambda: single_flight("serper", key, get_client().raw_search, q, location)
+    return cached_search("serper", q, fetch, location=location)
 
 def extract_features_from_text(text: str) -> List[str]:
     """Heuristic extraction of car features from text"""
@@ -62,3 +207,48 @@ def serper_search_and_parse(q: str, location: str = None) -> Dict[str, Any]:
     raw = serper_raw_search(q, location)
     parsed = parse_serper_response(raw)
     return parsed
+
+_batch_executor = None
+_batch_lock = threading.Lock()
+
+def _executor() -> ThreadPoolExecutor:
+    global _batch_executor
+    with _batch_lock:
+        if _batch_executor is None:
+            _batch_executor = ThreadPoolExecutor(max_workers=SERPER_BATCH_CONCURRENCY,
+                                                 thread_name_prefix="serper-batch")
+        return _batch_executor
+
+def serper_batch_search(queries: List[str], location: str = None,
+                        deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+    """serper_search_and_parse for several queries at once, at most
+    SERPER_BATCH_CONCURRENCY in flight across the process.
+
+    Returns one entry per query, in input order: {"q", "ok": True, "result"}
+    or {"q", "ok": False, "error"}. Repeats of a query share one call; at
+    most SERPER_BATCH_MAX distinct queries are searched and the rest are
+    reported as skipped. Queries still running at the deadline (seconds,
+    SERPER_DEADLINE by default) are reported as timed out.
+    """
+    keys = [normalize_query(q) for q in queries]
+    distinct = list(dict.fromkeys(k for k in keys if k))
+    first = {}
+    for q, key in zip(queries, keys):
+        first.setdefault(key, q)
+    futures = {key: _executor().submit(serper_search_and_parse, first[key], location)
+               for key in distinct[:SERPER_BATCH_MAX]}
+    wait(futures.values(), timeout=SERPER_DEADLINE if deadline is None else deadline)
+    out = []
+    for q, key in zip(queries, keys):
+        future = futures.get(key)
+        if not key:
+            out.append({"q": q, "ok": False, "error": "empty query"})
+        elif future is None:
+            out.append({"q": q, "ok": False, "error": f"skipped: more than {SERPER_BATCH_MAX} queries"})
+        elif not future.done():
+            out.append({"q": q, "ok": False, "error": "timed out"})
+        elif future.exception() is not None:
+            out.append({"q": q, "ok": False, "error": str(future.exception())})
+        else:
+            out.append({"q": q, "ok": True, "result": future.result()})
+    return out
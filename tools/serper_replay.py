@@ -0,0 +1,139 @@
+"""Offline record/replay stand-in for the Serper API.
+
+SerperClient mounts one of these transports on its session when
+SERPER_MODE asks for it, so retries, deadlines and the latency histogram
+behave exactly as they do against the network:
+
+- ``record``: real requests go out as usual and every successful response
+  is also written to SERPER_FIXTURES, one JSON file per query.
+- ``replay``: no network. Responses come from SERPER_FIXTURES after
+  SERPER_REPLAY_LATENCY_MS (plus up to SERPER_REPLAY_JITTER_MS), and a
+  SERPER_REPLAY_ERROR_RATE share of requests fails with a 503, a 429, a
+  timeout or a dropped connection. The random choices come from a seeded
+  generator (SERPER_REPLAY_SEED), so a run is repeatable. A query with no
+  fixture gets a 404.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from search_cache import normalize_query
+
+SERPER_MODE = os.getenv("SERPER_MODE", "live")  # live | record | replay
+SERPER_FIXTURES = os.getenv("SERPER_FIXTURES", os.path.join("fixtures", "serper"))
+SERPER_REPLAY_LATENCY_MS = float(os.getenv("SERPER_REPLAY_LATENCY_MS", "0"))
+SERPER_REPLAY_JITTER_MS = float(os.getenv("SERPER_REPLAY_JITTER_MS", "0"))
+SERPER_REPLAY_ERROR_RATE = float(os.getenv("SERPER_REPLAY_ERROR_RATE", "0"))
+SERPER_REPLAY_SEED = int(os.getenv("SERPER_REPLAY_SEED", "0"))
+INJECTED_ERRORS = ("503", "429", "timeout", "connection")
+
+def fixture_path(directory: str, q: str, location: Optional[str] = None) -> str:
+    """Fixture file for a query: readable slug plus a hash of the normalized key"""
+    key = f"{normalize_query(location)}|{normalize_query(q)}"
+    slug = re.sub(r"[^a-z0-9]+", "-", normalize_query(q)).strip("-")[:60] or "query"
+    return os.path.join(directory, f"{slug}-{hashlib.sha1(key.encode()).hexdigest()[:10]}.json")
+
+def _payload(request) -> Dict[str, Any]:
+    try:
+        return json.loads(request.body or b"{}")
+    except ValueError:
+        return {}
+
+def _response(request, status: int, body: Dict[str, Any], headers: Dict[str, str] = None) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status
+    resp.reason = {200: "OK", 404: "Not Found", 429: "Too Many Requests", 503: "Service Unavailable"}.get(status, "")
+    resp._content = json.dumps(body).encode()
+    resp.headers["Content-Type"] = "application/json"
+    resp.headers.update(headers or {})
+    resp.encoding = "utf-8"
+    resp.url = request.url
+    resp.request = request
+    return resp
+
+class ReplayAdapter(BaseAdapter):
+    """Serves recorded responses with artificial latency and injected errors"""
+
+    def __init__(self, directory: str = None, latency_ms: float = None, jitter_ms: float = None,
+                 error_rate: float = None, seed: int = None):
+        super().__init__()
+        self.directory = directory or SERPER_FIXTURES
+        self.latency_ms = SERPER_REPLAY_LATENCY_MS if latency_ms is None else latency_ms
+        self.jitter_ms = SERPER_REPLAY_JITTER_MS if jitter_ms is None else jitter_ms
+        self.error_rate = SERPER_REPLAY_ERROR_RATE if error_rate is None else error_rate
+        self._random = random.Random(SERPER_REPLAY_SEED if seed is None else seed)
+        self._lock = threading.Lock()
+        self._fixtures = {}  # path -> parsed response
+        self.counters = {"served": 0, "missing": 0, "injected": 0}
+
+    def _load(self, path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if path in self._fixtures:
+                return self._fixtures[path]
+        try:
+            with open(path, encoding="utf-8") as f:
+                response = json.load(f)["response"]
+        except FileNotFoundError:
+            response = None
+        with self._lock:
+            self._fixtures[path] = response
+        return response
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        payload = _payload(request)
+        with self._lock:
+            delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+            error = self._random.choice(INJECTED_ERRORS) if self._random.random() < self.error_rate else None
+        time.sleep(delay / 1000)
+        if error:
+            with self._lock:
+                self.counters["injected"] += 1
+            if error == "timeout":
+                raise requests.ReadTimeout("injected timeout", request=request)
+            if error == "connection":
+                raise requests.ConnectionError("injected connection reset", request=request)
+            return _response(request, int(error), {"message": "injected error"},
+                             {"Retry-After": "0"} if error == "429" else None)
+        response = self._load(fixture_path(self.directory, payload.get("q", ""), payload.get("location")))
+        with self._lock:
+            self.counters["served" if response is not None else "missing"] += 1
+        if response is None:
+            return _response(request, 404, {"message": f"no recorded response for {payload.get('q')!r}"})
+        return _response(request, 200, response)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"directory": self.directory, **self.counters}
+
+    def close(self):
+        pass
+
+class RecordingAdapter(HTTPAdapter):
+    """Real requests; successful responses are also saved as fixtures"""
+
+    def __init__(self, directory: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory or SERPER_FIXTURES
+        self.recorded = 0
+
+    def send(self, request, **kwargs):
+        resp = super().send(request, **kwargs)
+        if resp.status_code == 200:
+            payload = _payload(request)
+            path = fixture_path(self.directory, payload.get("q", ""), payload.get("location"))
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"q": payload.get("q"), "location": payload.get("location"),
+                           "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "response": resp.json()}, f, indent=1)
+            os.replace(tmp, path)
+            self.recorded += 1
+        return resp
@@ -10,6 +10,11 @@ import streamlit as st
 import pandas as pd
 from jinja2 import Template
 
+from feature_matcher import feature_match_tool
+from inventory_query import lookup_inventory
+from similarity_index import similar_inventory
+from tools.serper_client import serper_available, serper_search_and_parse
+
 # Optional LangChain (if available)
 try:
     from langchain.llms import OpenAI
@@ -36,10 +41,17 @@ conn = get_db_connection()
 
 def serper_fetch(model: str) -> Dict[str, Any]:
     """
-    Placeholder for Serper (or any web tool) fetching latest model info.
-    Replace this with real API calls to Serper or another car-spec service.
+    Latest model info from Serper through the shared client when SERPER_API_KEY
+    is set (or SERPER_MODE=replay), otherwise a static placeholder.
     Returns a dict with 'model', 'features'(list), 'summary', 'trims'.
     """
+    if serper_available():
+        try:
+            parsed = serper_search_and_parse(model)
+            return {"model": model, "summary": parsed["summary"].strip(), "features": parsed["features"],
+                    "trims": parsed["trims"]}
+        except Exception as e:
+            print("Serper error:", e)
     # Example static response — in production call the external API.
     sample = {
         "model": model,
@@ -53,70 +65,22 @@ def serper_fetch(model: str) -> Dict[str, Any]:
 def inventory_tool(zipcode: str, model: Optional[str] = None) -> List[Dict[str, Any]]:
     """Return list of available inventory items near the zipcode (simple VIN-level search).
     """
-    cur = conn.cursor()
-    # Find dealerships in zipcode or same city — simple approach
-    cur.execute("SELECT dealership_id, dealership_name, city, zipcode, address, email, phone FROM Dealership WHERE zipcode = ? LIMIT 20", (zipcode,))
-    dealers = cur.fetchall()
-    dealer_ids = [d[0] for d in dealers]
-    if not dealer_ids:
-        return []
-
-    q = "SELECT Inventory.id as inventory_id, Inventory.vin, Inventory.available_status, Vehicle.id as vehicle_id, Vehicle.make, Vehicle.model, Vehicle.trim, Vehicle.features, Vehicle.rate, Dealership.dealership_name, Dealership.address, Dealership.phone FROM Inventory JOIN Vehicle ON Inventory.vehicle_id = Vehicle.id JOIN Dealership ON Inventory.dealership_id = Dealership.dealership_id WHERE Inventory.dealership_id IN ({seq})"
-    seq = ",".join(["?"] * len(dealer_ids))
-    if model:
-        q += " AND Vehicle.model LIKE ?"
-        params = dealer_ids + [f"%{model}%"]
-    else:
-        params = dealer_ids
-    cur.execute(q.format(seq=seq), params)
-    rows = cur.fetchall()
-    results = []
-    for r in rows:
-        features = []
-        try:
-            features = json.loads(r[7]) if r[7] else []
-        except Exception:
-            try:
-                features = json.loads(r[7].replace("'", '"'))
-            except Exception:
-                features = []
-        results.append({
-            "inventory_id": r[0],
-            "vin": r[1],
-            "available_status": r[2],
-            "vehicle_id": r[3],
-            "make": r[4],
-            "model": r[5],
-            "trim": r[6],
-            "features": features,
-            "rate": r[8],
-            "dealership_name": r[9],
-            "address": r[10],
-            "phone": r[11]
-        })
-    return results
-
-
-def feature_match_tool(target_features: List[str], candidate_models: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Score candidate models by feature overlap and return sorted list."""
-    scored = []
-    target_set = set([f.lower() for f in target_features])
-    for v in candidate_models:
-        candidate_set = set([f.lower() for f in v.get("features", [])])
-        overlap = len(target_set.intersection(candidate_set))
-        scored.append((overlap, v))
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [v for score, v in scored]
+    return lookup_inventory(zipcode, model, db_file=DB_PATH)
+
 
 # ---------------------- BUSINESS LOGIC ----------------------
 
-def find_similar_models(model_name: str, zipcode: str) -> List[Dict[str, Any]]:
-    """Find similar models available in inventory near zipcode using serper + inventory."""
-    serper_info = serper_fetch(model_name)
-    target_features = serper_info.get("features", [])
+def find_similar_models(model_name: str, zipcode: str, k: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Find similar models available in inventory near zipcode, ranked by the local spec-similarity index."""
     # Pull inventory broadly and score
     candidates = inventory_tool(zipcode)
-    similar = feature_match_tool(target_features, candidates)
+    similar = similar_inventory(model_name, candidates, k=k, db_file=DB_PATH)
+    if similar is not None:
+        return similar
+    # Model not in the catalog (or no NumPy): score by web features instead
+    serper_info = serper_fetch(model_name)
+    target_features = serper_info.get("features", [])
+    similar = feature_match_tool(target_features, candidates, k=k)
     return similar
 
 
@@ -10,13 +10,16 @@ import streamlit as st
 import pandas as pd
 from jinja2 import Template
 
+from feature_matcher import feature_match_tool
+from inventory_query import lookup_inventory
+from tools.serper_client import serper_available, serper_search_and_parse
+
 # LangChain & provider imports
 try:
     from langchain_openai import ChatOpenAI
     from langchain.agents import Tool, initialize_agent
     from langchain.agents.agent_types import AgentType
     from langchain.memory import ConversationBufferMemory
-    from langchain_community.utilities import GoogleSerperAPIWrapper
 except Exception as e:
     # If imports fail, allow the app to still show prototype UI and fall back to simple functions
     ChatOpenAI = None
@@ -24,8 +27,7 @@ except Exception as e:
     initialize_agent = None
     AgentType = None
     ConversationBufferMemory = None
-    GoogleSerperAPIWrapper = None
-    print("LangChain/OpenAI/Serper imports failed:", e)
+    print("LangChain/OpenAI imports failed:", e)
 
 DB_PATH = "toyota_sales.db"
 
@@ -41,17 +43,14 @@ conn = get_db_connection()
 # ---------------------- SERPER (web search) ----------------------
 
 def serper_fetch(query: str) -> Dict[str, Any]:
-    """Use LangChain GoogleSerperAPIWrapper if available, otherwise fallback to static placeholder."""
-    api_key = os.getenv("SERPER_API_KEY")
-    if GoogleSerperAPIWrapper and api_key:
-        os.environ["SERPER_API_KEY"] = api_key
+    """Use the shared Serper client if an API key is set, otherwise fallback to static placeholder."""
+    if serper_available():
         try:
-            wrapper = GoogleSerperAPIWrapper()
-            docs = wrapper.run(query)
-            # wrapper.run returns a string summary; wrap into dict
-            return {"model": query, "summary": docs, "features": [], "raw": docs}
+            parsed = serper_search_and_parse(query)
+            return {"model": query, "summary": parsed["summary"].strip(), "features": parsed["features"],
+                    "trims": parsed["trims"]}
         except Exception as e:
-            print("Serper wrapper error:", e)
+            print("Serper error:", e)
     # Fallback static
     return {
         "model": query,
@@ -63,57 +62,8 @@ def serper_fetch(query: str) -> Dict[str, Any]:
 # ---------------------- INVENTORY & FEATURE MATCH ----------------------
 
 def inventory_tool(zipcode: str, model: Optional[str] = None) -> List[Dict[str, Any]]:
-    cur = conn.cursor()
-    cur.execute("SELECT dealership_id FROM Dealership WHERE zipcode = ? LIMIT 50", (zipcode,))
-    dealers = cur.fetchall()
-    dealer_ids = [d[0] for d in dealers]
-    if not dealer_ids:
-        return []
-    seq = ",".join(["?"] * len(dealer_ids))
-    q = f"SELECT Inventory.id as inventory_id, Inventory.vin, Inventory.available_status, Vehicle.id as vehicle_id, Vehicle.make, Vehicle.model, Vehicle.trim, Vehicle.features, Vehicle.rate, Dealership.dealership_id, Dealership.dealership_name, Dealership.address, Dealership.email, Dealership.phone FROM Inventory JOIN Vehicle ON Inventory.vehicle_id = Vehicle.id JOIN Dealership ON Inventory.dealership_id = Dealership.dealership_id WHERE Inventory.dealership_id IN ({seq})"
-    params = dealer_ids
-    if model:
-        q += " AND Vehicle.model LIKE ?"
-        params = dealer_ids + [f"%{model}%"]
-    cur.execute(q, params)
-    rows = cur.fetchall()
-    results = []
-    for r in rows:
-        try:
-            features = json.loads(r[7]) if r[7] else []
-        except Exception:
-            try:
-                features = json.loads(r[7].replace("'", '"'))
-            except Exception:
-                features = []
-        results.append({
-            "inventory_id": r[0],
-            "vin": r[1],
-            "available_status": r[2],
-            "vehicle_id": r[3],
-            "make": r[4],
-            "model": r[5],
-            "trim": r[6],
-            "features": features,
-            "rate": r[8],
-            "dealership_id": r[9],
-            "dealership_name": r[10],
-            "address": r[11],
-            "dealership_email": r[12],
-            "phone": r[13]
-        })
-    return results
-
-
-def feature_match_tool(target_features: List[str], candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    target_set = set([f.lower() for f in target_features])
-    scored = []
-    for c in candidates:
-        cand_set = set([f.lower() for f in c.get("features", [])])
-        overlap = len(target_set.intersection(cand_set))
-        scored.append((overlap, c))
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [c for score, c in scored]
+    return lookup_inventory(zipcode, model, db_file=DB_PATH)
+
 
 # ---------------------- SCHEDULING & EMAIL ----------------------
 
@@ -266,16 +216,16 @@ def build_langchain_agent():
         except Exception:
             return "Invalid payload for feature_match"
         candidates = inventory_tool(zipcode)
-        matched = feature_match_tool(feats, candidates)
+        matched = feature_match_tool(feats, candidates, k=8, weights=p.get("weights"))
         if not matched:
             return "No similar models found nearby."
         out = []
-        for m in matched[:8]:
+        for m in matched:
             out.append(f"{m['model']} {m['trim']} @ {m['dealership_name']} (VIN:{m['vin']}) — features: {', '.join(m.get('features',[]))}")
         return "".join(out)
 
     if Tool:
-        tools.append(Tool(name="feature_match", func=feature_match_fn, description="Find similar models by feature list. Input JSON string with features and zipcode."))
+        tools.append(Tool(name="feature_match", func=feature_match_fn, description="Find similar models by feature list. Input JSON string with features and zipcode, optionally weights ({feature: weight})."))
 
     # Schedule test drive tool (agent can ask to call it — but actual scheduling via UI form is preferred)
     def schedule_tool(payload: str) -> str:
@@ -422,6 +372,6 @@ with col2:
                     st.success(f"Test drive scheduled for {result['date']} at {result['time']}. Confirmation email will be sent shortly.")
 
 st.markdown("---")
-st.info("This prototype integrates Serper via LangChain's GoogleSerperAPIWrapper and OpenAI via langchain-openai when available. Docs: Serper (serper.dev) and LangChain OpenAI integration.")
+st.info("This prototype integrates Serper through a shared pooled client and OpenAI via langchain-openai when available. Docs: Serper (serper.dev) and LangChain OpenAI integration.")
 
 # End of file
\ No newline at end of file
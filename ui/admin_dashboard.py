@@ -1,33 +1,86 @@
+import csv
+import io
+
 import streamlit as st
 import pandas as pd
-from database_setup import query_db, update_data
+from database_setup import (
+    query_db,
+    query_reporting_db,
+    update_data,
+    stream_query,
+    split_page,
+    build_inventory_listing_query,
+    inventory_listing_cursor,
+    build_test_drives_query,
+    RESERVED_INVENTORY_QUERY,
+    PAGE_SIZE,
+)
 
+INVENTORY_COLUMNS = ["Inventory ID", "Vehicle ID", "Make", "Model", "Trim", "Color", "Price",
+                     "Dealership", "City", "ZIP", "Status", "VIN"]
+TEST_DRIVE_COLUMNS = ["ID", "Date", "Time", "Status", "Special Request", "Created", "Customer", "Email",
+                      "Phone", "ZIP", "Make", "Model", "Trim", "Color", "Price", "Dealership", "Dealer City",
+                      "Salesperson", "Salesperson Email"]
 
-def fetch_inventory():
-    query = (
-        "SELECT i.id AS inventory_id, v.id AS vehicle_id, v.make, v.model, v.trim, v.color, v.rate, "
-        "d.dealership_name, d.city, d.zipcode, i.available_status, i.vin "
-        "FROM Inventory i JOIN Vehicle v ON i.vehicle_id = v.id "
-        "JOIN Dealership d ON i.dealership_id = d.dealership_id "
-        "ORDER BY d.dealership_name, v.model, v.trim"
-    )
-    return query_db(query)
 
+def fetch_inventory(after=None, limit=PAGE_SIZE, status=None):
+    """One keyset page of inventory: (rows, next_cursor)"""
+    query, params = build_inventory_listing_query(status=status, after=after, limit=limit + 1)
+    # Live read-only connection: admins must see their own edits immediately
+    rows = query_reporting_db(query, params, snapshot=False)
+    return split_page(rows, limit, inventory_listing_cursor)
 
-def fetch_test_drives():
-    query = (
-        "SELECT td.id, td.date, td.time, td.status, td.special_request, td.created_at, "
-        "c.customer_name, c.email, c.phone, c.zipcode, "
-        "v.make, v.model, v.trim, v.color, v.rate, "
-        "d.dealership_name, d.city AS dealer_city, "
-        "COALESCE(s.salesperson_name, ''), COALESCE(s.email, '') "
-        "FROM TestDrive td JOIN Customer c ON td.customer_id = c.customer_id "
-        "JOIN Vehicle v ON td.vehicle_id = v.id "
-        "JOIN Dealership d ON td.dealership_id = d.dealership_id "
-        "LEFT JOIN Salesperson s ON td.salesperson_id = s.salesperson_id "
-        "ORDER BY td.date DESC, td.time DESC"
-    )
-    return query_db(query)
+
+def fetch_test_drives(after=None, limit=PAGE_SIZE, status=None, dealership_name=None, date=None):
+    """One keyset page of test drives, newest first: (rows, next_cursor)"""
+    query, params = build_test_drives_query(status, dealership_name, date, after=after, limit=limit + 1)
+    rows = query_reporting_db(query, params, snapshot=False)
+    return split_page(rows, limit, lambda r: [r[1], r[2], r[0]])
+
+
+def export_csv(query, params, header):
+    """CSV bytes of a query for st.download_button.
+
+    Rows are read in fetchmany() batches, so no result list is built, but
+    download_button needs the whole payload: the finished CSV is held in
+    memory once per export.
+    """
+    out = io.StringIO(newline="")
+    writer = csv.writer(out)
+    writer.writerow(header)
+    for row in stream_query(query, params, reporting=True, snapshot=False):
+        writer.writerow(row)
+    return out.getvalue().encode("utf-8")
+
+
+def _page_cursor(key, filters):
+    """Current keyset cursor for a paged table; resets when filters change"""
+    state = st.session_state
+    if state.get(f"{key}_filters") != filters:
+        state[f"{key}_filters"] = filters
+        state[f"{key}_cursors"] = [None]
+    return state[f"{key}_cursors"][-1]
+
+
+def _page_controls(key, next_cursor):
+    cursors = st.session_state[f"{key}_cursors"]
+    c1, c2, c3 = st.columns([1, 1, 4])
+    with c1:
+        if st.button("◀ Previous", key=f"{key}_prev", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with c2:
+        if st.button("Next ▶", key=f"{key}_next", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
+    with c3:
+        st.caption(f"Page {len(cursors)}")
+
+
+def _export_controls(key, query, params, header):
+    if st.button("Prepare CSV export", key=f"{key}_export"):
+        st.download_button("⬇️ Download CSV", export_csv(query, params, header),
+                           file_name=f"{key}.csv", mime="text/csv", key=f"{key}_download")
 
 
 def update_inventory_status(inventory_id: int, new_status: str) -> bool:
@@ -54,10 +107,7 @@ def release_inventory_for_test_drive(td_id: int) -> tuple[bool, int | None]:
         return (False, None)
     vehicle_id, dealer_id = td[0]
     # Find a reserved inventory row matching
-    inv = query_db(
-        "SELECT id FROM Inventory WHERE vehicle_id = ? AND dealership_id = ? AND available_status = 'reserved' ORDER BY id LIMIT 1",
-        (vehicle_id, dealer_id),
-    )
+    inv = query_db(RESERVED_INVENTORY_QUERY, (vehicle_id, dealer_id))
     if not inv:
         return (False, None)
     inv_id = inv[0][0]
@@ -71,7 +121,16 @@ def release_inventory_for_test_drive(td_id: int) -> tuple[bool, int | None]:
 
 def render_inventory_tab():
     st.subheader("🚗 Manage Inventory")
-    data = fetch_inventory()
+    c1, c2 = st.columns(2)
+    with c1:
+        status_filter = st.selectbox("Filter Status", ["All", "available", "reserved", "unavailable", "sold", "maintenance"],
+                                     key="inventory_status_filter")
+    with c2:
+        limit = st.number_input("Rows per page", min_value=10, max_value=200, value=PAGE_SIZE, step=10,
+                                key="inventory_limit")
+    status = None if status_filter == "All" else status_filter
+    cursor = _page_cursor("inventory", (status, limit))
+    data, next_cursor = fetch_inventory(cursor, int(limit), status)
     if not data:
         st.info("No inventory data found.")
         return
@@ -94,6 +153,8 @@ def render_inventory_tab():
         })
     df = pd.DataFrame(rows)
     st.dataframe(df, width='stretch')
+    _page_controls("inventory", next_cursor)
+    _export_controls("inventory", *build_inventory_listing_query(status=status), INVENTORY_COLUMNS)
 
     st.divider()
     st.subheader("✏️ Update Inventory Status")
@@ -113,7 +174,26 @@ def render_inventory_tab():
 
 def render_test_drives_tab():
     st.subheader("📅 Manage Test Drives")
-    data = fetch_test_drives()
+    statuses = [r[0] for r in query_reporting_db("SELECT DISTINCT status FROM TestDrive ORDER BY status", snapshot=False)]
+    dealers = [r[0] for r in query_reporting_db("SELECT dealership_name FROM Dealership ORDER BY dealership_name", snapshot=False)]
+
+    c1, c2, c3, c4 = st.columns(4)
+    with c1:
+        status_filter = st.selectbox("Filter Status", ["All"] + statuses)
+    with c2:
+        dealer_filter = st.selectbox("Filter Dealer", ["All"] + dealers)
+    with c3:
+        date_filter = st.text_input("Filter Date (YYYY-MM-DD)")
+    with c4:
+        limit = st.number_input("Show rows", min_value=10, max_value=200, value=PAGE_SIZE, step=10)
+
+    filters = (
+        None if status_filter == "All" else status_filter,
+        None if dealer_filter == "All" else dealer_filter,
+        date_filter or None,
+    )
+    cursor = _page_cursor("test_drives", filters + (limit,))
+    data, next_cursor = fetch_test_drives(cursor, int(limit), *filters)
     if not data:
         st.info("No test drives found.")
         return
@@ -138,26 +218,9 @@ def render_test_drives_tab():
             "Created": created,
         })
     df = pd.DataFrame(rows)
-
-    c1, c2, c3, c4 = st.columns(4)
-    with c1:
-        status_filter = st.selectbox("Filter Status", ["All"] + sorted(df["Status"].unique().tolist()))
-    with c2:
-        dealer_filter = st.selectbox("Filter Dealer", ["All"] + sorted(df["Dealership"].unique().tolist()))
-    with c3:
-        date_filter = st.text_input("Filter Date (YYYY-MM-DD)")
-    with c4:
-        limit = st.number_input("Show rows", min_value=10, max_value=200, value=50, step=10)
-
-    filtered = df.copy()
-    if status_filter != "All":
-        filtered = filtered[filtered["Status"] == status_filter]
-    if dealer_filter != "All":
-        filtered = filtered[filtered["Dealership"] == dealer_filter]
-    if date_filter:
-        filtered = filtered[filtered["Date"] == date_filter]
-
-    st.dataframe(filtered.head(limit), width='stretch')
+    st.dataframe(df, width='stretch')
+    _page_controls("test_drives", next_cursor)
+    _export_controls("test_drives", *build_test_drives_query(*filters), TEST_DRIVE_COLUMNS)
 
     st.divider()
     st.subheader("🔄 Update Test Drive Status")
@@ -194,10 +257,10 @@ def render_test_drives_tab():
 def render_analytics_tab():
     st.subheader("📊 Analytics")
     c1, c2, c3, c4 = st.columns(4)
-    total_available = query_db("SELECT COUNT(*) FROM Inventory WHERE available_status = 'available'")[0][0]
-    total_td = query_db("SELECT COUNT(*) FROM TestDrive")[0][0]
-    pending_td = query_db("SELECT COUNT(*) FROM TestDrive WHERE status = 'scheduled'")[0][0]
-    completed_td = query_db("SELECT COUNT(*) FROM TestDrive WHERE status = 'completed'")[0][0]
+    total_available = query_reporting_db("SELECT COUNT(*) FROM Inventory WHERE available_status = 'available'")[0][0]
+    total_td = query_reporting_db("SELECT COUNT(*) FROM TestDrive")[0][0]
+    pending_td = query_reporting_db("SELECT COUNT(*) FROM TestDrive WHERE status = 'scheduled'")[0][0]
+    completed_td = query_reporting_db("SELECT COUNT(*) FROM TestDrive WHERE status = 'completed'")[0][0]
     with c1:
         st.metric("Available Vehicles", total_available)
     with c2:
@@ -209,7 +272,7 @@ def render_analytics_tab():
 
     st.divider()
     st.caption("Recent activity")
-    recent = query_db(
+    recent = query_reporting_db(
         "SELECT td.created_at, c.customer_name, v.model, v.trim, td.status, d.dealership_name "
         "FROM TestDrive td JOIN Customer c ON td.customer_id = c.customer_id "
         "JOIN Vehicle v ON td.vehicle_id = v.id "
@@ -3,7 +3,6 @@ import sqlite3
 from datetime import datetime
 from utils.emailer import send_email_bg
 from tools.inventory import inventory_lookup
-import json
 
 # ---------------- Chat Helpers ----------------
 def render_chat_message(message: dict):
@@ -29,14 +28,7 @@ def display_chat_history():
 
 # ---------------- Inventory Helper ----------------
 def inventory_tool(zipcode: str, model: str = None):
-    items = inventory_lookup(zipcode, model)
-    for r in items:
-        if isinstance(r.get('features'), str):
-            try:
-                r['features'] = json.loads(r['features'])
-            except Exception:
-                r['features'] = []
-    return items
+    return inventory_lookup(zipcode, model)
 
 # ---------------- Test Drive Helper ----------------
 def schedule_test_drive(customer_name, email, phone, zipcode, inventory_id, dealership_id, salesperson_id, dt: datetime):
@@ -1,9 +1,22 @@
 # ui/ui.py
 import streamlit as st
 import json
+import time as clock
 from datetime import datetime, date, time
 from agent import ToyotaAgentManager
-from database_setup import query_db, get_inventory_by_zipcode, get_vehicle_types, get_models_by_type, get_all_models, get_trims_by_model
+from database_setup import (
+    query_db,
+    get_inventory_by_zipcode,
+    get_vehicle_types,
+    get_models_by_type,
+    get_all_models,
+    get_trims_by_model,
+    get_facet_groups,
+    count_facets,
+)
+
+FACET_CACHE_SECONDS = 30  # reuse a location's grouped counts across reruns
+FACET_RADIUS_MILES = 50  # stock counted for the form: dealers within this distance of the ZIP
 
 # Note: Page config and CSS are injected inside main() to avoid import-time Streamlit calls
 
@@ -36,6 +49,25 @@ def initialize_session_state():
         }
 
 
+def get_cached_facets(zipcode, vehicle_type=None, model=None, trim=None):
+    """Facet counts for the form over dealers within FACET_RADIUS_MILES of
+    the ZIP; the grouped query runs at most once per location every
+    FACET_CACHE_SECONDS, reruns just re-count it"""
+    cached = st.session_state.get('facet_groups')
+    if not cached or cached['zipcode'] != zipcode or clock.monotonic() - cached['loaded'] > FACET_CACHE_SECONDS:
+        groups = get_facet_groups(zipcode or None, FACET_RADIUS_MILES)
+        cached = {'zipcode': zipcode, 'loaded': clock.monotonic(), 'groups': groups}
+        st.session_state.facet_groups = cached
+    return count_facets(cached['groups'], vehicle_type=vehicle_type or None, model=model or None, trim=trim or None)
+
+
+def _with_count(counts, show=True):
+    """selectbox format_func showing 'RAV4 (12)' (just 'RAV4' without ``show``)"""
+    if not show:
+        return str
+    return lambda option: f"{option} ({counts.get(option, 0)})" if option else ""
+
+
 def display_customer_info_form():
     """Display customer information collection form"""
     st.sidebar.header("👤 Customer Information")
@@ -51,46 +83,62 @@ def display_customer_info_form():
         # Vehicle preferences section
         st.subheader("🚗 Vehicle Preferences")
         
-        # Get vehicle types and models
-        vehicle_types = get_vehicle_types()
-        type_options = [""] + list(vehicle_types.keys())
-        
-        # Vehicle type dropdown
+        # Available counts for the current ZIP and preferences (one grouped query)
         current_type = st.session_state.vehicle_preferences.get('preferred_type', '')
+        current_model = st.session_state.vehicle_preferences.get('preferred_model', '')
+        current_trim = st.session_state.vehicle_preferences.get('preferred_trim', '')
+        current_zip = st.session_state.customer_info.get('zipcode', '')
+        nearby = get_cached_facets(current_zip)
+        # Nothing in stock near this ZIP: offer the whole catalog, uncounted
+        in_stock = nearby['total'] > 0
+        all_models = nearby['model']
+
+        # Vehicle type dropdown, counted over the models of each type
+        vehicle_types = get_vehicle_types()
+        type_counts = {t: sum(all_models.get(m, 0) for m in models) for t, models in vehicle_types.items()}
+        type_options = [""] + [t for t in vehicle_types if type_counts[t] or not in_stock]
         preferred_type = st.selectbox(
             "Preferred Vehicle Type",
             options=type_options,
             index=type_options.index(current_type) if current_type in type_options else 0,
+            format_func=_with_count(type_counts, in_stock),
             help="Select the type of vehicle you're interested in"
         )
         
-        # Model dropdown (filtered by type)
+        # Model dropdown (filtered by type), only models in stock
+        facets = get_cached_facets(current_zip, preferred_type)
         model_options = [""]
-        if preferred_type:
+        if in_stock:
+            model_options.extend(facets['model'])
+        elif preferred_type:
             model_options.extend(get_models_by_type(preferred_type))
         else:
             model_options.extend(get_all_models())
-        
-        current_model = st.session_state.vehicle_preferences.get('preferred_model', '')
         preferred_model = st.selectbox(
             "Preferred Model",
             options=model_options,
             index=model_options.index(current_model) if current_model in model_options else 0,
+            format_func=_with_count(facets['model'], in_stock),
             help="Select a specific Toyota model"
         )
         
         # Trim dropdown (filtered by model)
+        facets = get_cached_facets(current_zip, preferred_type, preferred_model)
         trim_options = [""]
         if preferred_model:
-            trim_options.extend(get_trims_by_model(preferred_model))
-        
-        current_trim = st.session_state.vehicle_preferences.get('preferred_trim', '')
+            trim_options.extend(facets['trim'] if in_stock else get_trims_by_model(preferred_model))
         preferred_trim = st.selectbox(
             "Preferred Trim Level",
             options=trim_options,
             index=trim_options.index(current_trim) if current_trim in trim_options else 0,
+            format_func=_with_count(facets['trim'], in_stock),
             help="Select a specific trim level (optional)"
         )
+        if in_stock:
+            matching = get_cached_facets(current_zip, preferred_type, preferred_model, preferred_trim)['total']
+            st.caption(f"{matching} available vehicles match these preferences")
+        else:
+            st.caption(f"No vehicles in stock within {FACET_RADIUS_MILES} miles; showing the full catalog")
         
         submitted = st.form_submit_button("Update Info")
         